@@ -27,6 +27,7 @@ from .auto_moderation import *
 from .channels import *
 from .client import *
 from .close_event_codes import *
+from .cluster import *
 from .colour import *
 from .commands import *
 from .components import *
@@ -34,12 +35,14 @@ from .exceptions import *
 from .flags import *
 from .guild import *
 from .interactions import *
+from .lazy import *
 from .localizations import *
 from .managers import *
 from .mentioned import *
 from .message import *
 from .opcodes import *
 from .options import *
+from .pagination import *
 from .partials import *
 from .presence import *
 from .rtp_handler import *
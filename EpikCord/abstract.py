@@ -13,6 +13,7 @@ from aiohttp import ClientWebSocketResponse
 from .close_event_codes import GatewayCECode
 from .exceptions import ClosedWebSocketConnection, CustomIdIsTooBig, InvalidArgumentType
 from .opcodes import GatewayOpcode, VoiceOpcode
+from .pagination import PageIterator
 
 logger = getLogger("EpikCord.channels")
 
@@ -65,6 +66,8 @@ class TypingContextManager:
 
 
 class Messageable:
+    __slots__ = ("id", "client")
+
     def __init__(self, client, channel_id: str):
         if isinstance(channel_id, (int, str)):
             self.id: str = channel_id
@@ -92,6 +95,39 @@ class Messageable:
         data = await response.json()
         return [Message(self.client, message) for message in data]
 
+    def history(
+        self,
+        *,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> PageIterator:
+        """
+        Iterates over the messages of the channel from the newest to the
+        oldest, or from the oldest to the newest after ``after`` (``"0"`` for
+        the very first), requesting them a page at a time.
+
+        Parameters
+        ----------
+        before : Optional[str]
+            The ID of the message to start before.
+        after : Optional[str]
+            The ID of the message to start after.
+        limit : Optional[int]
+            The most messages to get, every message if None.
+        """
+        from EpikCord import Message
+
+        return PageIterator(
+            self.client,
+            f"channels/{self.id}/messages",
+            build=lambda data: Message(self.client, data),
+            direction="after" if after is not None else "before",
+            cursor=after if after is not None else before,
+            limit=limit,
+            channel_id=self.id,
+        )
+
     async def fetch_message(self, *, message_id: str) -> Message:
         from EpikCord import Message
 
@@ -163,6 +199,9 @@ class BaseChannel:
     def __init__(self, client, data: dict):
         self.id: str = data.get("id")
         self.client = client
+        self.data: Optional[dict] = (
+            data if getattr(client, "keep_raw_data", True) else None
+        )
         self.type = data.get("type")
 
 
@@ -450,7 +489,7 @@ class BaseInteraction:
         self.author: Optional[Union[User, GuildMember]] = (
             GuildMember(client, data.get("member"))
             if data.get("member")
-            else User(client, data.get("user"))
+            else User.from_payload(client, data.get("user"))
             if data.get("user")
             else None
         )
@@ -4,6 +4,7 @@ from logging import getLogger
 from typing import TYPE_CHECKING, Dict, List, Optional, Union
 
 from .abstract import BaseChannel, Connectable, GuildChannel, Messageable
+from .pagination import PageIterator, snowflake_cursor
 from .partials import PartialUser
 from .thread import Thread
 
@@ -64,6 +65,7 @@ class GuildTextChannel(GuildChannel, Messageable):
         )
         thread = Thread(self.client, await response.json())
         self.client.guilds[self.guild_id].channels.append(thread)
+        self.client.channels.add_to_cache(thread.id, thread)
 
         return thread
 
@@ -138,6 +140,52 @@ class GuildTextChannel(GuildChannel, Messageable):
         )
         return await response.json()
 
+    def archived_threads(
+        self,
+        *,
+        private: bool = False,
+        joined: bool = False,
+        before: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> PageIterator:
+        """
+        Iterates over the archived threads of the channel, the most recently
+        archived first, requesting them a page at a time.
+
+        Parameters
+        ----------
+        private : bool
+            Whether to get the private threads instead of the public ones.
+        joined : bool
+            Whether to only get the private threads the client has joined.
+        before : Optional[str]
+            The archive timestamp (or the ID, for joined threads) to start
+            before.
+        limit : Optional[int]
+            The most threads to get, every thread if None.
+        """
+        if joined:
+            path = f"channels/{self.id}/users/@me/threads/archived/private"
+            cursor_of = snowflake_cursor
+        else:
+            path = f"channels/{self.id}/threads/archived/"
+            path += "private" if private else "public"
+
+            def cursor_of(thread: dict) -> str:
+                return thread["thread_metadata"]["archive_timestamp"]
+
+        return PageIterator(
+            self.client,
+            path,
+            build=self.client.utils.channel_from_type,
+            cursor=before,
+            limit=limit,
+            cursor_of=cursor_of,
+            items_of=lambda body: body["threads"],
+            has_more=lambda body: body["has_more"],
+            channel_id=self.id,
+        )
+
 
 class GuildNewsChannel(GuildTextChannel):
     def __init__(self, client, data: dict):
@@ -2,8 +2,14 @@ from .client import *
 from .client_application import *
 from .client_user import *
 from .command_handler import *
+from .dispatch_scheduler import *
 from .event_handler import *
+from .gateway_ratelimit import *
+from .heartbeat import *
 from .http_client import *
+from .member_request import *
+from .ratelimit_backend import *
 from .sections import *
+from .tracing import *
 from .user_client import *
 from .websocket_client import *
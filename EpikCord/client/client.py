@@ -4,11 +4,20 @@ from collections import deque
 from importlib.util import find_spec, module_from_spec, resolve_name
 from logging import getLogger
 from sys import modules
-from typing import TYPE_CHECKING, Any, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 
 from ..flags import Intents
-from ..managers import ChannelManager, GuildManager
+from ..managers import (
+    CacheBackend,
+    CachePolicy,
+    ChannelManager,
+    GuildManager,
+    MessageManager,
+    UserManager,
+)
 from ..sticker import Sticker, StickerPack
+from .member_request import StartupChunker
+from .ratelimit_backend import RateLimitBackend
 from .websocket_client import WebsocketClient
 
 if TYPE_CHECKING:
@@ -18,6 +27,18 @@ logger = getLogger(__name__)
 
 
 class Client(WebsocketClient):
+    """
+    A bot connected to the Gateway.
+
+    Parameters
+    ----------
+    encoding : str
+        What the Gateway sends payloads as, ``"json"`` or ``"etf"``. ETF is
+        for saving bandwidth only: payloads are about a fifth smaller once
+        compressed, but decode several times slower than JSON (see
+        :mod:`EpikCord.etf` and ``benchmarks/gateway_encoding.py``).
+    """
+
     def __init__(
         self,
         token: str,
@@ -28,13 +49,47 @@ class Client(WebsocketClient):
         overwrite_commands_on_ready: Optional[bool] = None,
         discord_endpoint: str = "https://discord.com/api/v10",
         presence: Presence = None,
+        encoding: str = "json",
+        max_pending_dispatches: int = 1000,
+        ratelimit_backend: Optional[RateLimitBackend] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        keep_raw_data: bool = True,
+        lazy_models: bool = False,
+        chunk_guilds_at_startup: bool = False,
+        cache_backend: Optional[CacheBackend] = None,
+        max_messages: int = 1000,
     ):
-        super().__init__(token, intents, presence, discord_endpoint=discord_endpoint)
+        super().__init__(
+            token,
+            intents,
+            presence,
+            discord_endpoint=discord_endpoint,
+            encoding=encoding,
+            ratelimit_backend=ratelimit_backend,
+        )
         from EpikCord import ClientApplication, ClientUser, Presence, Utils
 
         self.overwrite_commands_on_ready: bool = overwrite_commands_on_ready or False
+        self.scheduler.max_pending = max_pending_dispatches
+        # The CachePolicy of the "guilds", "channels" and "members" managers.
+        self.cache_policies: Dict[str, CachePolicy] = cache_policies or {}
+        # Where guilds and channels are mirrored for other processes to read,
+        # which needs ``keep_raw_data``.
+        self.cache_backend: Optional[CacheBackend] = cache_backend
+        # Whether models keep the payload they were made from in ``data``.
+        self.keep_raw_data: bool = keep_raw_data
+        # Whether messages and guilds build nested objects on first access.
+        self.lazy_models: bool = lazy_models
+        # Whether to request the members of large guilds once READY.
+        self.startup_chunker: Optional[StartupChunker] = (
+            StartupChunker(self) if chunk_guilds_at_startup else None
+        )
         self.guilds: GuildManager = GuildManager(self)
         self.channels: ChannelManager = ChannelManager(self)
+        # One User per ID, shared by every member, message and interaction.
+        self.users: UserManager = UserManager(self)
+        # The last messages received, to resolve edits and deletions with.
+        self.messages: MessageManager = MessageManager(self, max_messages=max_messages)
         self.presence: Presence = Presence(status=status, activity=activity)
         self._components = {}
         self.utils = Utils(self)
@@ -0,0 +1,150 @@
+import asyncio
+from collections import defaultdict
+from logging import getLogger
+from typing import Any, Callable, DefaultDict, Dict, Hashable, Optional, Set, Tuple
+
+from ..exceptions import InvalidArgumentType
+
+logger = getLogger(__name__)
+
+
+class DispatchScheduler:
+    """
+    Runs event listeners as tasks, so a slow listener can't stall the gateway.
+
+    Attributes
+    ----------
+    max_pending : int
+        The amount of listener calls allowed to be queued or running at once.
+        Once it is reached, dispatching waits for half of them to finish.
+        Up to as many DISPATCHes received in the meantime are queued, past
+        which the Gateway isn't read until the listeners catch up.
+    pending : int
+        The amount of listener calls queued or running.
+    limits : Dict[str, asyncio.Semaphore]
+        The concurrency limits of events that have one.
+    ordering : Dict[str, str]
+        The events whose listeners must run one at a time and in order for the
+        same ``"guild"`` or ``"channel"``.
+    """
+
+    orderings = ("guild", "channel")
+
+    def __init__(self, *, max_pending: int = 1000):
+        self.max_pending: int = max_pending
+        self.pending: int = 0
+        self.limits: Dict[str, asyncio.Semaphore] = {}
+        self.ordering: Dict[str, str] = {}
+        self.tasks: Set[asyncio.Task] = set()
+        self._locks: Dict[Tuple[str, Hashable], asyncio.Lock] = {}
+        self._lock_users: DefaultDict[Tuple[str, Hashable], int] = defaultdict(int)
+        self._drained: asyncio.Event = asyncio.Event()
+        self._drained.set()
+
+    def set_concurrency(self, event_name: str, limit: Optional[int]):
+        """Limits how many listeners of ``event_name`` may run at once."""
+        if limit is None:
+            self.limits.pop(event_name, None)
+            return
+
+        if limit < 1:
+            raise InvalidArgumentType("The concurrency limit must be at least 1.")
+
+        self.limits[event_name] = asyncio.Semaphore(limit)
+
+    def set_ordering(self, event_name: str, ordered_by: Optional[str]):
+        """Makes listeners of ``event_name`` run in order per guild or channel."""
+        if ordered_by is None:
+            self.ordering.pop(event_name, None)
+            return
+
+        if ordered_by not in self.orderings:
+            raise InvalidArgumentType("Events can only be ordered by guild or channel.")
+
+        self.ordering[event_name] = ordered_by
+
+    def _ordering_key(self, event_name: str, args: tuple) -> Optional[Tuple]:
+        ordered_by = self.ordering.get(event_name)
+
+        if not ordered_by or not args:
+            return None
+
+        value = getattr(args[0], f"{ordered_by}_id", None)
+
+        if value is None and isinstance(args[0], dict):
+            value = args[0].get(f"{ordered_by}_id")
+
+        return (event_name, value) if value is not None else None
+
+    async def schedule(self, event_name: str, callback: Callable, *args, **kwargs):
+        """Schedules ``callback`` to be called with the arguments given."""
+        while self.pending >= self.max_pending:
+            self._drained.clear()
+            logger.warning(
+                "%d listener calls are pending, waiting for them before "
+                "dispatching %s.",
+                self.pending,
+                event_name,
+            )
+            await self._drained.wait()
+
+        key = self._ordering_key(event_name, args)
+
+        if key is not None:
+            if key not in self._locks:
+                self._locks[key] = asyncio.Lock()
+            self._lock_users[key] += 1
+
+        self.pending += 1
+        task = asyncio.create_task(self._run(event_name, key, callback, args, kwargs))
+        self.tasks.add(task)
+        task.add_done_callback(self.tasks.discard)
+
+    async def _run(
+        self,
+        event_name: str,
+        key: Optional[Tuple],
+        callback: Callable,
+        args: tuple,
+        kwargs: Dict[str, Any],
+    ):
+        lock = self._locks.get(key) if key is not None else None
+        semaphore = self.limits.get(event_name)
+
+        try:
+            if lock:
+                await lock.acquire()
+
+            try:
+                if semaphore:
+                    async with semaphore:
+                        await callback(*args, **kwargs)
+                else:
+                    await callback(*args, **kwargs)
+            finally:
+                if lock:
+                    lock.release()
+
+        except Exception as e:
+            logger.exception(f"Error in a listener for {event_name}: {e}")
+
+        finally:
+            self.pending -= 1
+
+            if key is not None:
+                self._lock_users[key] -= 1
+
+                if not self._lock_users[key]:
+                    del self._lock_users[key]
+                    del self._locks[key]
+
+            if self.pending <= self.max_pending // 2:
+                self._drained.set()
+
+    async def join(self):
+        """Waits for every scheduled listener call to finish."""
+        while self.tasks:
+            await asyncio.gather(*self.tasks, return_exceptions=True)
+
+
+__all__ = ("DispatchScheduler",)
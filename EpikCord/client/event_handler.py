@@ -1,11 +1,14 @@
 import asyncio
 from collections import defaultdict, deque
-from logging import getLogger
-from time import perf_counter_ns
-from typing import Callable, DefaultDict, Deque, Dict, Optional, Union
+from copy import copy
+from logging import DEBUG, getLogger
+from time import perf_counter, perf_counter_ns
+from typing import Callable, DefaultDict, Deque, Dict, Optional, Tuple, Union
 
 from ..opcodes import GatewayOpcode
 from .command_handler import CommandHandler
+from .dispatch_scheduler import DispatchScheduler
+from .tracing import gateway_tracer
 
 logger = getLogger(__name__)
 
@@ -25,13 +28,20 @@ class EventHandler(CommandHandler):
         self.events: DefaultDict = defaultdict(list)
         self.wait_for_events: DefaultDict = defaultdict(list)
         self.latencies: Deque = deque(maxlen=5)
+        self.scheduler: DispatchScheduler = DispatchScheduler()
+        # The parser and listener name of every event type received so far.
+        self._routes: Dict[str, Tuple[Optional[Callable], str]] = {}
+        # DISPATCHes are handled apart from the loop reading the Gateway, so
+        # waiting on the scheduler doesn't leave HEARTBEAT_ACKs unread.
+        self._dispatches: Optional[asyncio.Queue] = None
+        self._dispatching: Optional[asyncio.Task] = None
 
     def wait_for(
         self,
         event_name: str,
         *,
         check: Optional[Callable] = None,
-        timeout: Union[float, int] = 0,
+        timeout: Optional[Union[float, int]] = None,
     ):
         """
         Waits for the event to be triggered.
@@ -54,9 +64,30 @@ class EventHandler(CommandHandler):
                 return True
 
         self.wait_for_events[event_name.lower()].append((future, check))
-        return asyncio.wait_for(future, timeout=timeout)
+        return asyncio.wait_for(future, timeout=timeout or None)
+
+    def event(
+        self,
+        event_name: Optional[str] = None,
+        *,
+        concurrency: Optional[int] = None,
+        ordered_by: Optional[str] = None,
+    ):
+        """
+        Registers a listener for an event.
+
+        Parameters
+        ----------
+        event_name : Optional[str]
+            The name of the event, defaults to the name of the function.
+        concurrency : Optional[int]
+            How many listener calls for this event may run at once.
+        ordered_by : Optional[str]
+            Either ``"guild"`` or ``"channel"``. Listener calls for this event
+            then run one at a time, in the order the events were received,
+            for each guild or channel.
+        """
 
-    def event(self, event_name: Optional[str] = None):
         def register_event(func):
             func_name = event_name or func.__name__.lower()
 
@@ -65,6 +96,12 @@ class EventHandler(CommandHandler):
 
             self.events[func_name].append(func)
 
+            if concurrency is not None:
+                self.scheduler.set_concurrency(func_name, concurrency)
+
+            if ordered_by is not None:
+                self.scheduler.set_ordering(func_name, ordered_by)
+
             return Event(func, event_name=func_name)
 
         return register_event
@@ -81,33 +118,71 @@ class EventHandler(CommandHandler):
 
     async def handle_hello(self, event: Dict):
         self.interval = event["d"]["heartbeat_interval"]
-
-        async def wrapper():
-            while True:
-                await self.heartbeat(False)
-
-        asyncio.create_task(wrapper())
-        await self.identify()  # type: ignore
+        self.heartbeat_supervisor.start(self.interval)  # type: ignore
+        await self.identify_or_resume()  # type: ignore
 
     def handle_heartbeat_ack(self, event):
         heartbeat_ack_time = perf_counter_ns()
+        self.heartbeat_supervisor.ack()  # type: ignore
         self.discord_latency: int = heartbeat_ack_time - self.heartbeat_time
         self.latencies.append(self.discord_latency)
-        self.heartbeats.append(event["d"])
+
+    async def _handle_dispatches(self):
+        while True:
+            event = await self._dispatches.get()  # type: ignore
+
+            try:
+                await self.handle_event(event)
+            except Exception as e:
+                logger.exception(f"Error dispatching {event['t']}: {e}")
+
+    async def _wait_to_queue(self, event: dict):
+        # Reading stops until the listeners catch up, so the ACKs of the
+        # heartbeats sent meanwhile only get read afterwards.
+        logger.warning(
+            f"{self._dispatches.qsize()} DISPATCHes are queued, "  # type: ignore
+            "waiting for them before reading the Gateway any further."
+        )
+        self.heartbeat_supervisor.pause()  # type: ignore
+
+        try:
+            await self._dispatches.put(event)  # type: ignore
+        finally:
+            self.heartbeat_supervisor.unpause()  # type: ignore
+
+    def stop_dispatching(self):
+        """Drops the DISPATCHes not handled yet."""
+        if self._dispatching is not None:
+            self._dispatching.cancel()
+
+        self._dispatches = self._dispatching = None
 
     async def handle_events(self):
-        async for event in self.ws:
-            event = event.json()
-            logger.debug(f"Received {event} from Discord.")
+        # Kept across reconnects, so DISPATCHes are still handled in order.
+        if self._dispatching is None or self._dispatching.done():
+            self._dispatches = asyncio.Queue(self.scheduler.max_pending)
+            self._dispatching = asyncio.create_task(self._handle_dispatches())
+
+        async for message in self.ws:
+            if traced := gateway_tracer.sampled():
+                received_at = perf_counter()
+
+            event = message.json()
+
+            if traced:
+                decoded_at = perf_counter()
 
             if event["op"] == GatewayOpcode.HELLO:
-                await self.handle_hello()
+                await self.handle_hello(event)
 
             elif event["op"] == GatewayOpcode.DISPATCH:
-                await self.handle_event(event)
+                if self._dispatches.full():  # type: ignore
+                    await self._wait_to_queue(event)
+                else:
+                    self._dispatches.put_nowait(event)  # type: ignore
 
             elif event["op"] == GatewayOpcode.HEARTBEAT:
-                await self.heartbeat(True)
+                await self.heartbeat_supervisor.beat()  # type: ignore
 
             elif event["op"] == GatewayOpcode.HEARTBEAT_ACK:
                 self.handle_heartbeat_ack(event)
@@ -115,43 +190,82 @@ class EventHandler(CommandHandler):
             elif event["op"] == GatewayOpcode.RECONNECT:
                 await self.reconnect()
 
-            elif event["op"] == GatewayOpcode.RESUMED:
-                logger.debug(
-                    "Connection successfully resumed and all proceeding events are new."
+            elif event["op"] == GatewayOpcode.INVALID_SESSION:
+                await self.handle_invalid_session(event["d"])  # type: ignore
+
+            if traced:
+                gateway_tracer.emit(
+                    "gateway.receive",
+                    op=event["op"],
+                    t=event.get("t"),
+                    s=event.get("s"),
+                    size=len(message.data),
+                    decode=decoded_at - received_at,
+                    handle=perf_counter() - decoded_at,
                 )
 
-        await self.handle_close()
+    def _route(self, event_type: str) -> Tuple[Optional[Callable], str]:
+        """
+        Returns the parser of an event type and the name its listeners are
+        registered under, looking them up the first time the type is received.
+        """
+        name = event_type.lower()
+        parser = getattr(self, f"_{name}", None)
 
-    async def handle_event(self, event: dict):
+        if not parser:
+            logger.warning(
+                f"EpikCord has no event handler for event {event_type}, meaning that none of your event handlers are going to be called."
+            )
+
+        route = self._routes[event_type] = (parser, name)
+        return route
 
+    async def handle_event(self, event: dict):
         self.sequence = event["s"]
+        event_type = event["t"]
+        parser, name = self._routes.get(event_type) or self._route(event_type)
 
-        results_from_event = event["d"]
+        if not parser:
+            return
 
-        if hasattr(self, event["t"].lower()):
-            try:
-                await getattr(self, f"_{event['t'].lower()}")(results_from_event)  # type: ignore
-            except Exception as e:
-                logger.exception(f"Error handling event {event['t']}: {e}")
+        try:
+            result = await parser(event["d"])
+        except Exception as e:
+            logger.exception(f"Error handling event {event_type}: {e}")
+            return
+
+        # Parsers return what the listeners are called with, or None if there
+        # is nothing to dispatch (or they've already dispatched it themselves).
+        if result is None:
+            return
+
+        if isinstance(result, tuple):
+            await self._dispatch(name, *result)
         else:
-            logger.warning(
-                f"EpikCord has no event handler for event {event['t']}, meaning that none of your event handlers are going to be called."
-            )
+            await self._dispatch(name, result)
 
     async def dispatch(self, event_name: str, *args, **kwargs):
+        await self._dispatch(event_name.lower(), *args, **kwargs)
 
-        callbacks = self.events.get(event_name.lower())
-        logger.info(f"Calling {len(callbacks)} for {event_name}")  # type: ignore
+    async def _dispatch(self, event_name: str, *args, **kwargs):
+        # ``event_name`` is already lowercase.
+        if callbacks := self.events.get(event_name):
+            if logger.isEnabledFor(DEBUG):
+                logger.debug(f"Calling {len(callbacks)} listeners for {event_name}")
 
-        for callback in callbacks:  # type: ignore
-            await callback(*args, **kwargs)
+            for callback in callbacks:
+                await self.scheduler.schedule(event_name, callback, *args, **kwargs)
 
-        if not (wait_for_callbacks := self.wait_for_events.get(event_name.lower())):
+        if not (wait_for_callbacks := self.wait_for_events.get(event_name)):
             return
 
-        for future, check in wait_for_callbacks:
-            if check(*args):
+        for future, check in list(wait_for_callbacks):
+            if future.done():
+                wait_for_callbacks.remove((future, check))
+
+            elif check(*args):
                 future.set_result(args)
+                wait_for_callbacks.remove((future, check))
 
     @staticmethod
     async def _voice_server_update(data: Dict):
@@ -174,11 +288,10 @@ class EventHandler(CommandHandler):
             self, data
         )  # TODO: Make this return something like (VoiceState, Member) or make VoiceState get Member from member_id
 
-    async def _guild_members_chunk(self, data: dict):
-        ...
-
     async def _guild_delete(self, data: dict):
         guild = self.guilds.remove_from_cache(data["id"])  # type: ignore
+        for channel in self.channels.remove_guild(data["id"]):  # type: ignore
+            self.messages.remove_channel(channel.id)  # type: ignore
 
         if guild:
             await self.dispatch("guild_delete", guild)
@@ -193,22 +306,112 @@ class EventHandler(CommandHandler):
         self.channels.add_to_cache(channel.id, channel)  # type: ignore
         return channel
 
+    async def _channel_update(self, data: dict):
+        before = self.channels.get(data["id"])  # type: ignore
+        after = self.utils.channel_from_type(data)  # type: ignore
+        self.channels.add_to_cache(after.id, after)  # type: ignore
+        return before, after
+
+    async def _channel_delete(self, data: dict):
+        channel = self.channels.remove_from_cache(data["id"])  # type: ignore
+        self.messages.remove_channel(data["id"])  # type: ignore
+
+        # Deleting a channel deletes its threads too.
+        for thread in self.channels.from_parent(data["id"]):  # type: ignore
+            self.channels.remove_from_cache(thread.id)  # type: ignore
+            self.messages.remove_channel(thread.id)  # type: ignore
+
+        return channel or self.utils.channel_from_type(data)  # type: ignore
+
+    async def _thread_create(self, data: dict):
+        return await self._channel_create(data)
+
+    async def _thread_update(self, data: dict):
+        return await self._channel_update(data)
+
+    async def _thread_delete(self, data: dict):
+        # Only the IDs, type and parent of the thread are sent.
+        self.messages.remove_channel(data["id"])  # type: ignore
+        return self.channels.remove_from_cache(data["id"]) or data  # type: ignore
+
+    async def _thread_list_sync(self, data: dict):
+        from EpikCord import Thread
+
+        # Sent when gaining access to channels, with their active threads.
+        # Cached threads of those channels that aren't in it aren't active.
+        parent_ids = data.get("channel_ids") or [
+            channel.id
+            for channel in self.channels.from_guild(data["guild_id"])  # type: ignore
+            if not isinstance(channel, Thread)
+        ]
+        active = {thread["id"] for thread in data["threads"]}
+
+        for parent_id in parent_ids:
+            for thread in self.channels.from_parent(parent_id):  # type: ignore
+                if isinstance(thread, Thread) and thread.id not in active:
+                    self.channels.remove_from_cache(thread.id)  # type: ignore
+
+        threads = [
+            self.utils.channel_from_type(thread)  # type: ignore
+            for thread in data["threads"]
+        ]
+
+        for thread in threads:
+            self.channels.add_to_cache(thread.id, thread)  # type: ignore
+
+        return threads
+
     async def _message_create(self, data: dict):
         """Event fired when messages are created"""
         from EpikCord import Message
 
         message = Message(self, data)
-        message.channel = self.channels.get(  # type: ignore
-            message.channel_id
-        ) or await self.channels.fetch(
-            message.channel_id
-        )  # type: ignore
+        message.channel = message.channel or await self.channels.fetch(  # type: ignore
+            data["channel_id"]
+        )
         message.channel.last_message = message
+        self.messages.add_to_cache(message.id, message)  # type: ignore
 
         return message
 
+    async def _message_update(self, data: dict):
+        from EpikCord import Message
+
+        before = self.messages.get(int(data["id"]))  # type: ignore
+
+        # Edits send the whole message, but embeds Discord adds to links only
+        # send what changed, which is only of use on top of the cached one.
+        if "author" in data:
+            after = Message(self, data)
+        elif before is not None:
+            after = copy(before)
+            after.update(data)
+        else:
+            return None, data
+
+        if before is not None:
+            after.channel = before.channel
+
+        self.messages.add_to_cache(after.id, after)  # type: ignore
+        return before, after
+
+    async def _message_delete(self, data: dict):
+        return self.messages.remove_from_cache(int(data["id"])) or data  # type: ignore
+
+    async def _message_delete_bulk(self, data: dict):
+        # Messages that weren't cached are given like MESSAGE_DELETE gives them.
+        return [
+            self.messages.remove_from_cache(int(message_id))  # type: ignore
+            or {
+                "id": message_id,
+                "channel_id": data["channel_id"],
+                "guild_id": data.get("guild_id"),
+            }
+            for message_id in data["ids"]
+        ]
+
     async def _guild_create(self, data):
-        from EpikCord import Guild, Thread, UnavailableGuild
+        from EpikCord import Guild, UnavailableGuild
 
         if data.get("unavailable") is None:
             return  # TODO: Maybe a different event where the name says the Bot is removed on startup.
@@ -222,40 +425,138 @@ class EventHandler(CommandHandler):
         if not guild:
             return
 
+        previous = self.guilds.get(guild.id)  # type: ignore
+
+        if isinstance(guild, Guild) and getattr(previous, "members", None):
+            # Large guilds are sent with only some of their members, keep the
+            # ones cached before (restored from a snapshot, or chunked).
+            for member_id, member in previous.members.cache.items():  # type: ignore
+                if member_id not in guild.members:
+                    guild.members.add_to_cache(member_id, member)
+
         self.guilds.add_to_cache(guild.id, guild)
 
-        for channel in data["channels"]:
-            self.channels.add_to_cache(
-                data["id"], self.utils.channel_from_type(channel)
+        if isinstance(guild, Guild) and self.lazy_models:
+            # Reading guild.channels would build them all, so they're only
+            # built once one of them is looked up.
+            self.channels.defer_guild(
+                guild,
+                [
+                    channel["id"]
+                    for key in ("channels", "threads")
+                    for channel in data.get(key, ())
+                ],
             )
+        elif isinstance(guild, Guild):
+            for channel in guild.channels:
+                self.channels.add_to_cache(channel.id, channel)
 
-        for thread in data["threads"]:
-            self.channels.add_to_cache(data["id"], Thread(self, thread))
+        if chunker := getattr(self, "startup_chunker", None):
+            # Only large guilds are sent without all of their members.
+            chunker.add(guild.id, isinstance(guild, Guild) and data.get("large"))
 
         return guild
 
         # TODO: Add other attributes to cache
 
+    def _member_cache(self, guild_id: str):
+        # Unavailable (and uncached) guilds don't have a member cache.
+        return getattr(self.guilds.get(guild_id), "members", None)  # type: ignore
+
+    async def _guild_member_add(self, data):
+        from EpikCord import GuildMember
+
+        member = GuildMember(self, data)
+
+        if (members := self._member_cache(data["guild_id"])) is not None:
+            members.add_to_cache(member.id, member)
+
+        return member
+
     async def _guild_member_update(self, data):
         from EpikCord import GuildMember
 
-        guild_member = GuildMember(self, data)
-        return self.members.get(data["id"]), guild_member
+        # The user is updated in place, so ``before`` only has the old member
+        # attributes (nick, roles and so on), not the old username or avatar.
+        after = GuildMember(self, data)
+        before = None
+
+        if (members := self._member_cache(data["guild_id"])) is not None:
+            before = members.get(after.id)
+            members.add_to_cache(after.id, after)
+
+        return before, after
+
+    async def _guild_member_remove(self, data):
+        from EpikCord import User
+
+        member = None
+
+        if (members := self._member_cache(data["guild_id"])) is not None:
+            member = members.remove_from_cache(data["user"]["id"])
+
+        return member or User.from_payload(self, data["user"])
+
+    async def _guild_members_chunk(self, data: dict):
+        from EpikCord import GuildMember
+
+        chunk = [GuildMember(self, member) for member in data["members"]]
+
+        if (members := self._member_cache(data["guild_id"])) is not None:
+            for member in chunk:
+                members.add_to_cache(member.id, member)
+
+        requests = getattr(self, "member_requests", {})
+
+        if request := requests.get(data.get("nonce")):
+            request.feed(data, chunk)
+
+            if request.done:
+                del requests[request.nonce]
+
+        return data["guild_id"], chunk
+
+    async def _user_update(self, data):
+        # Only ever sent about the client's own user.
+        self.users.upsert(data)  # type: ignore
+
+        user = getattr(self, "user", None)
+
+        if user:
+            user.__init__(self, data)
+
+        return user
 
     async def _ready(self, data: dict):
         from EpikCord import ClientApplication, ClientUser
 
+        guild_ids = {guild["id"] for guild in data["guilds"]}
+
+        # Guilds cached from before this session (restored from a snapshot,
+        # or a session that was invalidated) that the client has left since.
+        for guild_id in set(self.guilds.cache) - guild_ids:  # type: ignore
+            self.guilds.remove_from_cache(guild_id)  # type: ignore
+            self.channels.remove_guild(guild_id)  # type: ignore
+
+        if chunker := getattr(self, "startup_chunker", None):
+            chunker.start(guild_ids)
+
         self.user: ClientUser = ClientUser(self, data["user"])
         self.session_id: Optional[str] = data["session_id"]
+        self.resume_gateway_url: Optional[str] = data.get("resume_gateway_url")
         application_response = await self.http.get("/oauth2/applications/@me")  # type: ignore
         application_data = await application_response.json()
 
         self.application: ClientApplication = ClientApplication(self, application_data)
 
-        if not self.overwrite_commands_on_ready:  # type: ignore
-            return
+        if self.overwrite_commands_on_ready:  # type: ignore
+            await self.utils.override_commands()  # type: ignore
+
+        await self.dispatch("ready")
 
-        await self.utils.overwrite_commands()  # type: ignore
+    async def _resumed(self, _):
+        await self.handle_resumed()  # type: ignore
+        await self.dispatch("resumed")
 
     async def command_error(self, interaction, error: Exception):
         logger.exception(error)
@@ -0,0 +1,147 @@
+import asyncio
+import heapq
+import itertools
+from logging import getLogger
+from time import monotonic
+from typing import Dict, List, Optional, Tuple
+
+from ..opcodes import GatewayOpcode
+
+logger = getLogger(__name__)
+
+# Sent ahead of everything else, a late heartbeat or IDENTIFY costs the session.
+_PRIORITY_OPCODES = frozenset(
+    (GatewayOpcode.HEARTBEAT, GatewayOpcode.IDENTIFY, GatewayOpcode.RESUME)
+)
+
+
+class GatewayRateLimiter:
+    """
+    Keeps what a connection sends to the Gateway under Discord's limit of 120
+    payloads every 60 seconds, going over which gets the connection closed.
+
+    Payloads take a token from a bucket refilling at ``limit`` every ``per``
+    seconds, waiting in a queue when there are none left. Heartbeats,
+    IDENTIFYs and RESUMEs go to the front of the queue, and the last
+    ``reserved`` tokens are kept for them so they're never held up by a burst
+    of presence updates or member requests.
+
+    Attributes
+    ----------
+    limit : int
+        The amount of payloads allowed every ``per`` seconds.
+    per : float
+        The length of the rate limit window.
+    reserved : int
+        The amount of tokens only priority payloads may take.
+    sent : int
+        The amount of payloads let through.
+    queued : int
+        The amount of payloads that had to wait for a token.
+    max_depth : int
+        The most payloads that were waiting at once.
+    """
+
+    def __init__(self, limit: int = 120, per: float = 60.0, reserved: int = 5):
+        self.limit: int = limit
+        self.per: float = per
+        self.reserved: int = reserved
+        self.tokens: float = limit
+        self.sent: int = 0
+        self.queued: int = 0
+        self.max_depth: int = 0
+        self._last_refill: float = monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._counter = itertools.count()
+        self._drainer: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def priority_of(payload: dict) -> int:
+        """Returns the lane of a payload, ``0`` being the priority one."""
+        return 0 if payload.get("op") in _PRIORITY_OPCODES else 1
+
+    @property
+    def depth(self) -> int:
+        """The amount of payloads waiting for a token."""
+        return sum(not future.done() for *_, future in self._waiters)
+
+    def reset(self):
+        """Refills the bucket, each new connection has its own limit."""
+        self.tokens = self.limit
+        self._last_refill = monotonic()
+
+    def _refill(self):
+        now = monotonic()
+        self.tokens = min(
+            self.limit, self.tokens + (now - self._last_refill) * self.limit / self.per
+        )
+        self._last_refill = now
+
+    def _needed(self, priority: int) -> float:
+        return 1 if priority == 0 else 1 + self.reserved
+
+    async def acquire(self, priority: int = 1):
+        """Waits for a token to send a payload of the ``priority`` lane."""
+        self._refill()
+
+        if (
+            not self._waiters or priority < self._waiters[0][0]
+        ) and self.tokens >= self._needed(priority):
+            self.tokens -= 1
+            self.sent += 1
+            return
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._counter), future))
+        self.queued += 1
+        self.max_depth = max(self.max_depth, len(self._waiters))
+        logger.debug(
+            f"Out of Gateway sends, {len(self._waiters)} payloads are waiting."
+        )
+
+        # A payload jumping the queue may need fewer tokens than the one the
+        # drainer is sleeping for, so it starts over.
+        if self._drainer is not None and self._waiters[0][2] is future:
+            self._drainer.cancel()
+            self._drainer = None
+
+        if self._drainer is None:
+            self._drainer = asyncio.create_task(self._drain())
+
+        await future
+
+    async def _drain(self):
+        try:
+            while self._waiters:
+                priority, _, future = self._waiters[0]
+
+                if future.done():  # Cancelled while waiting.
+                    heapq.heappop(self._waiters)
+                    continue
+
+                self._refill()
+                needed = self._needed(priority)
+
+                if self.tokens < needed:
+                    await asyncio.sleep((needed - self.tokens) * self.per / self.limit)
+                    continue
+
+                heapq.heappop(self._waiters)
+                self.tokens -= 1
+                self.sent += 1
+                future.set_result(None)
+        finally:
+            if self._drainer is asyncio.current_task():
+                self._drainer = None
+
+    def to_dict(self) -> Dict[str, float]:
+        return {
+            "tokens": self.tokens,
+            "depth": self.depth,
+            "sent": self.sent,
+            "queued": self.queued,
+            "max_depth": self.max_depth,
+        }
+
+
+__all__ = ("GatewayRateLimiter",)
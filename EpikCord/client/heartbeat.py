@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import asyncio
+import random
+from bisect import bisect_left
+from logging import getLogger
+from time import perf_counter
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+if TYPE_CHECKING:
+    from .websocket_client import WebsocketClient
+
+logger = getLogger(__name__)
+
+
+class LatencyHistogram:
+    """
+    Counts heartbeat latencies into buckets, so their distribution can be
+    looked at over the whole life of a connection without keeping every one.
+
+    Attributes
+    ----------
+    bounds : Tuple[float, ...]
+        The upper bounds of the buckets, in milliseconds. Anything slower
+        ends up in one last bucket.
+    counts : List[int]
+        How many latencies fell into each bucket.
+    count : int
+        How many latencies were recorded.
+    total : float
+        The sum of every latency recorded, in milliseconds.
+    """
+
+    default_bounds = (25.0, 50.0, 75.0, 100.0, 150.0, 250.0, 500.0, 1000.0, 2500.0)
+
+    def __init__(self, bounds: Optional[Tuple[float, ...]] = None):
+        self.bounds: Tuple[float, ...] = tuple(sorted(bounds or self.default_bounds))
+        self.counts: List[int] = [0] * (len(self.bounds) + 1)
+        self.count: int = 0
+        self.total: float = 0.0
+        self.max: float = 0.0
+
+    def record(self, latency: float):
+        """Records a latency, in milliseconds."""
+        self.counts[bisect_left(self.bounds, latency)] += 1
+        self.count += 1
+        self.total += latency
+        self.max = max(self.max, latency)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else 0.0
+
+    def percentile(self, percentile: float) -> float:
+        """
+        Returns the upper bound of the bucket the ``percentile``\\th latency
+        fell into, or the slowest latency seen if it was past the last bound.
+        """
+        if not self.count:
+            return 0.0
+
+        rank = percentile / 100 * self.count
+        seen = 0
+
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+
+        return self.max
+
+    def to_dict(self) -> Dict:
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "max": self.max,
+            "p50": self.percentile(50),
+            "p99": self.percentile(99),
+            "buckets": {
+                **{
+                    f"<={bound:g}": count
+                    for bound, count in zip(self.bounds, self.counts)
+                },
+                f">{self.bounds[-1]:g}": self.counts[-1],
+            },
+        }
+
+
+class HeartbeatSupervisor:
+    """
+    Heartbeats for a :class:`WebsocketClient` and notices when Discord stops
+    answering.
+
+    The first heartbeat is sent after a random fraction of the interval, as
+    Discord asks, so clients reconnecting together don't heartbeat together.
+    If a heartbeat hasn't been ACKed by the time the next one is due, the
+    connection is a zombie: it is dropped and the session resumed.
+
+    Attributes
+    ----------
+    client : WebsocketClient
+        The client heartbeating.
+    interval : Optional[float]
+        The heartbeat interval of the current connection, in seconds.
+    acked : bool
+        Whether the last heartbeat sent was ACKed.
+    histogram : LatencyHistogram
+        Every heartbeat latency of the client.
+    paused : bool
+        Whether the client stopped reading the Gateway itself, in which case
+        missing ACKs don't make the connection a zombie.
+    """
+
+    def __init__(self, client: WebsocketClient):
+        self.client: WebsocketClient = client
+        self.interval: Optional[float] = None
+        self.acked: bool = True
+        self.histogram: LatencyHistogram = LatencyHistogram()
+        self.paused: bool = False
+        self._sent_at: Optional[float] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self, interval: float):
+        """Starts heartbeating every ``interval`` milliseconds."""
+        self.stop()
+        self.interval = interval / 1000
+        self.acked = True
+        self._sent_at = None
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def pause(self):
+        """Stops looking for zombie connections while the Gateway isn't read."""
+        self.paused = True
+
+    def unpause(self):
+        self.paused = False
+        # The ACK of the last heartbeat may still be waiting to be read.
+        self.acked = True
+
+    async def beat(self):
+        """Sends a heartbeat now, like when Discord asks for one."""
+        self._sent_at = perf_counter()
+        await self.client.heartbeat()
+
+    def ack(self) -> Optional[float]:
+        """Marks the last heartbeat as ACKed, returning its latency in seconds."""
+        self.acked = True
+
+        if self._sent_at is None:
+            return None
+
+        latency = perf_counter() - self._sent_at
+        self._sent_at = None
+        self.histogram.record(latency * 1000)
+        return latency
+
+    async def _run(self):
+        await asyncio.sleep(self.interval * random.random())  # type: ignore
+
+        while True:
+            if not self.acked and not self.paused:
+                logger.warning(
+                    f"No heartbeat ACK in {self.interval}s, the connection is a "
+                    "zombie. Reconnecting."
+                )
+                self._task = None
+                await self.client._drop_connection()
+                return
+
+            self.acked = False
+
+            try:
+                await self.beat()
+            except ConnectionError as e:
+                logger.warning(f"Couldn't send a heartbeat: {e}")
+
+            logger.debug("Sent a heartbeat!")
+            await asyncio.sleep(self.interval)  # type: ignore
+
+
+__all__ = ("HeartbeatSupervisor", "LatencyHistogram")
@@ -1,24 +1,36 @@
 import asyncio
-import contextlib
+import re
 import zlib
 from importlib.util import find_spec
 from logging import getLogger
-from typing import Any, Dict, Optional, Union
+from time import monotonic, perf_counter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
 
-from aiohttp import ClientSession, ClientWebSocketResponse
+from aiohttp import ClientResponse, ClientSession, ClientWebSocketResponse, WSMsgType
 
 from ..exceptions import (
     DiscordAPIError,
     DiscordServerError5xx,
     Forbidden403,
     NotFound404,
+    Ratelimited429,
 )
 from ..status_code import HTTPCodes
+from .ratelimit_backend import InMemoryRateLimitBackend, RateLimitBackend
+from .tracing import http_tracer
 
 logger = getLogger(__name__)
 
 _ORJSON = find_spec("orjson")
 
+_MAJOR_PARAMETER = re.compile(r"(?:channels|guilds)/\d+|webhooks/\d+(?:/[^/?]+)?")
+_SNOWFLAKE = re.compile(r"\d{15,20}")
+_REACTION = re.compile(r"(/reactions/)[^/]+")
+# Interaction responses aren't bound by the global rate limit.
+_GLOBAL_EXEMPT_ROUTES = ("POST interactions/",)
+# The keyword arguments a GET may have and still be merged with identical ones.
+_COALESCABLE_KWARGS = frozenset(("params", "guild_id", "channel_id"))
+
 
 if _ORJSON:
     import orjson as json
@@ -27,61 +39,281 @@ else:
     import json  # type: ignore
 
 
-class _FakeTask:
-    def cancel(self):
-        return True
-
+class RateLimitStats:
+    """
+    Counters for the requests made through a :class:`HTTPClient`.
+
+    Attributes
+    ----------
+    requests : int
+        The amount of requests sent to Discord.
+    queued : int
+        The amount of requests that had to wait behind another request of the
+        same bucket.
+    throttled : int
+        The amount of requests that were held back until their bucket reset.
+    ratelimited : int
+        The amount of 429 responses received.
+    coalesced : int
+        The amount of GET requests that weren't sent, because an identical
+        one was already in flight and its response was shared.
+    """
 
-class UnknownBucket:
     def __init__(self):
-        self.event = asyncio.Event()
-        self.close_task: _FakeTask = _FakeTask()
-
-
-class Bucket(UnknownBucket):
-    def __init__(self, *, discord_hash: str):
-        super().__init__()
-        self.bucket_hash = discord_hash
+        self.requests: int = 0
+        self.queued: int = 0
+        self.throttled: int = 0
+        self.ratelimited: int = 0
+        self.coalesced: int = 0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "requests": self.requests,
+            "queued": self.queued,
+            "throttled": self.throttled,
+            "ratelimited": self.ratelimited,
+            "coalesced": self.coalesced,
+        }
+
+
+class Bucket:
+    """
+    A token bucket mirroring one of Discord's rate limit buckets.
+
+    Requests take a token before being sent and wait for the bucket to reset
+    once there are none left, the lock makes them do so in the order they were
+    made. Until a response has told us the limits of the bucket only one request
+    is let through at a time.
+    """
+
+    def __init__(self, *, discord_hash: Optional[str] = None):
+        self.bucket_hash: Optional[str] = discord_hash
+        self.limit: int = 1
+        self.remaining: int = 1
+        self.reset_at: float = 0.0
+        self.window: float = 0.0
+        self.synced: bool = False
+        self.inflight: int = 0
+        self.lock: asyncio.Lock = asyncio.Lock()
+        self.last_used: float = monotonic()
 
     def __eq__(self, other):
         return self.bucket_hash == other.bucket_hash
 
+    def __hash__(self):
+        return hash(self.bucket_hash)
+
+    async def acquire(self, stats: RateLimitStats):
+        now = monotonic()
+        self.last_used = now
+
+        if self.remaining <= 0 and now < self.reset_at:
+            stats.throttled += 1
+            logger.debug(
+                f"Bucket {self.bucket_hash} is exhausted, "
+                f"waiting {self.reset_at - now:.2f} seconds for it to reset."
+            )
+            await asyncio.sleep(self.reset_at - now)
+
+        if (now := monotonic()) >= self.reset_at:
+            # A new window starts with this request.
+            self.remaining = self.limit
+            self.reset_at = now + self.window
+
+        self.remaining -= 1
+        self.inflight += 1
+
+    def release(self):
+        self.inflight -= 1
+
+    def update(self, headers):
+        if "X-RateLimit-Remaining" not in headers:
+            return
+
+        reset_after = float(headers["X-RateLimit-Reset-After"])
+
+        self.limit = int(headers.get("X-RateLimit-Limit", self.limit))
+        self.window = max(self.window, reset_after)
+        # Discord hasn't counted the requests still in flight when it sent this,
+        # leave room for them so they can never push the bucket over its limit.
+        self.remaining = max(int(headers["X-RateLimit-Remaining"]) - self.inflight, 0)
+        self.reset_at = max(self.reset_at, monotonic() + reset_after)
+        self.synced = True
+
+    def exhaust(self, retry_after: float):
+        self.remaining = 0
+        self.reset_at = max(self.reset_at, monotonic() + retry_after)
+
+
+class DiscordResponse:
+    """
+    A response from Discord, whose body :meth:`HTTPClient.request` has read
+    and parsed once. :meth:`json` returns that parsed body, so callers reading
+    it again cost nothing. Anything else is looked up on the aiohttp response.
+
+    Attributes
+    ----------
+    response : ClientResponse
+        The aiohttp response.
+    status : int
+        The status code of the response.
+    body : Union[Dict, List, str]
+        The parsed body, or its text if it isn't JSON.
+    bucket : Optional[str]
+        The rate limit bucket of the route, if it has one.
+    remaining : Optional[int]
+        How many more requests the bucket allows before it resets.
+    reset_after : Optional[float]
+        How many seconds until the bucket resets.
+    """
+
+    __slots__ = ("response", "status", "body", "bucket", "remaining", "reset_after")
+
+    def __init__(self, response: ClientResponse, body: Union[Dict, List, str]):
+        headers = response.headers
+        remaining = headers.get("X-RateLimit-Remaining")
+        reset_after = headers.get("X-RateLimit-Reset-After")
+
+        self.response: ClientResponse = response
+        self.status: int = response.status
+        self.body: Union[Dict, List, str] = body
+        self.bucket: Optional[str] = headers.get("X-RateLimit-Bucket")
+        self.remaining: Optional[int] = (
+            int(remaining) if remaining is not None else None
+        )
+        self.reset_after: Optional[float] = (
+            float(reset_after) if reset_after is not None else None
+        )
+
+    async def json(self, **kwargs) -> Any:
+        if isinstance(self.body, str):
+            # Like a 204, which callers deleting something still read.
+            if not self.body:
+                return None
+
+            return await self.response.json(**kwargs)  # Raises, it isn't JSON.
+
+        return self.body
+
+    async def text(self) -> str:
+        return await self.response.text()
+
+    async def read(self) -> bytes:
+        return await self.response.read()
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.response, name)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DiscordResponse status={self.status} bucket={self.bucket} "
+            f"remaining={self.remaining}>"
+        )
+
 
 class DiscordWSMessage:
-    def __init__(self, *, data, type, extra):
+    def __init__(self, *, data, type, extra, loads: Callable[[Any], Any] = json.loads):
         self.data = data
         self.type = type
         self.extra = extra
+        self.loads = loads
 
     def json(self) -> Any:
-        return json.loads(self.data)
+        return self.loads(self.data)
 
 
-class DiscordGatewayWebsocket(ClientWebSocketResponse):
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
+ZLIB_SUFFIX = b"\x00\x00\xff\xff"
+
+
+class ZlibStreamInflator:
+    """Inflates the payloads of a ``zlib-stream`` gateway connection.
+
+    Discord shares one zlib context across the whole connection and flushes it
+    at the end of every payload, so a payload is only complete once a frame ends
+    with :data:`ZLIB_SUFFIX`. Payloads that arrive in a single frame are inflated
+    straight from the frame, split payloads are reassembled in a buffer that is
+    reused for the lifetime of the connection.
+
+    Attributes
+    ----------
+    bytes_in : int
+        The amount of compressed bytes received.
+    bytes_out : int
+        The amount of bytes those inflated to.
+    payloads : int
+        The amount of complete payloads inflated.
+    """
+
+    def __init__(self):
         self.buffer: bytearray = bytearray()
         self.inflator = zlib.decompressobj()
+        self.bytes_in: int = 0
+        self.bytes_out: int = 0
+        self.payloads: int = 0
 
-    async def receive(self, *args, **kwargs):
-        ws_message = await super().receive(*args, **kwargs)
-        message = ws_message.data
+    @property
+    def ratio(self) -> float:
+        return self.bytes_out / self.bytes_in if self.bytes_in else 0.0
+
+    def feed(self, data: bytes) -> Optional[bytes]:
+        """Feeds a frame to the inflator.
 
-        if isinstance(message, bytes):
+        Returns the inflated payload once it is complete, otherwise ``None``.
+        """
+        self.bytes_in += len(data)
 
-            self.buffer.extend(message)
+        if not self.buffer and data.endswith(ZLIB_SUFFIX):
+            payload = self.inflator.decompress(data)
 
-            if len(message) < 4 or message[-4:] != b"\x00\x00\xff\xff":
-                return
+        else:
+            self.buffer.extend(data)
 
-            message = self.inflator.decompress(self.buffer)
+            if not self.buffer.endswith(ZLIB_SUFFIX):
+                return None
 
-            message = message.decode("utf-8")
-            self.buffer: bytearray = bytearray()
+            with memoryview(self.buffer) as view:
+                payload = self.inflator.decompress(view)
 
-        return DiscordWSMessage(
-            data=message, type=ws_message.type, extra=ws_message.extra
-        )
+            del self.buffer[:]
+
+        self.bytes_out += len(payload)
+        self.payloads += 1
+        return payload
+
+
+class DiscordGatewayWebsocket(ClientWebSocketResponse):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.inflator: ZlibStreamInflator = ZlibStreamInflator()
+        self.loads: Callable[[Any], Any] = json.loads
+
+    async def receive(self, *args, **kwargs):
+        while True:
+            ws_message = await super().receive(*args, **kwargs)
+            message = ws_message.data
+
+            if isinstance(message, bytes):
+                message = self.inflator.feed(message)
+
+                if message is None:
+                    continue  # Wait for the rest of the payload.
+
+            elif ws_message.type == WSMsgType.CLOSE:
+                logger.debug(
+                    "Gateway connection closed after inflating %d payloads, "
+                    "%d bytes to %d bytes (%.2fx).",
+                    self.inflator.payloads,
+                    self.inflator.bytes_in,
+                    self.inflator.bytes_out,
+                    self.inflator.ratio,
+                )
+
+            return DiscordWSMessage(
+                data=message,
+                type=ws_message.type,
+                extra=ws_message.extra,
+                loads=self.loads,
+            )
 
 
 class HTTPClient(ClientSession):
@@ -89,6 +321,9 @@ class HTTPClient(ClientSession):
         self.base_uri: str = kwargs.pop(
             "discord_endpoint", "https://discord.com/api/v10"
         )
+        self.ratelimit_backend: RateLimitBackend = (
+            kwargs.pop("ratelimit_backend", None) or InMemoryRateLimitBackend()
+        )
         super().__init__(
             *args,
             **kwargs,
@@ -97,25 +332,92 @@ class HTTPClient(ClientSession):
             else json.dumps(x),
             ws_response_class=DiscordGatewayWebsocket,
         )
-        self.global_ratelimit: asyncio.Event = asyncio.Event()
-        self.global_ratelimit.set()
         self.buckets: Dict[str, Bucket] = {}
+        self.routes: Dict[str, Optional[str]] = {}
+        self.ratelimit_stats: RateLimitStats = RateLimitStats()
+        self._last_purge: float = monotonic()
+        self._in_flight: Dict[Tuple[str, str], asyncio.Task] = {}
+
+    @staticmethod
+    def _route(method: str, path: str, guild_id, channel_id) -> Tuple[str, str]:
+        """Returns the route and the major parameters a request is limited by."""
+        path = path.partition("?")[0]
+
+        if match := _MAJOR_PARAMETER.match(path):
+            major = match.group(0)
+        else:
+            major = f"{guild_id}:{channel_id}"
+
+        route = _SNOWFLAKE.sub("{id}", _REACTION.sub(r"\1{emoji}", path))
+
+        return f"{method} {route}", major
+
+    def _get_bucket(self, route: str, major: str) -> Optional[Bucket]:
+        now = monotonic()
+
+        if now - self._last_purge > 60:
+            self._last_purge = now
+            for key, bucket in list(self.buckets.items()):
+                if now - bucket.last_used > 300 and not bucket.lock.locked():
+                    del self.buckets[key]
+
+        if route not in self.routes:
+            return self.buckets.setdefault(f"{route}:{major}", Bucket())
+
+        if (bucket_hash := self.routes[route]) is None:
+            return None  # This route isn't rate limited.
+
+        key = f"{bucket_hash}:{major}"
+        if key not in self.buckets:
+            self.buckets[key] = Bucket(discord_hash=bucket_hash)
+
+        return self.buckets[key]
+
+    def _update_bucket(self, route: str, major: str, bucket: Bucket, headers):
+        bucket_hash = headers.get("X-RateLimit-Bucket")
+
+        if not bucket_hash:
+            self.routes.setdefault(route, None)
+            return
+
+        if bucket.bucket_hash is None:
+            # We've found out which bucket this route belongs to, move over.
+            self.buckets.pop(f"{route}:{major}", None)
+            bucket.bucket_hash = bucket_hash
+            bucket = self.buckets.setdefault(f"{bucket_hash}:{major}", bucket)
+
+        self.routes[route] = bucket_hash
+        bucket.update(headers)
+
+    async def _send(self, bucket, route, major, method, url, *args, **kwargs):
+        if not route.startswith(_GLOBAL_EXEMPT_ROUTES):
+            await self.ratelimit_backend.acquire_global()
+
+        self.ratelimit_stats.requests += 1
+
+        try:
+            res = await super().request(method, url, *args, **kwargs)
+        finally:
+            if bucket:
+                bucket.release()
+
+        if bucket:
+            self._update_bucket(route, major, bucket, res.headers)
+        elif res.headers.get("X-RateLimit-Bucket"):
+            self.routes.pop(route, None)  # It is rate limited after all.
+
+        return res
 
     async def request(  # type: ignore
         self,
         method,
         url,
         *args,
-        attempt: int = 1,
         to_discord=True,
         guild_id: Union[str, int] = 0,
         channel_id: Union[int, str] = 0,
         **kwargs,
     ):
-        if attempt > 5:
-            logger.critical(f"Failed a {method} {url} 5 times.")
-            return
-
         if url.startswith("ws") or not to_discord:
             return await super().request(method, url, *args, **kwargs)
 
@@ -125,71 +427,86 @@ class HTTPClient(ClientSession):
         if url.endswith("/"):
             url = url[:-1]
 
+        route, major = self._route(method, url, guild_id, channel_id)
         url = f"{self.base_uri}/{url}"
 
-        bucket_hash = f"{guild_id}:{channel_id}:{url}"
-        bucket: Union[Bucket, UnknownBucket] = self.buckets.get(
-            bucket_hash, UnknownBucket()
-        )
+        for _ in range(5):
+            if traced := http_tracer.sampled():
+                started_at = perf_counter()
+
+            bucket = self._get_bucket(route, major)
+            res = None
 
-        await bucket.event.wait()
-        await self.global_ratelimit.wait()
+            if bucket:
+                if bucket.lock.locked():
+                    self.ratelimit_stats.queued += 1
 
-        res = await super().request(method, url, *args, **kwargs)
+                async with bucket.lock:
+                    await bucket.acquire(self.ratelimit_stats)
 
-        await self.log_request(res, kwargs.get("json", kwargs.get("data", None)))
+                    if not bucket.synced:
+                        res = await self._send(
+                            bucket, route, major, method, url, *args, **kwargs
+                        )
 
-        if isinstance(bucket, UnknownBucket) and res.headers.get("X-RateLimit-Bucket"):
-            if guild_id or channel_id:
-                self.buckets[bucket_hash] = Bucket(
-                    discord_hash=res.headers["X-RateLimit-Bucket"]
+            if res is None:
+                res = await self._send(
+                    bucket, route, major, method, url, *args, **kwargs
                 )
 
+            # Read and parsed once here, callers get it through DiscordResponse.
+            body: Union[Dict, List, str] = {}
+            if res.headers.get("Content-Type", "").startswith("application/json"):
+                if raw := await res.read():
+                    body = json.loads(raw)
             else:
-                b = Bucket(discord_hash=res.headers["X-RateLimit-Bucket"])
-                if b in self.buckets.values():
-                    self.buckets[bucket_hash] = {v: k for k, v in self.buckets.items()}[
-                        b
-                    ]  # type: ignore
-                else:
-                    self.buckets[bucket_hash] = b
-        body: Union[Dict, str] = {}
-        if res.headers["Content-Type"] == "application/json":
-            body = await res.json()
-        else:
-            body = await res.text()
+                body = await res.text()
+
+            if traced:
+                await self.log_request(
+                    res,
+                    kwargs.get("json", kwargs.get("data", None)),
+                    route=route,
+                    bucket=bucket,
+                    duration=perf_counter() - started_at,
+                )
 
-        if res.status in range(200, 299):
-            bucket.event.set()
-            self.global_ratelimit.set()
-            return res
+            if res.status != HTTPCodes.TOO_MANY_REQUESTS:
+                break
 
-        if (
-            int(res.headers.get("X-RateLimit-Remaining", 1)) == 0
-            and res.status != HTTPCodes.TOO_MANY_REQUESTS
-        ):
-            logger.critical(
-                f"Exhausted {res.headers['X-RateLimit-Bucket']} ({res.url}). "
-                f"Reset in {res.headers['X-RateLimit-Reset-After']} seconds"
-            )
+            self.ratelimit_stats.ratelimited += 1
 
-            await asyncio.sleep(float(res.headers["X-RateLimit-Reset-After"]))
-        if res.status == HTTPCodes.TOO_MANY_REQUESTS:
-            time_to_sleep: Union[float, int] = (
-                body["retry_after"]  # type: ignore
-                if body["retry_after"] > res.headers["X-RateLimit-Reset-After"]  # type: ignore
-                else res.headers["X-RateLimit-Reset-After"]
+            retry_after = float(
+                body.get("retry_after", 0)  # type: ignore
+                if isinstance(body, dict)
+                else res.headers.get("Retry-After", 1)
             )
 
-            logger.critical(f"Rate limited. Reset in {time_to_sleep} seconds")
-            if res.headers["X-RateLimit-Scope"] == "global":
-                await self.global_ratelimit.clear()  # type: ignore
+            if res.headers.get("X-RateLimit-Scope") == "global" or (
+                isinstance(body, dict) and body.get("global")
+            ):
+                logger.critical(
+                    f"Globally rate limited. Reset in {retry_after} seconds"
+                )
+                await self.ratelimit_backend.lock_global(retry_after)
 
-            await asyncio.sleep(time_to_sleep)
+            else:
+                logger.critical(
+                    f"Rate limited on {route} "
+                    f"({res.headers.get('X-RateLimit-Bucket')}). "
+                    f"Reset in {retry_after} seconds"
+                )
+                if bucket:
+                    bucket.exhaust(retry_after)
+                else:
+                    await asyncio.sleep(retry_after)
 
-            await self.global_ratelimit.set()  # type: ignore
+        else:
+            logger.critical(f"Failed a {method} {url} 5 times.")
+            raise Ratelimited429(body)
 
-            return await self.request(method, url, *args, **kwargs, attempt=attempt + 1)
+        if 300 > res.status >= 200:
+            return DiscordResponse(res, body)
 
         if res.status >= HTTPCodes.SERVER_ERROR:
             raise DiscordServerError5xx(body)
@@ -200,63 +517,76 @@ class HTTPClient(ClientSession):
         elif res.status == HTTPCodes.FORBIDDEN:
             raise Forbidden403(body)
 
-        elif not 300 > res.status >= 200:
-            raise DiscordAPIError(body)
-
-        if not bucket.event.is_set():
-            try:
-                bucket.event.set()
-            except Exception as e:
-                logger.exception(e)
-
-        async def dispose():
-            await asyncio.sleep(300)
-
-            with contextlib.suppress(KeyError):
-                del self.buckets[bucket_hash]
-
-        bucket.close_task.cancel()
-
-        bucket.close_task = asyncio.get_event_loop().create_task(dispose())  # type: ignore
-
-        bucket.event.set()
-        self.global_ratelimit.set()
-
-        return res
+        raise DiscordAPIError(body)
 
     @staticmethod
-    async def log_request(res, body: Optional[dict] = None):
-        message = [
-            f"Sent a {res.request_info.method} to {res.url} "
-            f"and got a {res.status} response. ",
-            f"Content-Type: {res.headers['Content-Type']} ",
-        ]
-
-        if body:
-            message.append(f"Sent body: {body} ")
-
-        if h := dict(res.request_info.headers):
-            message.append(f"Sent headers: {h} ")
-
-        if h := dict(res.headers):
-            message.append(f"Received headers: {h} ")
+    async def log_request(
+        res,
+        body: Optional[Any] = None,
+        *,
+        route: Optional[str] = None,
+        bucket: Optional[Bucket] = None,
+        duration: Optional[float] = None,
+    ):
+        """
+        Traces a request once its response has been read, which ``read``
+        returns again without reading it twice. Headers and bodies aren't
+        logged, the token is in the former and the latter can be huge.
+        """
+        http_tracer.emit(
+            "http.request",
+            method=res.request_info.method,
+            route=route,
+            status=res.status,
+            bucket=bucket.bucket_hash if bucket else None,
+            remaining=bucket.remaining if bucket else None,
+            duration=duration,
+            sent=len(body) if isinstance(body, (bytes, str)) else None,
+            received=len(await res.read()),
+        )
 
-        try:
-            message.append(f"Received body: {await res.json()} ")
+    def _forget_in_flight(self, key: Tuple[str, str], task: asyncio.Task):
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
 
-        finally:
-            logger.debug("".join(message))
+        # Whoever awaited it got the exception, if anyone is left to.
+        if not task.cancelled():
+            task.exception()
 
     async def get(  # type: ignore
         self,
         url,
         *args,
         to_discord: bool = True,
+        coalesce: bool = True,
         **kwargs,
     ):
-        if to_discord:
+        """
+        Makes a GET request. Identical GETs to Discord made while one is in
+        flight aren't sent, they share its response instead. Its body was
+        parsed once for all of them, so it shouldn't be modified.
+        """
+        if not to_discord:
+            return await super().get(url, *args, **kwargs)
+
+        if not coalesce or args or not kwargs.keys() <= _COALESCABLE_KWARGS:
             return await self.request("GET", url, *args, **kwargs)
-        return await super().get(url, *args, **kwargs)
+
+        params = kwargs.get("params")
+        key = (
+            url.strip("/"),
+            repr(sorted(params.items()) if isinstance(params, dict) else params),
+        )
+
+        if (task := self._in_flight.get(key)) is not None:
+            self.ratelimit_stats.coalesced += 1
+        else:
+            task = asyncio.ensure_future(self.request("GET", url, **kwargs))
+            self._in_flight[key] = task
+            task.add_done_callback(lambda task: self._forget_in_flight(key, task))
+
+        # Shielded so one caller being cancelled doesn't cancel it for all.
+        return await asyncio.shield(task)
 
     async def post(self, url, *args, to_discord: bool = True, **kwargs):  # type: ignore
         if to_discord:
@@ -282,4 +612,4 @@ class HTTPClient(ClientSession):
         return await super().put(url, *args, **kwargs)
 
 
-__all__ = ("HTTPClient",)
+__all__ = ("DiscordResponse", "HTTPClient")
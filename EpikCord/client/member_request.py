@@ -0,0 +1,324 @@
+from __future__ import annotations
+
+import asyncio
+from collections import deque
+from logging import getLogger
+from time import monotonic
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    AsyncIterator,
+    Awaitable,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    List,
+    Optional,
+    Set,
+)
+
+from ..exceptions import InvalidArgumentType
+
+if TYPE_CHECKING:
+    from EpikCord import GuildMember
+
+logger = getLogger(__name__)
+
+
+class GuildMembersRequest:
+    """
+    A REQUEST_GUILD_MEMBERS sent to the Gateway, and the GUILD_MEMBERS_CHUNKs
+    answering it.
+
+    Iterate over it with ``async for`` to get the members as their chunks
+    arrive, or await it to get all of them once the last chunk has.
+
+    Attributes
+    ----------
+    guild_id : str
+        The ID of the guild the members are of.
+    nonce : str
+        The nonce the chunks of this request are identified by.
+    chunk_count : Optional[int]
+        The amount of chunks Discord is sending, once the first one arrived.
+    chunks_received : Set[int]
+        The indexes of the chunks received so far.
+    members : List[GuildMember]
+        Every member received so far.
+    not_found : List[str]
+        The requested user IDs that weren't members of the guild.
+    timeout : Optional[float]
+        How long to wait for the next chunk before giving up.
+    """
+
+    def __init__(self, guild_id: str, nonce: str, timeout: Optional[float] = 30.0):
+        self.guild_id: str = guild_id
+        self.nonce: str = nonce
+        self.chunk_count: Optional[int] = None
+        self.chunks_received: Set[int] = set()
+        self.members: List[GuildMember] = []
+        self.not_found: List[str] = []
+        self.timeout: Optional[float] = timeout
+        # Replaced by a new one every time a chunk arrives, after being set.
+        self._received: asyncio.Event = asyncio.Event()
+
+    @property
+    def done(self) -> bool:
+        return (
+            self.chunk_count is not None
+            and len(self.chunks_received) >= self.chunk_count
+        )
+
+    def feed(self, data: dict, members: List[GuildMember]):
+        """Adds the members of a chunk, ``data`` being its payload."""
+        self.chunk_count = data["chunk_count"]
+        self.chunks_received.add(data["chunk_index"])
+        self.members.extend(members)
+        self.not_found.extend(data.get("not_found", []))
+
+        received, self._received = self._received, asyncio.Event()
+        received.set()
+
+    async def __aiter__(self) -> AsyncIterator[GuildMember]:
+        # Every iteration goes through every member, however many there are.
+        index = 0
+
+        while True:
+            while index < len(self.members):
+                yield self.members[index]
+                index += 1
+
+            if self.done:
+                return
+
+            await asyncio.wait_for(self._received.wait(), self.timeout)
+
+    async def wait(self) -> List[GuildMember]:
+        """Waits for every chunk, returning all the members."""
+        async for _ in self:
+            pass
+
+        return self.members
+
+    def __await__(self):
+        return self.wait().__await__()
+
+    def __repr__(self) -> str:
+        return (
+            f"<GuildMembersRequest guild_id={self.guild_id} nonce={self.nonce} "
+            f"chunks={len(self.chunks_received)}/{self.chunk_count}>"
+        )
+
+
+async def request_many_guild_members(
+    request: Callable[[str], Awaitable[GuildMembersRequest]],
+    guild_ids: Iterable[str],
+    concurrency: int,
+) -> AsyncIterator[GuildMembersRequest]:
+    """
+    Requests the members of every guild with ``request``, with at most
+    ``concurrency`` requests unanswered at a time, yielding each request once
+    all of its chunks have arrived (or it timed out, leaving it not ``done``).
+    """
+    guild_ids = iter(guild_ids)
+    pending: Set[asyncio.Future] = set()
+
+    def request_next() -> bool:
+        guild_id = next(guild_ids, None)
+
+        if guild_id is None:
+            return False
+
+        async def run(guild_id: str) -> GuildMembersRequest:
+            members_request = await request(guild_id)
+
+            try:
+                await members_request.wait()
+            except asyncio.TimeoutError:
+                logger.warning(
+                    f"Timed out waiting for the member chunks of {guild_id}, "
+                    f"got {len(members_request.chunks_received)} of "
+                    f"{members_request.chunk_count}."
+                )
+
+            return members_request
+
+        pending.add(asyncio.ensure_future(run(guild_id)))
+        return True
+
+    try:
+        while len(pending) < concurrency and request_next():
+            pass
+
+        while pending:
+            done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+
+            for future in done:
+                pending.discard(future)
+                request_next()
+                yield future.result()
+
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+class StartupChunker:
+    """
+    Requests the members of the large guilds of a connection once it is
+    READY, so their member caches are filled without flooding the Gateway.
+
+    Guilds are queued as their GUILD_CREATEs arrive and requested in batches
+    of ``batch_size``, every request spaced out to stay at ``per_minute``
+    sends, well under the Gateway's limit of 120 a minute which heartbeats
+    and presence updates share. Once every guild of the READY has arrived and
+    been chunked, ``members_ready`` is dispatched with the chunker.
+
+    Attributes
+    ----------
+    client : WebsocketClient
+        The connection chunking, a shard when sharding.
+    per_minute : int
+        The most member requests to send a minute.
+    batch_size : int
+        How many requests to have in flight at once.
+    timeout : Optional[float]
+        How long to wait for the next chunk of a guild before giving up on it.
+    guild_timeout : float
+        How long to wait for the GUILD_CREATEs of the guilds still unavailable
+        before calling it done.
+    guilds_chunked : int
+        The amount of guilds whose members all arrived.
+    guilds_timed_out : int
+        The amount of guilds given up on.
+    members : int
+        The amount of members received.
+    """
+
+    def __init__(
+        self,
+        client,
+        *,
+        per_minute: int = 60,
+        batch_size: int = 10,
+        timeout: Optional[float] = 30.0,
+        guild_timeout: float = 60.0,
+    ):
+        if not 0 < per_minute <= 120:
+            raise InvalidArgumentType("per_minute must be between 1 and 120.")
+
+        if not client.intents.members:
+            logger.warning(
+                "Chunking guilds needs the members intent, which isn't enabled."
+            )
+
+        self.client = client
+        self.per_minute: int = per_minute
+        self.batch_size: int = batch_size
+        self.timeout: Optional[float] = timeout
+        self.guild_timeout: float = guild_timeout
+        self.guilds_chunked: int = 0
+        self.guilds_timed_out: int = 0
+        self.members: int = 0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+        self._unavailable: Set[str] = set()
+        self._queue: Deque[str] = deque()
+        self._queued: asyncio.Event = asyncio.Event()
+        self._next_send: float = 0.0
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    @property
+    def duration(self) -> Optional[float]:
+        """How many seconds chunking took, or has taken so far."""
+        if self.started_at is None:
+            return None
+
+        return (self.finished_at or monotonic()) - self.started_at
+
+    def start(self, guild_ids: Iterable[str]):
+        """Starts over for a new session with these (unavailable) guilds."""
+        self.stop()
+        self.guilds_chunked = self.guilds_timed_out = self.members = 0
+        self.started_at = monotonic()
+        self.finished_at = None
+        self._unavailable = set(guild_ids)
+        self._queue.clear()
+        self._task = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._task:
+            self._task.cancel()
+            self._task = None
+
+    def add(self, guild_id: str, chunk: bool):
+        """Marks a guild as arrived, queueing it if its members are wanted."""
+        self._unavailable.discard(guild_id)
+
+        if chunk and not self.done:
+            self._queue.append(guild_id)
+
+        self._queued.set()
+
+    async def _send(self, guild_id: str) -> GuildMembersRequest:
+        if (delay := self._next_send - monotonic()) > 0:
+            await asyncio.sleep(delay)
+
+        self._next_send = monotonic() + 60 / self.per_minute
+        return await self.client.request_guild_members(guild_id, timeout=self.timeout)
+
+    async def _run(self):
+        while self._queue or self._unavailable:
+            if not self._queue:
+                self._queued.clear()
+
+                try:
+                    await asyncio.wait_for(self._queued.wait(), self.guild_timeout)
+                except asyncio.TimeoutError:
+                    logger.warning(
+                        f"{len(self._unavailable)} guilds didn't become available "
+                        f"in {self.guild_timeout}s, not waiting for them."
+                    )
+                    break
+
+                continue
+
+            batch = [
+                self._queue.popleft()
+                for _ in range(min(self.batch_size, len(self._queue)))
+            ]
+            requests = [await self._send(guild_id) for guild_id in batch]
+
+            for request in requests:
+                try:
+                    await request
+                    self.guilds_chunked += 1
+                except asyncio.TimeoutError:
+                    self.guilds_timed_out += 1
+                    logger.warning(f"Timed out chunking the guild {request.guild_id}.")
+
+                self.members += len(request.members)
+
+        self.finished_at = monotonic()
+        self._task = None
+        logger.info(
+            f"Chunked {self.guilds_chunked} guilds ({self.members} members) in "
+            f"{self.duration:.2f}s, {self.guilds_timed_out} timed out."
+        )
+        await self.client.dispatch("members_ready", self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "guilds_chunked": self.guilds_chunked,
+            "guilds_timed_out": self.guilds_timed_out,
+            "members": self.members,
+            "duration": self.duration,
+        }
+
+
+__all__ = ("GuildMembersRequest", "StartupChunker", "request_many_guild_members")
@@ -0,0 +1,262 @@
+import asyncio
+import contextlib
+import os
+import socket
+from abc import ABC, abstractmethod
+from importlib.util import find_spec
+from logging import getLogger
+from time import monotonic
+from typing import Optional
+
+from ..exceptions import EpikCordException
+
+logger = getLogger(__name__)
+
+_FCNTL = find_spec("fcntl")
+
+if _FCNTL:
+    import fcntl
+
+
+class GlobalRateLimit:
+    """
+    Spaces requests out to stay under Discord's global rate limit.
+
+    This is a generic cell rate algorithm, so ``limit`` requests can be made in
+    a burst after which they're spread out evenly, instead of every client
+    waking up at the same moment when a fixed window resets.
+
+    Attributes
+    ----------
+    limit : int
+        The amount of requests allowed every ``per`` seconds.
+    per : float
+        The length of the rate limit window.
+    locked_until : float
+        The time until which Discord told us to stop making requests.
+    """
+
+    def __init__(self, limit: int = 50, per: float = 1.0):
+        self.limit: int = limit
+        self.per: float = per
+        self.interval: float = per / limit
+        self.tolerance: float = per - self.interval
+        self.locked_until: float = 0.0
+        self._tat: float = 0.0
+
+    def reserve(self) -> float:
+        """Reserves a slot and returns how long to wait before using it."""
+        now = monotonic()
+        tat = max(self._tat, now, self.locked_until)
+        self._tat = tat + self.interval
+        return max(tat - self.tolerance - now, self.locked_until - now, 0.0)
+
+    def lock(self, retry_after: float):
+        self.locked_until = max(self.locked_until, monotonic() + retry_after)
+
+
+class RateLimitBackend(ABC):
+    """
+    Where a :class:`HTTPClient` keeps the rate limit state it shares with other
+    clients of the same token. Subclass this to share it any other way.
+    """
+
+    @abstractmethod
+    async def acquire_global(self) -> None:
+        """Waits until a request may be made under the global rate limit."""
+        ...
+
+    @abstractmethod
+    async def lock_global(self, retry_after: float) -> None:
+        """Stops every client from making requests for ``retry_after`` seconds."""
+        ...
+
+    async def close(self) -> None:
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """
+    Shares the global rate limit between the clients of this process that are
+    given the same instance, such as all the shards of a :class:`ShardManager`.
+    """
+
+    def __init__(self, limit: int = 50, per: float = 1.0):
+        self.global_ratelimit: GlobalRateLimit = GlobalRateLimit(limit, per)
+
+    async def acquire_global(self) -> None:
+        if delay := self.global_ratelimit.reserve():
+            await asyncio.sleep(delay)
+
+    async def lock_global(self, retry_after: float) -> None:
+        self.global_ratelimit.lock(retry_after)
+
+
+class RateLimitServer:
+    """
+    Serves a :class:`GlobalRateLimit` over a Unix socket, for every
+    :class:`UnixSocketRateLimitBackend` on the host to share.
+
+    It speaks a line based protocol, ``ACQUIRE`` is answered with the amount of
+    seconds to wait before making the request and ``LOCK <seconds>`` with ``OK``.
+    """
+
+    def __init__(self, path: str, limit: int = 50, per: float = 1.0):
+        self.path: str = path
+        self.global_ratelimit: GlobalRateLimit = GlobalRateLimit(limit, per)
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_unix_server(self.handle, path=self.path)
+        logger.debug(f"Serving the global rate limit on {self.path}.")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while line := await reader.readline():
+                command, _, argument = line.decode().strip().partition(" ")
+
+                if command == "ACQUIRE":
+                    writer.write(f"{self.global_ratelimit.reserve()}\n".encode())
+
+                elif command == "LOCK":
+                    self.global_ratelimit.lock(float(argument))
+                    writer.write(b"OK\n")
+
+                else:
+                    writer.write(b"ERR\n")
+
+                await writer.drain()
+
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Dropped a rate limit client: {e}")
+
+        finally:
+            writer.close()
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+
+class UnixSocketRateLimitBackend(RateLimitBackend):
+    """
+    Shares the global rate limit with every process on the host connected to
+    the same Unix socket.
+
+    Whichever process gets there first serves the socket (see
+    :class:`RateLimitServer`) and the rest connect to it. If that process goes
+    away, the next request makes one of the others take over.
+
+    Parameters
+    ----------
+    path : str
+        The path of the Unix socket.
+    limit : int
+        The amount of requests allowed every ``per`` seconds, used when this
+        process ends up serving the socket.
+    per : float
+        The length of the rate limit window.
+    """
+
+    def __init__(self, path: str, limit: int = 50, per: float = 1.0):
+        if not _FCNTL or not hasattr(socket, "AF_UNIX"):
+            raise EpikCordException(
+                "Unix sockets aren't supported on this platform, "
+                "use the InMemoryRateLimitBackend instead."
+            )
+
+        self.path: str = path
+        self.limit: int = limit
+        self.per: float = per
+        self.server: Optional[RateLimitServer] = None
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def _connect(self):
+        try:
+            self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+            return
+        except (FileNotFoundError, ConnectionRefusedError):
+            pass
+
+        # Nobody is serving the socket (anymore), so we do. The lock file stops
+        # two processes from taking over at the same time.
+        with open(f"{self.path}.lock", "w") as lock_file:
+            # Waiting on a blocking flock would stall the event loop as well.
+            while True:
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    # Another process is taking over, which doesn't take long.
+                    await asyncio.sleep(0.01)
+
+            with contextlib.suppress(FileNotFoundError, ConnectionRefusedError):
+                self._reader, self._writer = await asyncio.open_unix_connection(
+                    self.path
+                )
+                return
+
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(self.path)
+
+            self.server = RateLimitServer(self.path, self.limit, self.per)
+            await self.server.start()
+
+        self._reader, self._writer = await asyncio.open_unix_connection(self.path)
+
+    async def _send(self, command: str) -> str:
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._writer is None:
+                        await self._connect()
+
+                    self._writer.write(f"{command}\n".encode())  # type: ignore
+                    await self._writer.drain()  # type: ignore
+
+                    if response := await self._reader.readline():  # type: ignore
+                        return response.decode().strip()
+
+                    raise ConnectionResetError("The rate limit server went away.")
+
+                except (ConnectionError, FileNotFoundError):
+                    self._reader = self._writer = None
+                    if attempt:
+                        raise
+
+        raise ConnectionError  # Unreachable, keeps type checkers happy.
+
+    async def acquire_global(self) -> None:
+        if delay := float(await self._send("ACQUIRE")):
+            await asyncio.sleep(delay)
+
+    async def lock_global(self, retry_after: float) -> None:
+        await self._send(f"LOCK {retry_after}")
+
+    async def close(self) -> None:
+        if self._writer:
+            self._writer.close()
+            self._reader = self._writer = None
+
+        if self.server:
+            await self.server.close()
+            self.server = None
+
+
+__all__ = (
+    "GlobalRateLimit",
+    "RateLimitBackend",
+    "InMemoryRateLimitBackend",
+    "RateLimitServer",
+    "UnixSocketRateLimitBackend",
+)
@@ -0,0 +1,88 @@
+from logging import DEBUG, Logger, getLogger
+from random import random
+from typing import Any, Dict
+
+from ..exceptions import InvalidArgumentType
+
+
+class TraceRecord:
+    """
+    What is logged for a trace. It's only turned into text if a handler
+    formats it, handlers wanting the fields can read them from the ``trace``
+    attribute of the log record instead.
+
+    Attributes
+    ----------
+    kind : str
+        What was traced, such as ``"gateway.receive"``.
+    fields : Dict[str, Any]
+        The measurements of the trace.
+    """
+
+    __slots__ = ("kind", "fields")
+
+    def __init__(self, kind: str, fields: Dict[str, Any]):
+        self.kind: str = kind
+        self.fields: Dict[str, Any] = fields
+
+    def __str__(self) -> str:
+        fields = " ".join(
+            f"{key}={value:.6f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in self.fields.items()
+        )
+        return f"{self.kind} {fields}"
+
+
+class Tracer:
+    """
+    Logs structured traces at DEBUG level, for the hot paths where building a
+    log message for every payload would cost more than the work it describes.
+
+    Callers check :meth:`sampled` before measuring anything, which with DEBUG
+    disabled is one cached level check, and only then :meth:`emit` a trace.
+
+    Attributes
+    ----------
+    logger : Logger
+        The logger traces are emitted through.
+    sample_rate : float
+        The fraction of traces to emit, between ``0`` and ``1``.
+    """
+
+    def __init__(self, name: str, *, sample_rate: float = 1.0):
+        self.logger: Logger = getLogger(name)
+        self.sample_rate = sample_rate
+
+    @property
+    def sample_rate(self) -> float:
+        return self._sample_rate
+
+    @sample_rate.setter
+    def sample_rate(self, sample_rate: float):
+        if not 0 <= sample_rate <= 1:
+            raise InvalidArgumentType("sample_rate must be between 0 and 1.")
+
+        self._sample_rate: float = sample_rate
+
+    @property
+    def enabled(self) -> bool:
+        return self.logger.isEnabledFor(DEBUG)
+
+    def sampled(self) -> bool:
+        """Whether the next trace should be measured and emitted."""
+        if not self.logger.isEnabledFor(DEBUG):
+            return False
+
+        return self._sample_rate >= 1 or random() < self._sample_rate
+
+    def emit(self, kind: str, **fields: Any):
+        record = TraceRecord(kind, fields)
+        self.logger.debug("%s", record, extra={"trace": record})
+
+
+# Every payload received from and sent to the Gateway.
+gateway_tracer = Tracer("EpikCord.trace.gateway")
+# Every request made to Discord.
+http_tracer = Tracer("EpikCord.trace.http")
+
+__all__ = ("TraceRecord", "Tracer", "gateway_tracer", "http_tracer")
@@ -1,15 +1,31 @@
 from __future__ import annotations
 
 import asyncio
+import contextlib
+import random
+import secrets
+from collections import deque
 from logging import getLogger
 from sys import platform
-from time import perf_counter_ns
-from typing import TYPE_CHECKING, Dict, List, Optional, Union
+from time import perf_counter, perf_counter_ns
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Deque,
+    Iterable,
+    List,
+    Optional,
+    Union,
+)
+from weakref import WeakValueDictionary
+
+from aiohttp import ClientError
 
+from .. import etf
 from ..close_event_codes import GatewayCECode
 from ..exceptions import (
-    ClosedWebSocketConnection,
     DisallowedIntents,
+    InvalidArgumentType,
     InvalidIntents,
     InvalidToken,
     Ratelimited429,
@@ -18,7 +34,16 @@ from ..exceptions import (
 from ..flags import Intents
 from ..opcodes import GatewayOpcode
 from .event_handler import EventHandler
-from .http_client import HTTPClient
+from .gateway_ratelimit import GatewayRateLimiter
+from .heartbeat import HeartbeatSupervisor, LatencyHistogram
+from .http_client import DiscordGatewayWebsocket, HTTPClient
+from .member_request import (
+    GuildMembersRequest,
+    StartupChunker,
+    request_many_guild_members,
+)
+from .ratelimit_backend import RateLimitBackend
+from .tracing import gateway_tracer
 
 if TYPE_CHECKING:
     from EpikCord import Presence
@@ -33,6 +58,8 @@ class WebsocketClient(EventHandler):
         intents: Union[Intents, int],
         presence: Optional[Presence],
         discord_endpoint: str = "https://discord.com/api/v10",
+        encoding: str = "json",
+        ratelimit_backend: Optional[RateLimitBackend] = None,
     ):
         super().__init__()
         from EpikCord import Intents, __version__
@@ -41,14 +68,24 @@ class WebsocketClient(EventHandler):
         if not token:
             raise TypeError("Missing token.")
 
+        if encoding not in ("json", "etf"):
+            raise InvalidArgumentType("The encoding must be either json or etf.")
+
+        # ETF payloads are smaller but about ten times slower to decode than
+        # JSON, see the etf module.
+        self.encoding: str = encoding
+
         if isinstance(intents, int):
             self.intents = Intents(intents)
         elif isinstance(intents, Intents):
             self.intents = intents
 
         self._closed = True
+        # Set by close(), ending the wait between two connection attempts.
+        self._closing: Optional[asyncio.Event] = None
+        # Only set while connected, or trying to.
+        self.ws: Optional[DiscordGatewayWebsocket] = None
         self.presence = presence
-        self.heartbeats: List[Dict] = []
         self.http: HTTPClient = HTTPClient(
             headers={
                 "Authorization": f"Bot {token}",
@@ -56,149 +93,316 @@ class WebsocketClient(EventHandler):
                 "Content-Type": "application/json",
             },
             discord_endpoint=discord_endpoint,
+            ratelimit_backend=ratelimit_backend,
         )
         self.interval = None  # How frequently to heartbeat
         self.session_id: Optional[str] = None
         self.sequence = None
+        self.gateway_url: Optional[str] = None
+        self.resume_gateway_url: Optional[str] = None
+        # How long the last few resumes took, from the disconnect to RESUMED.
+        self.resume_latencies: Deque[float] = deque(maxlen=5)
+        self._resume_started: Optional[float] = None
+        self._reconnecting: bool = False
+        self.heartbeat_supervisor: HeartbeatSupervisor = HeartbeatSupervisor(self)
+        self.startup_chunker: Optional[StartupChunker] = None
+        self.gateway_ratelimiter: GatewayRateLimiter = GatewayRateLimiter()
+        # The member requests waiting for chunks, by nonce. Held weakly, the
+        # chunks of a request nobody kept are still cached.
+        self.member_requests: WeakValueDictionary[
+            str, GuildMembersRequest
+        ] = WeakValueDictionary()
 
     async def change_presence(self, *, presence: Presence):
         payload = {"op": GatewayOpcode.PRESENCE_UPDATE, "d": presence.to_dict()}
         await self.send_json(payload)
 
     async def heartbeat(self, forced: Optional[bool] = None):
-        if forced:
-            return await self.send_json(
-                {"op": GatewayOpcode.HEARTBEAT, "d": self.sequence or "null"}
-            )
+        """Sends a heartbeat, the :class:`HeartbeatSupervisor` decides when."""
+        self.heartbeat_time = perf_counter_ns()
+        await self.send_json({"op": GatewayOpcode.HEARTBEAT, "d": self.sequence})
 
-        if self.interval:
-            await self.send_json(
-                {"op": GatewayOpcode.HEARTBEAT, "d": self.sequence or "null"}
-            )
-            self.heartbeat_time = perf_counter_ns()
-            await asyncio.sleep(self.interval / 1000)
-            logger.debug("Sent a heartbeat!")
+    @property
+    def latency_histogram(self) -> LatencyHistogram:
+        return self.heartbeat_supervisor.histogram
 
     async def request_guild_members(
         self,
-        guild_id: int,
+        guild_id: str,
         *,
         query: Optional[str] = None,
         limit: Optional[int] = None,
         presences: Optional[bool] = None,
         user_ids: Optional[List[str]] = None,
         nonce: Optional[str] = None,
-    ):
+        timeout: Optional[float] = 30.0,
+    ) -> GuildMembersRequest:
+        """
+        Asks the Gateway for the members of a guild, every member if neither
+        ``query`` nor ``user_ids`` are given (which needs the GUILD_MEMBERS
+        intent).
+
+        The members are cached in the guild as their chunks arrive. Iterate
+        over the returned :class:`GuildMembersRequest` to get them as they do,
+        or await it to get them all.
+        """
+        nonce = nonce or secrets.token_hex(8)
         payload: dict = {
             "op": GatewayOpcode.REQUEST_GUILD_MEMBERS,
-            "d": {"guild_id": guild_id},
+            "d": {"guild_id": guild_id, "nonce": nonce},
         }
 
-        if query:
-            payload["d"]["query"] = query
+        if user_ids:
+            payload["d"]["user_ids"] = user_ids
+        else:
+            payload["d"]["query"] = query or ""
 
-        if limit:
-            payload["d"]["limit"] = limit
+        if limit or not user_ids:
+            payload["d"]["limit"] = limit or 0
 
         if presences:
             payload["d"]["presences"] = presences
 
-        if user_ids:
-            payload["d"]["user_ids"] = user_ids
+        request = GuildMembersRequest(guild_id, nonce, timeout)
+        self.member_requests[nonce] = request
+        await self.send_json(payload)
+        return request
 
-        if nonce:
-            payload["d"]["nonce"] = nonce
+    def request_many_guild_members(
+        self,
+        guild_ids: Iterable[str],
+        *,
+        presences: Optional[bool] = None,
+        concurrency: int = 5,
+        timeout: Optional[float] = 30.0,
+    ) -> AsyncIterator[GuildMembersRequest]:
+        """
+        Requests every member of each guild, ``concurrency`` guilds at a time,
+        yielding each :class:`GuildMembersRequest` once it is complete.
+        """
+        return request_many_guild_members(
+            lambda guild_id: self.request_guild_members(
+                guild_id, presences=presences, timeout=timeout
+            ),
+            guild_ids,
+            concurrency,
+        )
 
-        await self.send_json(payload)
+    @property
+    def can_resume(self) -> bool:
+        """Whether there is a session to RESUME instead of IDENTIFYing again."""
+        return self.session_id is not None and self.sequence is not None
+
+    def invalidate_session(self):
+        self.session_id = None
+        self.sequence = None
+        self.resume_gateway_url = None
+
+    async def _drop_connection(self):
+        self._reconnecting = True
+        # Any close code other than 1000 and 1001 keeps the session alive.
+        await self.ws.close(code=4000)
 
     async def reconnect(self):
-        await self.close()
-        await self.connect()
-        await self.identify()
-        await self.resume()
+        """
+        Drops the connection, keeping the session, so :meth:`connect`
+        reconnects to ``resume_gateway_url`` and RESUMEs.
+        """
+        logger.info("Discord asked us to reconnect, resuming.")
+        await self._drop_connection()
+
+    async def handle_invalid_session(self, resumable: bool):
+        if resumable:
+            logger.info("The session was invalidated but can be resumed.")
+        else:
+            logger.warning("The session was invalidated, identifying again.")
+            self.invalidate_session()
+            # Discord expects a random wait of 1 to 5 seconds before IDENTIFYing.
+            await asyncio.sleep(random.uniform(1, 5))
+
+        await self._drop_connection()
+
+    async def handle_resumed(self):
+        if self._resume_started is not None:
+            self.resume_latencies.append(perf_counter() - self._resume_started)
+            logger.info(
+                f"Resumed the session in {self.resume_latencies[-1] * 1000:.0f}ms."
+            )
+            self._resume_started = None
 
     async def handle_close(self):
-        if self.ws.close_code == GatewayCECode.DisallowedIntents:
+        """
+        Decides what to do after the Gateway closed the connection.
+
+        Raises for close codes that reconnecting won't fix and drops the
+        session for the ones which can't be resumed. Otherwise the session is
+        kept, and :meth:`connect` RESUMEs it.
+        """
+        if self._reconnecting:
+            # We closed it ourselves, the close code is whatever Discord echoed.
+            self._reconnecting = False
+            return
+
+        close_code = self.ws.close_code
+
+        if close_code == GatewayCECode.DisallowedIntents:
             raise DisallowedIntents(
                 "You cannot use privileged intents with this token, go to "
                 "the developer portal and allow the privileged intents "
                 "needed. "
             )
-        elif self.ws.close_code == 1006:
-            await self.resume()
-        elif self.ws.close_code == GatewayCECode.AuthenticationFailed:
+        elif close_code == GatewayCECode.AuthenticationFailed:
             raise InvalidToken("The token you provided is invalid.")
-        elif self.ws.close_code == GatewayCECode.RateLimited:
+        elif close_code == GatewayCECode.RateLimited:
             raise Ratelimited429(
                 "You've been rate limited. Try again in a few minutes."
             )
-        elif self.ws.close_code == GatewayCECode.ShardingRequired:
+        elif close_code == GatewayCECode.ShardingRequired:
             raise ShardingRequired("You need to shard the bot.")
-        elif self.ws.close_code == GatewayCECode.InvalidAPIVersion:
+        elif close_code == GatewayCECode.InvalidShard:
+            raise ShardingRequired("The shard sent while identifying is invalid.")
+        elif close_code == GatewayCECode.InvalidAPIVersion:
             raise DeprecationWarning(
                 "The gateway you're connecting to is deprecated and does not "
                 "work, upgrade EpikCord.py. "
             )
-        elif self.ws.close_code == GatewayCECode.InvalidIntents:
+        elif close_code == GatewayCECode.InvalidIntents:
             raise InvalidIntents("The intents you provided are invalid.")
-        elif self.ws.close_code == GatewayCECode.UnknownError:
-            await self.resume()
-        elif self.ws.close_code == GatewayCECode.UnknownOpcode:
+        elif close_code == GatewayCECode.UnknownOpcode:
             logger.critical(
                 "EpikCord.py sent an invalid OPCODE to the Gateway. "
                 "Report this immediately. "
             )
-            await self.resume()
-        elif self.ws.close_code == GatewayCECode.DecodeError:
+        elif close_code == GatewayCECode.DecodeError:
             logger.critical(
                 "EpikCord.py sent an invalid payload to the Gateway."
                 " Report this immediately. "
             )
-            await self.resume()
-        elif self.ws.close_code == GatewayCECode.NotAuthenticated:
+        elif close_code == GatewayCECode.NotAuthenticated:
             logger.critical(
                 "EpikCord.py has sent a payload prior to identifying."
                 " Report this immediately. "
             )
-
-        elif self.ws.close_code == GatewayCECode.AlreadyAuthenticated:
+        elif close_code == GatewayCECode.AlreadyAuthenticated:
             logger.critical(
                 "EpikCord.py tried to authenticate again." " Report this immediately. "
             )
-            await self.resume()
-        elif self.ws.close_code == GatewayCECode.InvalidSequence:
+        elif close_code == GatewayCECode.InvalidSequence:
             logger.critical(
                 "EpikCord.py sent an invalid sequence number."
                 " Report this immediately."
             )
-            await self.resume()
-        elif self.ws.close_code == GatewayCECode.SessionTimeout:
-            logger.critical("Session timed out.")
-            await self.resume()
+            self.invalidate_session()
+        elif close_code == GatewayCECode.SessionTimedOut:
+            logger.warning("Session timed out.")
+            self.invalidate_session()
+        elif close_code in (1000, 1001):
+            # Closing with these ends the session, whoever did it.
+            logger.warning(f"Connection closed with code {close_code}.")
+            self.invalidate_session()
         else:
-            raise ClosedWebSocketConnection(
-                f"Connection has been closed with code {self.ws.close_code}"
-            )
+            logger.info(f"Connection closed with code {close_code}, resuming.")
 
     async def send_json(self, json: dict):
-        await self.ws.send_json(json)
-        logger.debug(f"Sent {json} to the Websocket Connection to Discord.")
+        if traced := gateway_tracer.sampled():
+            started_at = perf_counter()
 
-    async def connect(self):
-        res = await self.http.get("/gateway")
-        data = await res.json()
-        url = data["url"]
+        priority = self.gateway_ratelimiter.priority_of(json)
+        await self.gateway_ratelimiter.acquire(priority)
 
+        if traced:
+            acquired_at = perf_counter()
+
+        if self.encoding == "etf":
+            await self.ws.send_bytes(etf.dumps(json))
+        else:
+            await self.ws.send_json(json)
+
+        # Not the payload itself, IDENTIFYs and RESUMEs have the token in them.
+        if traced:
+            gateway_tracer.emit(
+                "gateway.send",
+                op=json.get("op"),
+                priority=priority,
+                queue_depth=self.gateway_ratelimiter.depth,
+                waited=acquired_at - started_at,
+                send=perf_counter() - acquired_at,
+            )
+
+    async def _ws_connect(self, url: str):
         self.ws = await self.http.ws_connect(
-            f"{url}?v=10&encoding=json&compress=zlib-stream"
+            f"{url}?v=10&encoding={self.encoding}&compress=zlib-stream"
         )
+        self.gateway_ratelimiter.reset()
+
+        if self.encoding == "etf":
+            self.ws.loads = etf.loads
+
+    async def connect(self):
+        """
+        Connects to the Gateway and reads from it until :meth:`close` is called,
+        RESUMEing the session whenever the connection drops.
+        """
+        if not self.gateway_url:
+            res = await self.http.get("/gateway")
+            data = await res.json()
+            self.gateway_url = data["url"]
+
         self._closed = False
-        await self.handle_events()
+        self._closing = asyncio.Event()
+        attempts = 0
+
+        while not self._closed:
+            resuming = self.can_resume and self.resume_gateway_url
+            url = self.resume_gateway_url if resuming else self.gateway_url
+
+            try:
+                await self._ws_connect(url)  # type: ignore
+            except (ClientError, asyncio.TimeoutError) as e:
+                if self._closed:
+                    break
+
+                attempts += 1
+                delay = min(2**attempts, 60)
+                logger.warning(
+                    f"Couldn't connect to the Gateway ({e}), retrying in {delay}s."
+                )
+
+                with contextlib.suppress(asyncio.TimeoutError):
+                    await asyncio.wait_for(self._closing.wait(), delay)
+                continue
+            except RuntimeError:
+                # close() closed the HTTP session while we were connecting.
+                if self._closed:
+                    break
+                raise
+
+            if self._closed:
+                # close() was called while we were connecting.
+                await self.ws.close(code=4000)  # type: ignore
+                break
+
+            attempts = 0
+            await self.handle_events()
+
+            if self._closed:
+                break
+
+            self.heartbeat_supervisor.stop()
+            await self.handle_close()
+
+            if self.can_resume:
+                self._resume_started = perf_counter()
+
+    async def identify_or_resume(self):
+        if self.can_resume:
+            await self.resume()
+        else:
+            await self.identify()
 
     async def resume(self):
-        logger.critical("Reconnecting...")
+        logger.info(f"Resuming session {self.session_id} from {self.sequence}.")
 
-        await self.connect()
         await self.send_json(
             {
                 "op": GatewayOpcode.RESUME,
@@ -210,8 +414,6 @@ class WebsocketClient(EventHandler):
             }
         )
 
-        self._closed = False
-
     async def identify(self):
         payload = {
             "op": GatewayOpcode.IDENTIFY,
@@ -235,14 +437,22 @@ class WebsocketClient(EventHandler):
         if self._closed:
             return
 
+        self._closed = True
+        self.heartbeat_supervisor.stop()
+        self.stop_dispatching()
+
+        if self._closing is not None:
+            self._closing.set()
+
         if self.ws is not None and not self.ws.closed:
             await self.ws.close(code=4000)
 
+        if (backend := getattr(self, "cache_backend", None)) is not None:
+            await backend.flush()
+
         if self.http is not None and not self.http.closed:
             await self.http.close()
 
-        self._closed = True
-
     def login(self):
         loop = asyncio.get_event_loop()
 
@@ -0,0 +1,595 @@
+import asyncio
+import contextlib
+import json
+import multiprocessing
+import os
+import secrets
+import tempfile
+from logging import getLogger
+from time import monotonic
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set
+
+from .client import HTTPClient, UnixSocketRateLimitBackend
+from .exceptions import EpikCordException, InvalidArgumentType
+from .flags import Intents
+from .sharding import IdentifyScheduler, ShardManager
+
+logger = getLogger(__name__)
+
+
+def _encode(message: dict) -> bytes:
+    return json.dumps(message, separators=(",", ":")).encode() + b"\n"
+
+
+class IPCServer:
+    """
+    The event bus between the workers of a :class:`Cluster`, served by the
+    parent process on localhost.
+
+    Workers exchange newline delimited JSON messages with it:
+
+    - ``broadcast`` is forwarded to every other worker.
+    - ``query`` is forwarded to every worker, the sender included, and their
+      ``reply``\\s are gathered into one ``result`` for the sender.
+    - ``identify`` is answered with a ``result`` once the shard given may
+      IDENTIFY, so ``max_concurrency`` is respected across processes.
+
+    Attributes
+    ----------
+    identify_scheduler : IdentifyScheduler
+        Spaces out the IDENTIFYs of every worker.
+    secret : str
+        What workers must say hello with, so other local processes can't join.
+    query_timeout : float
+        How long to wait for workers to reply to a query.
+    workers : Dict[int, asyncio.StreamWriter]
+        The connected workers, by cluster ID.
+    """
+
+    def __init__(
+        self,
+        identify_scheduler: IdentifyScheduler,
+        secret: str,
+        *,
+        query_timeout: float = 10.0,
+    ):
+        self.identify_scheduler: IdentifyScheduler = identify_scheduler
+        self.secret: str = secret
+        self.query_timeout: float = query_timeout
+        self.workers: Dict[int, asyncio.StreamWriter] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.port: Optional[int] = None
+        self._queries: Dict[str, Dict[int, Any]] = {}
+        self._query_waiters: Dict[str, Set[int]] = {}
+        self._query_done: Dict[str, asyncio.Event] = {}
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, "127.0.0.1", 0)
+        self.port = self.server.sockets[0].getsockname()[1]
+        logger.debug(f"Serving the cluster IPC bus on port {self.port}.")
+
+    async def close(self):
+        for writer in self.workers.values():
+            writer.close()
+
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def _spawn(self, coro: Awaitable):
+        task = asyncio.ensure_future(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def send(self, cluster_id: int, message: dict):
+        writer = self.workers.get(cluster_id)
+
+        if not writer:
+            return
+
+        try:
+            writer.write(_encode(message))
+            await writer.drain()
+        except ConnectionError as e:
+            logger.debug(f"Couldn't send {message['op']} to cluster {cluster_id}: {e}")
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        cluster_id: Optional[int] = None
+
+        try:
+            hello = json.loads(await reader.readline() or b"{}")
+
+            if hello.get("op") != "hello" or hello.get("secret") != self.secret:
+                logger.warning("Refused a connection to the cluster IPC bus.")
+                return
+
+            cluster_id = hello["cluster_id"]
+            self.workers[cluster_id] = writer  # type: ignore
+
+            while line := await reader.readline():
+                self.handle_message(cluster_id, json.loads(line))  # type: ignore
+
+        except (ConnectionError, ValueError) as e:
+            logger.debug(f"Dropped cluster {cluster_id} from the IPC bus: {e}")
+
+        finally:
+            if cluster_id is not None and self.workers.get(cluster_id) is writer:
+                del self.workers[cluster_id]
+
+                for nonce, waiting in self._query_waiters.items():
+                    waiting.discard(cluster_id)
+                    if not waiting:
+                        self._query_done[nonce].set()
+
+            writer.close()
+
+    def handle_message(self, cluster_id: int, message: dict):
+        op = message.get("op")
+
+        if op == "broadcast":
+            for worker in list(self.workers):
+                if worker != cluster_id:
+                    self._spawn(self.send(worker, message))
+
+        elif op == "query":
+            self._spawn(self.query(cluster_id, message))
+
+        elif op == "reply":
+            waiting = self._query_waiters.get(message["nonce"])
+
+            if waiting is not None and cluster_id in waiting:
+                self._queries[message["nonce"]][cluster_id] = message.get("data")
+                waiting.discard(cluster_id)
+
+                if not waiting:
+                    self._query_done[message["nonce"]].set()
+
+        elif op == "identify":
+            self._spawn(self.identify(cluster_id, message))
+
+        else:
+            logger.warning(f"Cluster {cluster_id} sent an unknown IPC op {op}.")
+
+    async def query(self, cluster_id: int, message: dict):
+        nonce = f"{cluster_id}:{message['nonce']}"
+        workers = list(self.workers)
+        self._queries[nonce] = {}
+        self._query_waiters[nonce] = set(workers)
+        self._query_done[nonce] = done = asyncio.Event()
+
+        for worker in workers:
+            await self.send(worker, {**message, "nonce": nonce})
+
+        try:
+            await asyncio.wait_for(done.wait(), timeout=self.query_timeout)
+        except asyncio.TimeoutError:
+            logger.warning(
+                f"Clusters {sorted(self._query_waiters[nonce])} didn't reply to "
+                f"{message['query']} in time."
+            )
+
+        replies = self._queries.pop(nonce)
+        del self._query_waiters[nonce]
+        del self._query_done[nonce]
+
+        await self.send(
+            cluster_id,
+            {
+                "op": "result",
+                "nonce": message["nonce"],
+                "data": [replies[worker] for worker in sorted(replies)],
+            },
+        )
+
+    async def identify(self, cluster_id: int, message: dict):
+        await self.identify_scheduler.acquire(message["shard_id"])
+        await self.send(cluster_id, {"op": "result", "nonce": message["nonce"]})
+
+
+class IPCClient:
+    """
+    A worker's connection to the :class:`IPCServer` of its :class:`Cluster`.
+
+    Broadcasts from other workers are dispatched on the :class:`ShardManager`
+    as ``ipc_<event name>`` with the data sent. Queries are answered by the
+    handlers registered with :meth:`handler`.
+
+    Attributes
+    ----------
+    manager : ShardManager
+        The shard manager of this worker.
+    cluster_id : int
+        The ID of this worker.
+    handlers : Dict[str, Callable[[Any], Awaitable[Any]]]
+        The query handlers of this worker, by query name.
+    """
+
+    def __init__(self, manager: ShardManager, cluster_id: int, port: int, secret: str):
+        self.manager: ShardManager = manager
+        self.cluster_id: int = cluster_id
+        self.port: int = port
+        self.secret: str = secret
+        self.handlers: Dict[str, Callable[[Any], Awaitable[Any]]] = {
+            "guild_count": self._guild_count
+        }
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._writer: Optional[asyncio.StreamWriter] = None
+        self._listener: Optional[asyncio.Task] = None
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._nonce: int = 0
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def _guild_count(self, _) -> int:
+        return sum(len(shard.guilds) for shard in self.manager.shards)
+
+    def handler(self, query: str):
+        """Registers a coroutine function answering ``query`` from other workers."""
+
+        def register_handler(func):
+            self.handlers[query] = func
+            return func
+
+        return register_handler
+
+    async def connect(self):
+        self._reader, self._writer = await asyncio.open_connection(
+            "127.0.0.1", self.port
+        )
+        await self._write(
+            {"op": "hello", "cluster_id": self.cluster_id, "secret": self.secret}
+        )
+        self._listener = asyncio.create_task(self._listen())
+
+    async def close(self):
+        if self._listener:
+            self._listener.cancel()
+
+        if self._writer:
+            self._writer.close()
+            self._writer = None
+
+    async def _write(self, message: dict):
+        if not self._writer:
+            raise EpikCordException("The IPC client isn't connected.")
+
+        self._writer.write(_encode(message))
+        await self._writer.drain()
+
+    async def _request(self, message: dict) -> Any:
+        self._nonce += 1
+        nonce = self._nonce
+        future = asyncio.get_running_loop().create_future()
+        self._pending[nonce] = future
+
+        try:
+            await self._write({**message, "nonce": nonce})
+            return await future
+        finally:
+            self._pending.pop(nonce, None)
+
+    async def broadcast(self, event_name: str, data: Any = None):
+        """Dispatches ``ipc_<event_name>`` with ``data`` on every other worker."""
+        await self._write({"op": "broadcast", "event": event_name, "data": data})
+
+    async def query(self, query: str, data: Any = None) -> List[Any]:
+        """Asks every worker, this one included, and returns their answers."""
+        return await self._request({"op": "query", "query": query, "data": data})
+
+    async def identify(self, shard_id: int):
+        await self._request({"op": "identify", "shard_id": shard_id})
+
+    async def _answer(self, message: dict):
+        handler = self.handlers.get(message["query"])
+        data = None
+
+        if handler:
+            try:
+                data = await handler(message.get("data"))
+            except Exception as e:
+                logger.exception(f"Error answering IPC query {message['query']}: {e}")
+        else:
+            logger.warning(f"No handler for IPC query {message['query']}.")
+
+        await self._write({"op": "reply", "nonce": message["nonce"], "data": data})
+
+    async def _listen(self):
+        try:
+            while line := await self._reader.readline():  # type: ignore
+                message = json.loads(line)
+                op = message.get("op")
+
+                if op == "result":
+                    future = self._pending.pop(message["nonce"], None)
+                    if future and not future.done():
+                        future.set_result(message.get("data"))
+
+                elif op == "query":
+                    task = asyncio.create_task(self._answer(message))
+                    self._tasks.add(task)
+                    task.add_done_callback(self._tasks.discard)
+
+                elif op == "broadcast":
+                    await self.manager.dispatch(
+                        f"ipc_{message['event']}", message.get("data")
+                    )
+
+        except (ConnectionError, ValueError) as e:
+            logger.error(f"Lost the connection to the cluster IPC bus: {e}")
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(
+                    EpikCordException("Lost the connection to the cluster IPC bus.")
+                )
+
+
+class IPCIdentifyScheduler(IdentifyScheduler):
+    """Leaves the spacing of IDENTIFYs to the parent process of a cluster."""
+
+    def __init__(self, ipc: IPCClient, max_concurrency: int = 1):
+        super().__init__(max_concurrency)
+        self.ipc: IPCClient = ipc
+
+    async def acquire(self, shard_id: int):
+        await self.ipc.identify(shard_id)
+
+
+def _run_worker(
+    cluster_id: int,
+    shard_ids: List[int],
+    shard_count: int,
+    max_concurrency: int,
+    token: str,
+    intents: int,
+    port: int,
+    secret: str,
+    setup: Optional[Callable[[ShardManager], Any]],
+    kwargs: Dict[str, Any],
+):
+    async def main():
+        manager = ShardManager(
+            token,
+            Intents(intents),
+            shards=shard_count,
+            shard_ids=shard_ids,
+            **kwargs,
+        )
+        manager.cluster_id = cluster_id
+        manager.ipc = IPCClient(manager, cluster_id, port, secret)
+        manager.identify_scheduler = IPCIdentifyScheduler(manager.ipc, max_concurrency)
+
+        if setup:
+            setup(manager)
+
+        await manager.ipc.connect()
+
+        try:
+            await manager.start()
+        finally:
+            await manager.ipc.close()
+
+    try:
+        asyncio.run(main())
+    except KeyboardInterrupt:
+        pass
+
+
+class Cluster:
+    """
+    Runs the shards of a bot across several processes.
+
+    The shards are split into contiguous ranges, one for each worker process,
+    and each worker runs its range with a :class:`ShardManager`. Workers talk
+    to each other through an :class:`IPCServer` in this process, which also
+    spaces out their IDENTIFYs and respawns the ones that die.
+
+    Listeners can't be registered on the workers' managers from here, so pass
+    a ``setup`` function which does so. It's called with the
+    :class:`ShardManager` of each worker and must be importable, as the
+    workers are spawned, not forked. The manager's ``cluster_id`` and ``ipc``
+    (an :class:`IPCClient`) are set by then.
+
+    Parameters
+    ----------
+    token : str
+        The token of the bot.
+    intents : Intents
+        The intents of the bot.
+    setup : Optional[Callable[[ShardManager], Any]]
+        Registers listeners and IPC query handlers on a worker's manager.
+    clusters : Optional[int]
+        The amount of worker processes, defaults to the amount of CPUs.
+    shards : Optional[int]
+        The amount of shards, defaults to what Discord recommends.
+    respawn : bool
+        Whether to respawn workers which exit with an error.
+    respawn_delay : float
+        The least amount of seconds between two starts of the same worker.
+    **kwargs
+        Passed on to each worker's :class:`ShardManager`.
+    """
+
+    def __init__(
+        self,
+        token: str,
+        intents: Intents,
+        *,
+        setup: Optional[Callable[[ShardManager], Any]] = None,
+        clusters: Optional[int] = None,
+        shards: Optional[int] = None,
+        respawn: bool = True,
+        respawn_delay: float = 5.0,
+        **kwargs,
+    ):
+        if clusters is not None and clusters < 1:
+            raise InvalidArgumentType("There must be at least 1 cluster.")
+
+        self.token: str = token
+        if not isinstance(intents, Intents):
+            intents = Intents(intents)  # type: ignore
+
+        self.intents: Intents = intents
+        self.setup: Optional[Callable[[ShardManager], Any]] = setup
+        self.desired_clusters: Optional[int] = clusters
+        self.desired_shards: Optional[int] = shards
+        self.respawn: bool = respawn
+        self.respawn_delay: float = respawn_delay
+        self.kwargs: Dict[str, Any] = kwargs
+        self.shard_ranges: List[List[int]] = []
+        self.processes: Dict[int, multiprocessing.process.BaseProcess] = {}
+        self.ipc: Optional[IPCServer] = None
+        self._context = multiprocessing.get_context("spawn")
+        self._started_at: Dict[int, float] = {}
+        self._closing: bool = False
+
+        # Workers share the global rate limit through a Unix socket when they
+        # can, the first one to need it serves it.
+        if "ratelimit_backend" not in kwargs:
+            path = os.path.join(tempfile.gettempdir(), f"epikcord-{os.getpid()}.sock")
+
+            with contextlib.suppress(EpikCordException):
+                self.kwargs["ratelimit_backend"] = UnixSocketRateLimitBackend(path)
+
+    @staticmethod
+    def split_shards(shards: int, clusters: int) -> List[List[int]]:
+        """Splits ``shards`` into ``clusters`` contiguous ranges of similar size."""
+        clusters = min(clusters, shards)
+        size, remainder = divmod(shards, clusters)
+        ranges = []
+        start = 0
+
+        for cluster_id in range(clusters):
+            end = start + size + (cluster_id < remainder)
+            ranges.append(list(range(start, end)))
+            start = end
+
+        return ranges
+
+    async def _fetch_gateway(self) -> dict:
+        from EpikCord import __version__
+
+        http = HTTPClient(
+            headers={
+                "Authorization": f"Bot {self.token}",
+                "User-Agent": (
+                    "DiscordBot (https://github.com/EpikCord/EpikCord.py "
+                    f"{__version__})"
+                ),
+            }
+        )
+
+        try:
+            response = await http.get("/gateway/bot")
+            return await response.json()
+        finally:
+            await http.close()
+
+    def _spawn(self, cluster_id: int):
+        process = self._context.Process(
+            target=_run_worker,
+            args=(
+                cluster_id,
+                self.shard_ranges[cluster_id],
+                self.shard_count,
+                self.ipc.identify_scheduler.max_concurrency,  # type: ignore
+                self.token,
+                self.intents.value,
+                self.ipc.port,  # type: ignore
+                self.ipc.secret,  # type: ignore
+                self.setup,
+                self.kwargs,
+            ),
+            name=f"EpikCord-cluster-{cluster_id}",
+            daemon=True,
+        )
+        process.start()
+        self.processes[cluster_id] = process
+        self._started_at[cluster_id] = monotonic()
+        logger.info(
+            f"Started cluster {cluster_id} (PID {process.pid}) with shards "
+            f"{self.shard_ranges[cluster_id][0]}-{self.shard_ranges[cluster_id][-1]}."
+        )
+
+    async def _supervise(self):
+        while self.processes:
+            await asyncio.sleep(1)
+
+            for cluster_id, process in list(self.processes.items()):
+                if process.is_alive() or self._closing:
+                    continue
+
+                if process.exitcode == 0 or not self.respawn:
+                    logger.info(
+                        f"Cluster {cluster_id} exited with code {process.exitcode}."
+                    )
+                    del self.processes[cluster_id]
+                    continue
+
+                if monotonic() - self._started_at[cluster_id] < self.respawn_delay:
+                    continue
+
+                logger.warning(
+                    f"Cluster {cluster_id} exited with code {process.exitcode}, "
+                    "respawning it."
+                )
+                self._spawn(cluster_id)
+
+    async def start(self):
+        gateway = await self._fetch_gateway()
+        self.shard_count: int = self.desired_shards or gateway["shards"]
+        self.shard_ranges = self.split_shards(
+            self.shard_count, self.desired_clusters or os.cpu_count() or 1
+        )
+
+        self.ipc = IPCServer(
+            IdentifyScheduler(gateway["session_start_limit"]["max_concurrency"]),
+            secrets.token_hex(16),
+        )
+        await self.ipc.start()
+
+        try:
+            for cluster_id in range(len(self.shard_ranges)):
+                self._spawn(cluster_id)
+
+            await self._supervise()
+        finally:
+            await self.close()
+
+    async def close(self):
+        self._closing = True
+
+        for process in self.processes.values():
+            if process.is_alive():
+                process.terminate()
+
+        # join blocks, so the processes are waited on off the event loop.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(
+                loop.run_in_executor(None, process.join, 5)
+                for process in self.processes.values()
+            )
+        )
+
+        self.processes.clear()
+
+        if self.ipc:
+            await self.ipc.close()
+
+    def run(self):
+        loop = asyncio.get_event_loop()
+
+        try:
+            loop.run_until_complete(self.start())
+        except KeyboardInterrupt:
+            loop.run_until_complete(self.close())
+
+
+__all__ = (
+    "Cluster",
+    "IPCClient",
+    "IPCIdentifyScheduler",
+    "IPCServer",
+)
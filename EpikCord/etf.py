@@ -0,0 +1,253 @@
+"""
+An implementation of the subset of the Erlang External Term Format (ETF) used by
+the Discord Gateway when connecting with ``encoding=etf``.
+
+The encoder uses `erlpack <https://github.com/discord/erlpack>`_ when it is
+installed and falls back to pure Python otherwise. Decoding is always done here,
+because erlpack hands binaries back as :class:`bytes` and converting every key
+and string afterwards costs more than it saves.
+
+ETF is not the fast option. Payloads are about a fifth smaller once compressed,
+but decoding them here is about ten times slower than :func:`json.loads` (and
+twenty times slower than orjson), and erlpack alone, before any conversion, is
+not much faster. ``benchmarks/gateway_encoding.py`` measures it, use ETF only
+when bandwidth costs more than CPU time.
+
+Gateway payloads decode to the same shape as their JSON counterparts: binaries
+become :class:`str`, the ``nil``/``true``/``false`` atoms become
+``None``/``True``/``False`` and big integers (which is how Discord sends
+snowflakes over ETF) become :class:`str`, so they can be used as cache keys
+next to IDs received from the REST API.
+"""
+
+from importlib.util import find_spec
+from struct import Struct
+from typing import Any, Callable, Dict, List, Union
+
+from .exceptions import InvalidData
+
+_ERLPACK = find_spec("erlpack")
+
+if _ERLPACK:
+    import erlpack
+
+FORMAT_VERSION = 131
+
+NEW_FLOAT_EXT = 70
+SMALL_INTEGER_EXT = 97
+INTEGER_EXT = 98
+FLOAT_EXT = 99
+ATOM_EXT = 100
+SMALL_TUPLE_EXT = 104
+LARGE_TUPLE_EXT = 105
+NIL_EXT = 106
+STRING_EXT = 107
+LIST_EXT = 108
+BINARY_EXT = 109
+SMALL_BIG_EXT = 110
+LARGE_BIG_EXT = 111
+MAP_EXT = 116
+SMALL_ATOM_EXT = 115
+ATOM_UTF8_EXT = 118
+SMALL_ATOM_UTF8_EXT = 119
+
+_UINT16 = Struct(">H")
+_UINT32 = Struct(">I")
+_INT32 = Struct(">i")
+_DOUBLE = Struct(">d")
+
+_ATOMS: Dict[str, Any] = {"nil": None, "true": True, "false": False}
+
+
+class _Decoder:
+    __slots__ = ("data", "offset")
+
+    def __init__(self, data: Union[bytes, bytearray, memoryview]):
+        self.data = data
+        self.offset = 0
+
+    def decode(self) -> Any:
+        data = self.data
+        tag = data[self.offset]
+        self.offset += 1
+
+        if tag == BINARY_EXT:
+            (length,) = _UINT32.unpack_from(data, self.offset)
+            start = self.offset + 4
+            self.offset = start + length
+            return str(data[start : self.offset], "utf-8")
+
+        if tag == MAP_EXT:
+            (arity,) = _UINT32.unpack_from(data, self.offset)
+            self.offset += 4
+            decode = self.decode
+            result = {}
+
+            for _ in range(arity):
+                key = decode()
+                result[key] = decode()
+
+            return result
+
+        if tag == SMALL_INTEGER_EXT:
+            self.offset += 1
+            return data[self.offset - 1]
+
+        if tag == INTEGER_EXT:
+            self.offset += 4
+            return _INT32.unpack_from(data, self.offset - 4)[0]
+
+        if tag == SMALL_ATOM_UTF8_EXT or tag == SMALL_ATOM_EXT:
+            length = data[self.offset]
+            start = self.offset + 1
+            self.offset = start + length
+            return self._atom(data[start : self.offset])
+
+        if tag == LIST_EXT:
+            (length,) = _UINT32.unpack_from(data, self.offset)
+            self.offset += 4
+            decode = self.decode
+            result = [decode() for _ in range(length)]
+
+            if data[self.offset] == NIL_EXT:
+                self.offset += 1
+            else:
+                result.append(decode())  # Improper list, keep the tail.
+
+            return result
+
+        if tag == NIL_EXT:
+            return []
+
+        if tag == SMALL_BIG_EXT or tag == LARGE_BIG_EXT:
+            if tag == SMALL_BIG_EXT:
+                length = data[self.offset]
+                self.offset += 1
+            else:
+                (length,) = _UINT32.unpack_from(data, self.offset)
+                self.offset += 4
+
+            sign = data[self.offset]
+            start = self.offset + 1
+            self.offset = start + length
+            value = int.from_bytes(data[start : self.offset], "little")
+            return str(-value if sign else value)
+
+        if tag == NEW_FLOAT_EXT:
+            self.offset += 8
+            return _DOUBLE.unpack_from(data, self.offset - 8)[0]
+
+        if tag == ATOM_UTF8_EXT or tag == ATOM_EXT:
+            (length,) = _UINT16.unpack_from(data, self.offset)
+            start = self.offset + 2
+            self.offset = start + length
+            return self._atom(data[start : self.offset])
+
+        if tag == STRING_EXT:
+            (length,) = _UINT16.unpack_from(data, self.offset)
+            start = self.offset + 2
+            self.offset = start + length
+            return str(data[start : self.offset], "utf-8")
+
+        if tag == SMALL_TUPLE_EXT or tag == LARGE_TUPLE_EXT:
+            if tag == SMALL_TUPLE_EXT:
+                arity = data[self.offset]
+                self.offset += 1
+            else:
+                (arity,) = _UINT32.unpack_from(data, self.offset)
+                self.offset += 4
+
+            decode = self.decode
+            return tuple(decode() for _ in range(arity))
+
+        if tag == FLOAT_EXT:
+            start = self.offset
+            self.offset += 31
+            return float(bytes(data[start : self.offset]).rstrip(b"\x00"))
+
+        raise InvalidData(f"Unsupported ETF tag {tag} at offset {self.offset - 1}.")
+
+    @staticmethod
+    def _atom(name: Union[bytes, memoryview]) -> Any:
+        atom = str(name, "utf-8")
+        return _ATOMS.get(atom, atom)
+
+
+def loads(data: Union[bytes, bytearray, memoryview]) -> Any:
+    """Decodes an ETF payload into Python objects."""
+    if not data or data[0] != FORMAT_VERSION:
+        raise InvalidData("The data given is not ETF encoded.")
+
+    decoder = _Decoder(data)
+    decoder.offset = 1
+
+    try:
+        result = decoder.decode()
+    except (IndexError, UnicodeDecodeError) as e:
+        raise InvalidData("The ETF payload given is malformed.") from e
+
+    # Slicing past the end doesn't raise, so a truncated binary only shows here.
+    if decoder.offset != len(data):
+        raise InvalidData("The ETF payload given is malformed.")
+
+    return result
+
+
+def _encode(obj: Any, append: Callable[[bytes], None]) -> None:
+    if isinstance(obj, str):
+        encoded = obj.encode("utf-8")
+        append(bytes((BINARY_EXT,)) + _UINT32.pack(len(encoded)))
+        append(encoded)
+
+    elif obj is None or obj is True or obj is False:
+        name = b"nil" if obj is None else b"true" if obj else b"false"
+        append(bytes((SMALL_ATOM_UTF8_EXT, len(name))) + name)
+
+    elif isinstance(obj, int):
+        if 0 <= obj <= 255:
+            append(bytes((SMALL_INTEGER_EXT, obj)))
+        elif -(2**31) <= obj < 2**31:
+            append(bytes((INTEGER_EXT,)) + _INT32.pack(obj))
+        else:
+            value = abs(obj)
+            encoded = value.to_bytes((value.bit_length() + 7) // 8, "little")
+            append(bytes((SMALL_BIG_EXT, len(encoded), obj < 0)) + encoded)
+
+    elif isinstance(obj, float):
+        append(bytes((NEW_FLOAT_EXT,)) + _DOUBLE.pack(obj))
+
+    elif isinstance(obj, dict):
+        append(bytes((MAP_EXT,)) + _UINT32.pack(len(obj)))
+        for key, value in obj.items():
+            _encode(str(key), append)
+            _encode(value, append)
+
+    elif isinstance(obj, (list, tuple)):
+        if not obj:
+            append(bytes((NIL_EXT,)))
+            return
+
+        append(bytes((LIST_EXT,)) + _UINT32.pack(len(obj)))
+        for item in obj:
+            _encode(item, append)
+        append(bytes((NIL_EXT,)))
+
+    else:
+        raise InvalidData(f"Cannot ETF encode an object of type {type(obj)}.")
+
+
+def dumps(obj: Any) -> bytes:
+    """Encodes Python objects into an ETF payload.
+
+    Dictionary keys are always sent as binaries, the Gateway closes the
+    connection with a decode error when it receives atom keys.
+    """
+    if _ERLPACK:
+        return erlpack.pack(obj)
+
+    parts: List[bytes] = [bytes((FORMAT_VERSION,))]
+    _encode(obj, parts.append)
+    return b"".join(parts)
+
+
+__all__ = ()
@@ -46,7 +46,7 @@ class DiscordAPIError(EpikCordException):
         self.code = body.get("code")
         self.message = body.get("message")
         self.errors = body.get("errors")
-        self.errors_list = self.extract_errors(self.errors)
+        self.errors_list = self.extract_errors(self.errors or {})
 
         super().__init__(
             "\n".join(f"{e.path} - {e.code} - {e.message}" for e in self.errors_list)
@@ -159,4 +159,8 @@ class FailedCheck(EpikCordException):
     ...
 
 
+class CacheBackendError(EpikCordException):
+    ...
+
+
 # TODO: Add __all__ for this file.
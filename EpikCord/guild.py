@@ -1,9 +1,15 @@
+from __future__ import annotations
+
 import datetime
 from typing import List, Optional
 
+from .abstract import Messageable
 from .application import Application
 from .channels import AnyChannel, GuildStageChannel, Overwrite
 from .flags import Permissions, SystemChannelFlags
+from .lazy import init_lazy_attributes, lazy_attribute
+from .managers import MemberManager
+from .pagination import PageIterator
 from .partials import PartialGuild
 from .sticker import Sticker, StickerItem
 from .thread import Thread
@@ -63,11 +69,39 @@ class Invite:
         )
 
 
-class GuildMember(User):
+class GuildMember(Messageable):
+    """
+    A member of a guild.
+
+    The user is shared with every other model referring to them (see
+    :meth:`User.from_payload`), and its attributes can be read straight from
+    the member, except for ``avatar`` which is the member's guild avatar.
+
+    Attributes
+    ----------
+    user : User
+        The user this member is.
+    """
+
+    __slots__ = (
+        "data",
+        "user",
+        "avatar",
+        "nick",
+        "role_ids",
+        "joined_at",
+        "premium_since",
+        "deaf",
+        "mute",
+        "pending",
+        "permissions",
+        "communication_disabled_until",
+    )
+
     def __init__(self, client, data: dict):
-        super().__init__(client, data.get("user"))
-        self.data = data
-        self.client = client
+        self.user: User = User.from_payload(client, data["user"])
+        super().__init__(client, self.user.id)
+        self.data = data if getattr(client, "keep_raw_data", True) else None
         self.nick: Optional[str] = data.get("nick")
         self.avatar: Optional[str] = data.get("avatar")
         self.role_ids: Optional[List[str]] = list(data.get("roles", []))
@@ -81,6 +115,52 @@ class GuildMember(User):
             "communication_disabled_until"
         )
 
+    def to_dict(self) -> dict:
+        if self.data is not None:
+            return self.data
+
+        return {
+            "user": self.user.to_dict(),
+            "nick": self.nick,
+            "avatar": self.avatar,
+            "roles": self.role_ids,
+            "joined_at": self.joined_at,
+            "premium_since": self.premium_since,
+            "deaf": self.deaf,
+            "mute": self.mute,
+            "pending": self.pending,
+            "permissions": self.permissions,
+            "communication_disabled_until": self.communication_disabled_until,
+        }
+
+    def update(self, data: dict):
+        """Updates the member, and their user, in place from a member payload."""
+        if data.get("user"):
+            self.user.update(data["user"])
+
+        self.nick = data.get("nick", self.nick)
+        self.avatar = data.get("avatar", self.avatar)
+        self.role_ids = list(data.get("roles", self.role_ids))
+        self.premium_since = data.get("premium_since", self.premium_since)
+        self.deaf = data.get("deaf", self.deaf)
+        self.mute = data.get("mute", self.mute)
+        self.pending = data.get("pending", self.pending)
+        self.communication_disabled_until = data.get(
+            "communication_disabled_until", self.communication_disabled_until
+        )
+
+        if self.data is not None and self.data is not data:
+            self.data.update(
+                {key: value for key, value in data.items() if key != "user"}
+            )
+
+    def __getattr__(self, name: str):
+        # Only called for what the member doesn't have, like ``username``.
+        if name == "user" or name.startswith("__"):
+            raise AttributeError(name)
+
+        return getattr(self.user, name)
+
 
 class GuildPreview:
     def __init__(self, data: dict):
@@ -99,9 +179,63 @@ class GuildPreview:
 
 
 class Guild:
+    __slots__ = (
+        "client",
+        "data",
+        "id",
+        "name",
+        "icon",
+        "icon_hash",
+        "splash",
+        "discovery_splash",
+        "owner_id",
+        "permissions",
+        "afk_channel_id",
+        "afk_timeout",
+        "verification_level",
+        "default_message_notifications",
+        "explicit_content_filter",
+        "_roles",
+        "_emojis",
+        "features",
+        "mfa_level",
+        "application_id",
+        "system_channel_id",
+        "system_channel_flags",
+        "rules_channel_id",
+        "joined_at",
+        "large",
+        "unavailable",
+        "member_count",
+        "_members",
+        "_channels",
+        "presences",
+        "max_presences",
+        "max_members",
+        "vanity_url_code",
+        "description",
+        "banner",
+        "premium_tier",
+        "premium_subscription_count",
+        "preferred_locale",
+        "public_updates_channel_id",
+        "max_video_channel_users",
+        "approximate_member_count",
+        "approximate_presence_count",
+        "_welcome_screen",
+        "nsfw_level",
+        "_stage_instances",
+        "_stickers",
+        "_guild_schedulded_events",
+        "preview",
+        "_payload",
+    )
+
     def __init__(self, client, data: dict):
         self.client = client
-        self.data: dict = data
+        self.data: Optional[dict] = (
+            data if getattr(client, "keep_raw_data", True) else None
+        )
         self.id: str = data.get("id")
         self.name: str = data.get("name")
         self.icon: Optional[str] = data.get("icon")
@@ -128,13 +262,6 @@ class Guild:
             if data.get("explicit_content_filter") == 1
             else "ALL_MEMBERS"
         )
-        self.roles: List[Role] = [
-            Role(client, {**role_data, "guild": self})
-            for role_data in data.get("roles")
-        ]
-        self.emojis: List[Emoji] = [
-            Emoji(client, emoji, self.id) for emoji in data.get("emojis")
-        ]
         self.features: List[str] = data.get("features")
         self.mfa_level: str = "NONE" if data.get("mfa_level") == 0 else "ELEVATED"
         self.application_id: Optional[str] = data.get("application_id")
@@ -148,15 +275,6 @@ class Guild:
         self.unavailable: bool = data.get("unavailable")
         self.member_count: int = data.get("member_count")
         # self.voice_states: List[dict] = data["voice_states"]
-        self.members: List[GuildMember] = [
-            GuildMember(client, member) for member in data.get("members")
-        ]
-        self.channels: List[AnyChannel] = [
-            client.utils.channel_from_type(channel) for channel in data.get("channels")
-        ]
-        self.channels.extend(
-            [Thread(self.client, thread) for thread in data.get("threads")]
-        )
         self.presences: List[dict] = data.get("presences")
         self.max_presences: int = data.get("max_presences")
         self.max_members: int = data.get("max_members")
@@ -178,24 +296,76 @@ class Guild:
         self.approximate_presence_count: Optional[int] = data.get(
             "approximate_presence_count"
         )
-        self.welcome_screen: Optional[WelcomeScreen] = (
+        self.nsfw_level: int = data.get("nsfw_level")
+        self.preview: Optional[GuildPreview] = None
+        init_lazy_attributes(self, client, data)
+
+    @lazy_attribute
+    def roles(self) -> List[Role]:
+        return [
+            Role(self.client, {**role_data, "guild": self})
+            for role_data in self._payload.get("roles")
+        ]
+
+    @lazy_attribute
+    def emojis(self) -> List[Emoji]:
+        return [
+            Emoji(self.client, emoji, self.id) for emoji in self._payload.get("emojis")
+        ]
+
+    @lazy_attribute
+    def members(self) -> MemberManager:
+        return MemberManager(
+            self.client,
+            self.id,
+            [
+                GuildMember(self.client, member)
+                for member in self._payload.get("members", [])
+            ],
+        )
+
+    @lazy_attribute
+    def channels(self) -> List[AnyChannel]:
+        # Channels in GUILD_CREATE payloads don't have the guild ID.
+        channels: List[AnyChannel] = [
+            self.client.utils.channel_from_type({**channel, "guild_id": self.id})
+            for channel in self._payload.get("channels")
+        ]
+        channels.extend(
+            [Thread(self.client, thread) for thread in self._payload.get("threads")]
+        )
+        return channels
+
+    @lazy_attribute
+    def welcome_screen(self) -> Optional[WelcomeScreen]:
+        data = self._payload
+        return (
             WelcomeScreen(data.get("welcome_screen"))
             if data.get("welcome_screen")
             else None
         )
-        self.nsfw_level: int = data.get("nsfw_level")
-        self.stage_instances: List[GuildStageChannel] = [
-            GuildStageChannel(client, channel)
-            for channel in data.get("stage_instances")
+
+    @lazy_attribute
+    def stage_instances(self) -> List[GuildStageChannel]:
+        return [
+            GuildStageChannel(self.client, channel)
+            for channel in self._payload.get("stage_instances")
         ]
-        self.stickers: Optional[List[StickerItem]] = (
+
+    @lazy_attribute
+    def stickers(self) -> Optional[List[StickerItem]]:
+        data = self._payload
+        return (
             [StickerItem(sticker) for sticker in data.get("stickers")]
             if data.get("stickers")
             else None
         )
-        self.guild_schedulded_events: List[GuildScheduledEvent] = [
-            GuildScheduledEvent(client, event)
-            for event in data.get("guild_schedulded_events", [])
+
+    @lazy_attribute
+    def guild_schedulded_events(self) -> List[GuildScheduledEvent]:
+        return [
+            GuildScheduledEvent(self.client, event)
+            for event in self._payload.get("guild_schedulded_events", [])
         ]
 
     async def edit(
@@ -293,17 +463,74 @@ class Guild:
         GuildPreview
             The guild preview.
         """
-        if getattr(self, "preview"):
+        if self.preview:
             return self.preview
 
         res = await self.client.http.get(f"/guilds/{self.id}/preview", guild_id=self.id)
 
         data = await res.json()
-        return GuildPreview(data)
+        self.preview = GuildPreview(data)
+        return self.preview
 
     async def delete(self):
         await self.client.http.delete(f"/guilds/{self.id}", guild_id=self.id)
 
+    def fetch_members(
+        self, *, after: Optional[str] = None, limit: Optional[int] = None
+    ) -> PageIterator:
+        """Iterates over the members of the guild, requesting them a page at a
+        time. Needs the members intent.
+
+        Parameters
+        ----------
+        after: Optional[str]
+            The ID of the user to start after.
+        limit: Optional[int]
+            The most members to get, every member if None.
+        """
+        return PageIterator(
+            self.client,
+            f"guilds/{self.id}/members",
+            build=lambda data: GuildMember(self.client, data),
+            direction="after",
+            cursor=after,
+            limit=limit,
+            page_size=1000,
+            cursor_of=lambda member: int(member["user"]["id"]),
+            guild_id=self.id,
+        )
+
+    def bans(
+        self,
+        *,
+        before: Optional[str] = None,
+        after: Optional[str] = None,
+        limit: Optional[int] = None,
+    ) -> PageIterator:
+        """Iterates over the bans of the guild, by user ID, requesting them a
+        page at a time.
+
+        Parameters
+        ----------
+        before: Optional[str]
+            The ID of the user to start before, going down.
+        after: Optional[str]
+            The ID of the user to start after, going up.
+        limit: Optional[int]
+            The most bans to get, every ban if None.
+        """
+        return PageIterator(
+            self.client,
+            f"guilds/{self.id}/bans",
+            build=lambda data: GuildBan(self.client, data),
+            direction="before" if before is not None else "after",
+            cursor=before if before is not None else after,
+            limit=limit,
+            page_size=1000,
+            cursor_of=lambda ban: int(ban["user"]["id"]),
+            guild_id=self.id,
+        )
+
     async def fetch_channels(self) -> List[AnyChannel]:
         """Fetches the guild channels.
 
@@ -411,22 +638,24 @@ class Role:
         self.permissions: str = data.get("permissions")  # TODO: Permissions
         self.managed: bool = data.get("managed")
         self.mentionable: bool = data.get("mentionable")
-        self.tags: RoleTag = RoleTag(self.data.get("tags"))
-        self.guild: Guild = Guild(client, data.get("guild"))
+        self.tags: Optional[RoleTag] = (
+            RoleTag(data["tags"]) if data.get("tags") else None
+        )
+        self.guild: Optional[Guild] = data.get("guild")
 
 
 class Emoji:
-    def __init__(self, client, data: dict):
+    def __init__(self, client, data: dict, guild_id: Optional[str] = None):
         self.client = client
         self.id: Optional[str] = data.get("id")
         self.name: Optional[str] = data.get("name")
-        self.roles: List[Role] = [
-            Role(client, {**role_data, "guild": self})
-            for role_data in data.get("roles")
-        ]
-        self.user: Optional[User] = User(data.get("user")) if data.get("user") else None
+        # Discord only sends the IDs of the roles allowed to use the emoji.
+        self.role_ids: List[str] = data.get("roles", [])
+        self.user: Optional[User] = (
+            User.from_payload(client, data["user"]) if data.get("user") else None
+        )
         self.requires_colons: bool = data.get("require_colons")
-        self.guild_id: str = data.get("guild_id")
+        self.guild_id: Optional[str] = data.get("guild_id", guild_id)
         self.managed: bool = data.get("managed")
         self.animated: bool = data.get("animated")
         self.available: bool = data.get("available")
@@ -537,9 +766,9 @@ class IntegrationAccount:
 
 
 class GuildBan:
-    def __init__(self, data: dict):
+    def __init__(self, client, data: dict):
         self.reason: Optional[str] = data.get("reason")
-        self.user: User = User(data.get("user"))
+        self.user: User = User.from_payload(client, data["user"])
 
 
 class Integration:
@@ -171,7 +171,7 @@ class MessageInteraction:
         self.id: str = data.get("id")
         self.type: int = data.get("type")
         self.name: str = data.get("name")
-        self.user: User = User(client, data.get("user"))
+        self.user: User = User.from_payload(client, data.get("user"))
         payload = {}
         if data.get("user"):
             payload.update(data.get("user"))
@@ -183,7 +183,7 @@ class MessageInteraction:
         self.member: Optional[GuildMember] = (
             GuildMember(client, payload) if data.get("member") else None
         )
-        self.user = User(client, data.get("user"))
+        self.user = User.from_payload(client, data.get("user"))
 
 
 __all__ = (
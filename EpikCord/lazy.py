@@ -0,0 +1,80 @@
+"""
+Lazily built model attributes.
+
+Models made from big payloads (like :class:`Message` and :class:`Guild`) build
+their nested objects through :class:`lazy_attribute`\\s. When the client was
+made with ``lazy_models=True`` those are only built the first time they're
+read, from the payload the model holds on to until then, and memoized. Otherwise
+they're all built straight away and the payload is let go of, like before.
+"""
+
+from typing import Any, Callable, Dict, Tuple, Type
+
+
+class lazy_attribute:
+    """
+    Like :func:`functools.cached_property`, but for classes with
+    ``__slots__``. The value is stored in the slot named after the attribute
+    with a leading underscore, which the class must declare.
+    """
+
+    def __init__(self, build: Callable[[Any], Any]):
+        self.build: Callable[[Any], Any] = build
+        self.name: str = build.__name__
+        self.slot: str = f"_{self.name}"
+        self.__doc__ = build.__doc__
+
+    def __set_name__(self, owner: type, name: str):
+        self.name = name
+        self.slot = f"_{name}"
+
+    def __get__(self, instance, owner=None) -> Any:
+        if instance is None:
+            return self
+
+        try:
+            return getattr(instance, self.slot)
+        except AttributeError:
+            value = self.build(instance)
+            setattr(instance, self.slot, value)
+            return value
+
+    def __set__(self, instance, value: Any):
+        setattr(instance, self.slot, value)
+
+
+_LAZY_ATTRIBUTES: Dict[Type, Tuple[str, ...]] = {}
+
+
+def lazy_attributes(cls: Type) -> Tuple[str, ...]:
+    """Returns the names of every :class:`lazy_attribute` of ``cls``."""
+    try:
+        return _LAZY_ATTRIBUTES[cls]
+    except KeyError:
+        names = tuple(
+            name
+            for klass in reversed(cls.__mro__)
+            for name, value in vars(klass).items()
+            if isinstance(value, lazy_attribute)
+        )
+        _LAZY_ATTRIBUTES[cls] = names
+        return names
+
+
+def init_lazy_attributes(instance, client, payload: dict):
+    """
+    Gives ``instance`` the payload its lazy attributes are built from, and
+    builds them all now unless ``client`` wants lazy models.
+    """
+    instance._payload = payload
+
+    if getattr(client, "lazy_models", False):
+        return
+
+    for name in lazy_attributes(type(instance)):
+        getattr(instance, name)
+
+    instance._payload = None
+
+
+__all__ = ("lazy_attribute",)
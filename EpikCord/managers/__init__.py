@@ -18,7 +18,13 @@ OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER DEALINGS IN THE
 SOFTWARE.
 """
 
+from .cache_backend import *
 from .cache_manager import *
+from .cache_policy import *
 from .channel_manager import *
 from .guilds_manager import *
+from .member_manager import *
+from .message_manager import *
 from .roles_manager import *
+from .snapshot import *
+from .users_manager import *
@@ -0,0 +1,431 @@
+from __future__ import annotations
+
+import asyncio
+from abc import ABC, abstractmethod
+from fnmatch import fnmatchcase
+from importlib.util import find_spec
+from logging import getLogger
+from typing import Any, AsyncIterator, Dict, Iterable, List, Optional, Tuple, Union
+
+from ..exceptions import CacheBackendError
+
+logger = getLogger(__name__)
+
+_ORJSON = find_spec("orjson")
+
+if _ORJSON:
+    import orjson as json
+
+else:
+    import json  # type: ignore
+
+_DELETED = object()
+
+
+class CacheBackend(ABC):
+    """
+    Where cache managers mirror what they cache, so other processes (like the
+    other shards of a bot) can read it. Subclass this to keep it anywhere else.
+
+    Values are JSON serializable payloads, stored by namespace (such as
+    ``"guilds"``) and key. Managers write to the backend in the background,
+    through :meth:`write_behind`, so caching never waits on it.
+    """
+
+    def __init__(self):
+        self._writes: Dict[Tuple[str, str], Any] = {}
+        self._writer: Optional[asyncio.Task] = None
+
+    @abstractmethod
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        ...
+
+    @abstractmethod
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        ...
+
+    @abstractmethod
+    async def delete(self, namespace: str, key: str) -> None:
+        ...
+
+    async def get_many(
+        self, namespace: str, keys: Iterable[str]
+    ) -> Dict[str, Optional[Any]]:
+        return {key: await self.get(namespace, key) for key in keys}
+
+    async def set_many(self, namespace: str, values: Dict[str, Any]) -> None:
+        for key, value in values.items():
+            await self.set(namespace, key, value)
+
+    async def delete_many(self, namespace: str, keys: Iterable[str]) -> None:
+        for key in keys:
+            await self.delete(namespace, key)
+
+    @abstractmethod
+    def scan(self, namespace: str) -> AsyncIterator[str]:
+        """Iterates over every key of the namespace."""
+        ...
+
+    async def close(self) -> None:
+        await self.flush()
+
+    def write_behind(self, namespace: str, key: str, value: Any = _DELETED):
+        """
+        Sets (or deletes, without a value) a key in the background. Writes to
+        the same key made before the previous ones were sent are merged, only
+        the last one is sent.
+        """
+        self._writes[(namespace, key)] = value
+
+        if self._writer is None:
+            try:
+                self._writer = asyncio.get_running_loop().create_task(
+                    self._write_pending()
+                )
+            except RuntimeError:
+                return  # No loop yet, the next write (or flush) sends it.
+
+    async def flush(self):
+        """Waits for every write made so far to be sent."""
+        if self._writer is not None:
+            await asyncio.shield(self._writer)
+
+        if self._writes:
+            await self._write_pending()
+
+    async def _write_pending(self):
+        try:
+            while self._writes:
+                writes, self._writes = self._writes, {}
+                sets: Dict[str, Dict[str, Any]] = {}
+                deletes: Dict[str, List[str]] = {}
+
+                for (namespace, key), value in writes.items():
+                    if value is _DELETED:
+                        deletes.setdefault(namespace, []).append(key)
+                    else:
+                        sets.setdefault(namespace, {})[key] = value
+
+                try:
+                    for namespace, values in sets.items():
+                        await self.set_many(namespace, values)
+
+                    for namespace, keys in deletes.items():
+                        await self.delete_many(namespace, keys)
+
+                except (ConnectionError, CacheBackendError) as e:
+                    logger.warning(
+                        f"Couldn't write {len(writes)} keys to the cache: {e}"
+                    )
+        finally:
+            self._writer = None
+
+
+class DictCacheBackend(CacheBackend):
+    """Keeps everything in a dictionary, only shared within this process."""
+
+    def __init__(self):
+        super().__init__()
+        self.data: Dict[str, Dict[str, Any]] = {}
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        return self.data.get(namespace, {}).get(key)
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        self.data.setdefault(namespace, {})[key] = value
+
+    async def delete(self, namespace: str, key: str) -> None:
+        self.data.get(namespace, {}).pop(key, None)
+
+    async def scan(self, namespace: str) -> AsyncIterator[str]:  # type: ignore
+        for key in list(self.data.get(namespace, {})):
+            yield key
+
+
+RESPValue = Union[None, int, bytes, str, List[Any]]
+
+
+def encode_command(*args: Union[str, bytes, int]) -> bytes:
+    """Encodes a command as a RESP array of bulk strings."""
+    parts = [f"*{len(args)}\r\n".encode()]
+
+    for arg in args:
+        if not isinstance(arg, bytes):
+            arg = str(arg).encode()
+
+        parts.append(b"$%d\r\n%b\r\n" % (len(arg), arg))
+
+    return b"".join(parts)
+
+
+async def read_reply(reader: asyncio.StreamReader) -> RESPValue:
+    """Reads one RESP reply, raising :class:`CacheBackendError` for errors."""
+    line = await reader.readline()
+
+    if not line:
+        raise ConnectionResetError("The cache server closed the connection.")
+
+    kind, rest = line[:1], line[1:-2]
+
+    if kind == b"+":
+        return rest.decode()
+
+    if kind == b"-":
+        raise CacheBackendError(rest.decode())
+
+    if kind == b":":
+        return int(rest)
+
+    if kind == b"$":
+        if (length := int(rest)) == -1:
+            return None
+
+        return (await reader.readexactly(length + 2))[:-2]
+
+    if kind == b"*":
+        if (length := int(rest)) == -1:
+            return None
+
+        return [await read_reply(reader) for _ in range(length)]
+
+    raise CacheBackendError(f"Unknown RESP reply: {line!r}")
+
+
+class RedisCacheBackend(CacheBackend):
+    """
+    Keeps everything in a Redis compatible server, shared by every process
+    connected to it. Keys are stored as ``<prefix>:<namespace>:<key>``.
+
+    This speaks just enough RESP for the cache and needs no dependency.
+
+    Parameters
+    ----------
+    host : str
+        The host of the server.
+    port : int
+        The port of the server.
+    db : int
+        The database to use.
+    prefix : str
+        What every key starts with, so several bots can share a server.
+    """
+
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 6379,
+        *,
+        db: int = 0,
+        prefix: str = "epikcord",
+    ):
+        super().__init__()
+        self.host: str = host
+        self.port: int = port
+        self.db: int = db
+        self.prefix: str = prefix
+        self._reader: Optional[asyncio.StreamReader] = None
+        self._stream: Optional[asyncio.StreamWriter] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    def _key(self, namespace: str, key: str) -> str:
+        return f"{self.prefix}:{namespace}:{key}"
+
+    async def _connect(self):
+        self._reader, self._stream = await asyncio.open_connection(self.host, self.port)
+
+        if self.db:
+            self._stream.write(encode_command("SELECT", self.db))  # type: ignore
+            await self._stream.drain()  # type: ignore
+            await read_reply(self._reader)
+
+    async def execute(self, *args: Union[str, bytes, int]) -> RESPValue:
+        """Sends a command and returns its reply."""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        async with self._lock:
+            for attempt in range(2):
+                try:
+                    if self._reader is None:
+                        await self._connect()
+
+                    self._stream.write(encode_command(*args))  # type: ignore
+                    await self._stream.drain()  # type: ignore
+                    return await read_reply(self._reader)  # type: ignore
+
+                except (ConnectionError, asyncio.IncompleteReadError):
+                    self._reader = None
+                    if attempt:
+                        raise
+
+        raise ConnectionError  # Unreachable, keeps type checkers happy.
+
+    async def get(self, namespace: str, key: str) -> Optional[Any]:
+        value = await self.execute("GET", self._key(namespace, key))
+        return json.loads(value) if value is not None else None  # type: ignore
+
+    async def set(self, namespace: str, key: str, value: Any) -> None:
+        await self.execute("SET", self._key(namespace, key), json.dumps(value))
+
+    async def delete(self, namespace: str, key: str) -> None:
+        await self.execute("DEL", self._key(namespace, key))
+
+    async def get_many(
+        self, namespace: str, keys: Iterable[str]
+    ) -> Dict[str, Optional[Any]]:
+        keys = list(keys)
+
+        if not keys:
+            return {}
+
+        values = await self.execute(
+            "MGET", *(self._key(namespace, key) for key in keys)
+        )
+        return {
+            key: json.loads(value) if value is not None else None
+            for key, value in zip(keys, values)  # type: ignore
+        }
+
+    async def set_many(self, namespace: str, values: Dict[str, Any]) -> None:
+        if values:
+            await self.execute(
+                "MSET",
+                *(
+                    part
+                    for key, value in values.items()
+                    for part in (self._key(namespace, key), json.dumps(value))
+                ),
+            )
+
+    async def delete_many(self, namespace: str, keys: Iterable[str]) -> None:
+        if keys := [self._key(namespace, key) for key in keys]:
+            await self.execute("DEL", *keys)
+
+    async def scan(self, namespace: str) -> AsyncIterator[str]:  # type: ignore
+        prefix = self._key(namespace, "")
+        cursor = b"0"
+
+        while True:
+            cursor, keys = await self.execute(  # type: ignore
+                "SCAN", cursor, "MATCH", f"{prefix}*", "COUNT", 500
+            )
+
+            for key in keys:
+                yield key.decode()[len(prefix) :]
+
+            if cursor == b"0":
+                return
+
+    async def close(self) -> None:
+        await super().close()
+
+        if self._stream is not None:
+            self._stream.close()
+            self._reader = self._stream = None
+
+
+class FakeRedisServer:
+    """
+    An in-process server speaking the part of RESP :class:`RedisCacheBackend`
+    uses, for trying out or testing a bot without running Redis.
+
+    Attributes
+    ----------
+    data : Dict[bytes, bytes]
+        Everything stored, by key.
+    port : int
+        The port the server listens on, picked by the OS when given ``0``.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host: str = host
+        self.port: int = port
+        self.data: Dict[bytes, bytes] = {}
+        self.server: Optional[asyncio.AbstractServer] = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self.handle, self.host, self.port)
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    async def close(self):
+        if self.server:
+            self.server.close()
+            await self.server.wait_closed()
+            self.server = None
+
+    def _run(self, command: bytes, args: List[bytes]) -> bytes:
+        if command == b"PING":
+            return b"+PONG\r\n"
+
+        if command in (b"SELECT", b"SET", b"MSET"):
+            for key, value in zip(args[0::2], args[1::2]):
+                if command != b"SELECT":
+                    self.data[key] = value
+
+            return b"+OK\r\n"
+
+        if command == b"GET":
+            return self._bulk(self.data.get(args[0]))
+
+        if command == b"MGET":
+            return b"*%d\r\n%b" % (
+                len(args),
+                b"".join(self._bulk(self.data.get(key)) for key in args),
+            )
+
+        if command == b"DEL":
+            return b":%d\r\n" % sum(
+                self.data.pop(key, None) is not None for key in args
+            )
+
+        if command == b"SCAN":
+            options = dict(zip(args[1::2], args[2::2]))
+            pattern = options.get(b"MATCH", b"*").decode()
+            count = int(options.get(b"COUNT", 10))
+            keys = sorted(self.data)
+            start = int(args[0])
+            end = start + count
+            matched = [
+                key for key in keys[start:end] if fnmatchcase(key.decode(), pattern)
+            ]
+            cursor = str(end if end < len(keys) else 0).encode()
+            return b"*2\r\n%b*%d\r\n%b" % (
+                self._bulk(cursor),
+                len(matched),
+                b"".join(self._bulk(key) for key in matched),
+            )
+
+        return b"-ERR unknown command '%b'\r\n" % command
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        if value is None:
+            return b"$-1\r\n"
+
+        return b"$%d\r\n%b\r\n" % (len(value), value)
+
+    async def handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await read_reply(reader)
+                except ConnectionResetError:
+                    return
+
+                command, *args = request  # type: ignore
+                writer.write(self._run(command.upper(), args))
+                await writer.drain()
+
+        except (ConnectionError, asyncio.IncompleteReadError) as e:
+            logger.debug(f"Dropped a cache client: {e}")
+
+        finally:
+            writer.close()
+
+
+__all__ = (
+    "CacheBackend",
+    "DictCacheBackend",
+    "RedisCacheBackend",
+    "FakeRedisServer",
+)
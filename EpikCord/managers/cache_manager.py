@@ -1,23 +1,155 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Iterator, Optional
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from time import monotonic
+from typing import TYPE_CHECKING, Any, Dict, Iterator, Optional
+
+from .cache_policy import CachePolicy, CacheStats
+
+if TYPE_CHECKING:
+    from .cache_backend import CacheBackend
+
+_MISSING = object()
 
 
 class CacheManager:
-    def __init__(self):
+    """
+    A dictionary of cached objects, evicting them according to a
+    :class:`CachePolicy`.
+
+    Attributes
+    ----------
+    policy : CachePolicy
+        When entries are evicted, never if no limits were given.
+    stats : CacheStats
+        The hits, misses and evictions of this cache.
+    weight : int
+        What the entries weigh together, when the policy has a ``max_weight``.
+    """
+
+    def __init__(self, policy: Optional[CachePolicy] = None):
+        self.policy: CachePolicy = policy or CachePolicy()
+        self.stats: CacheStats = CacheStats()
+        self.weight: int = 0
+        self._expires: Dict[Any, float] = {}
+        self._weights: Dict[Any, int] = {}
+        self._cache: Dict[Any, Any] = {}
         self.cache = {}
 
-    def add_to_cache(self, key: str, value: Any):
-        self.cache[key] = value
+    @staticmethod
+    def policy_for(client, name: str) -> Optional[CachePolicy]:
+        """Returns the policy configured for ``name`` on the client, if any."""
+        return (getattr(client, "cache_policies", None) or {}).get(name)
+
+    def _mirror(self, key, value: Any = None):
+        pass
+
+    @property
+    def cache(self) -> Dict[Any, Any]:
+        return self._cache
+
+    @cache.setter
+    def cache(self, cache: Dict[Any, Any]):
+        if not self.policy.bounded:
+            self._cache = cache
+            return
+
+        # Ordered from the next entry to evict to the last.
+        self._cache = OrderedDict()
+        self._expires.clear()
+        self._weights.clear()
+        self.weight = 0
+
+        for key, value in cache.items():
+            self.add_to_cache(key, value)
+
+    def _discard(self, key) -> Any:
+        value = self._cache.pop(key, None)
+        self._expires.pop(key, None)
+        self.weight -= self._weights.pop(key, 0)
+        return value
+
+    def _expire(self, now: float):
+        # Every entry gets the same TTL, so they expire in insertion order.
+        expires = self._expires
+
+        while expires:
+            key = next(iter(expires))
+
+            if expires[key] > now:
+                break
+
+            self._discard(key)
+            self.stats.expirations += 1
+
+    def _is_expired(self, key) -> bool:
+        if not self.policy.ttl:
+            return False
+
+        if self._expires[key] > monotonic():
+            return False
+
+        self._discard(key)
+        self.stats.expirations += 1
+        return True
+
+    def add_to_cache(self, key: str, value: Any, *, mirror: bool = True):
+        policy = self.policy
+
+        if mirror:
+            self._mirror(key, value)
+
+        if not policy.bounded:
+            self._cache[key] = value
+            return
+
+        if key in self._cache:
+            self._discard(key)
+
+        self._cache[key] = value
 
-    def remove_from_cache(self, key):
-        self.cache.pop(key, None)
+        if policy.ttl:
+            now = monotonic()
+            self._expire(now)
+            self._expires[key] = now + policy.ttl
+
+        if policy.max_weight:
+            weight = policy.weigher(value) if policy.weigher else 1
+            self._weights[key] = weight
+            self.weight += weight
+
+        while (policy.max_size and len(self._cache) > policy.max_size) or (
+            policy.max_weight and self.weight > policy.max_weight
+        ):
+            self._discard(next(iter(self._cache)))
+            self.stats.evictions += 1
+
+    def remove_from_cache(self, key) -> Any:
+        self._mirror(key)
+
+        if not self.policy.bounded:
+            return self._cache.pop(key, None)
+
+        return self._discard(key)
 
     def get(self, key, default: Optional[Any] = None) -> Any:
-        return self.cache.get(key, default)
+        value = self._cache.get(key, _MISSING)
+
+        if value is _MISSING or (self.policy.bounded and self._is_expired(key)):
+            self.stats.misses += 1
+            return default
+
+        if self.policy.lru and self.policy.bounded:
+            self._cache.move_to_end(key)  # type: ignore
+
+        self.stats.hits += 1
+        return value
 
     def is_in_cache(self, key: str):
-        return key in self.cache
+        return key in self._cache and not (
+            self.policy.bounded and self._is_expired(key)
+        )
 
     def clear_cache(self):
         self.cache = {}
@@ -38,16 +170,21 @@ class CacheManager:
         return self.__str__()
 
     def __getitem__(self, key: str) -> Any:
-        return self.cache[key]
+        value = self.get(key, _MISSING)
+
+        if value is _MISSING:
+            raise KeyError(key)
+
+        return value
 
     def __setitem__(self, key: str, value: Any) -> Any:
-        self.cache[key] = value
+        self.add_to_cache(key, value)
 
     def __delitem__(self, key: str) -> None:
-        self.cache.pop(key, None)
+        self.remove_from_cache(key)
 
     def __contains__(self, key: str) -> bool:
-        return key in self.cache
+        return self.is_in_cache(key)
 
     def __iter__(self) -> Iterator:
         return iter(self.cache)
@@ -80,4 +217,66 @@ class CacheManager:
         return self.cache
 
 
+class MirroredCacheManager(CacheManager, ABC):
+    """
+    A :class:`CacheManager` mirroring what is added and removed to a
+    :class:`CacheBackend`, for other processes to read.
+
+    Attributes
+    ----------
+    backend : Optional[CacheBackend]
+        Where entries are mirrored, nowhere if None.
+    namespace : str
+        The namespace of the entries in the backend.
+    """
+
+    def __init__(
+        self,
+        policy: Optional[CachePolicy] = None,
+        *,
+        backend: Optional[CacheBackend] = None,
+        namespace: str,
+    ):
+        self.backend: Optional[CacheBackend] = backend
+        self.namespace: str = namespace
+        super().__init__(policy)
+
+    @abstractmethod
+    def to_payload(self, value: Any) -> Optional[Any]:
+        """Returns what to store in the backend for ``value``, None to not."""
+        ...
+
+    @abstractmethod
+    def from_payload(self, payload: Any) -> Any:
+        """Builds an entry back from what :meth:`to_payload` returned."""
+        ...
+
+    def _mirror(self, key, value: Any = None):
+        if self.backend is None:
+            return
+
+        if value is None:
+            self.backend.write_behind(self.namespace, key)
+        elif (payload := self.to_payload(value)) is not None:
+            self.backend.write_behind(self.namespace, key, payload)
+
+    async def fetch_cached(self, key) -> Any:
+        """
+        Returns the entry from this cache or, failing that, from the backend
+        (where another process may have put it), caching it here.
+        """
+        if (value := self.get(key)) is not None:
+            return value
+
+        if self.backend is None:
+            return None
+
+        if (payload := await self.backend.get(self.namespace, key)) is None:
+            return None
+
+        value = self.from_payload(payload)
+        self.add_to_cache(key, value, mirror=False)
+        return value
+
+
 # This is the base cache manager, people can extend this to make their own cache managers
@@ -0,0 +1,120 @@
+from typing import Any, Callable, Dict, Optional
+
+from ..exceptions import InvalidArgumentType
+
+
+class CachePolicy:
+    """
+    Decides when a :class:`CacheManager` evicts what it holds.
+
+    Every limit is optional, a policy without any keeps everything forever,
+    which is what managers do when they aren't given one.
+
+    Attributes
+    ----------
+    max_size : Optional[int]
+        The most entries the cache may hold.
+    ttl : Optional[float]
+        How many seconds an entry stays in the cache after being added.
+        Expired entries are dropped when they're looked up or, at the latest,
+        when something else is added.
+    max_weight : Optional[int]
+        The most the ``weigher`` of every entry may add up to.
+    weigher : Optional[Callable[[Any], int]]
+        Returns the weight of a value, ``1`` for every value if not given.
+    lru : bool
+        Whether going over a limit evicts the least recently used entry
+        (``True``) or the oldest one (``False``).
+    """
+
+    def __init__(
+        self,
+        *,
+        max_size: Optional[int] = None,
+        ttl: Optional[float] = None,
+        max_weight: Optional[int] = None,
+        weigher: Optional[Callable[[Any], int]] = None,
+        lru: bool = True,
+    ):
+        if max_size is not None and max_size < 1:
+            raise InvalidArgumentType("max_size must be at least 1.")
+
+        if ttl is not None and ttl <= 0:
+            raise InvalidArgumentType("ttl must be more than 0.")
+
+        if max_weight is not None and max_weight < 1:
+            raise InvalidArgumentType("max_weight must be at least 1.")
+
+        self.max_size: Optional[int] = max_size
+        self.ttl: Optional[float] = ttl
+        self.max_weight: Optional[int] = max_weight
+        self.weigher: Optional[Callable[[Any], int]] = weigher
+        self.lru: bool = lru
+
+    @classmethod
+    def lru_cache(cls, max_size: int):
+        """Keeps the ``max_size`` most recently used entries."""
+        return cls(max_size=max_size)
+
+    @classmethod
+    def ttl_cache(cls, ttl: float, *, max_size: Optional[int] = None):
+        """Keeps entries for ``ttl`` seconds."""
+        return cls(ttl=ttl, max_size=max_size)
+
+    @classmethod
+    def weighted(cls, max_weight: int, weigher: Callable[[Any], int]):
+        """Keeps the most recently used entries weighing up to ``max_weight``."""
+        return cls(max_weight=max_weight, weigher=weigher)
+
+    @property
+    def bounded(self) -> bool:
+        return (
+            self.max_size is not None
+            or self.ttl is not None
+            or self.max_weight is not None
+        )
+
+    def __repr__(self) -> str:
+        return (
+            f"<CachePolicy max_size={self.max_size} ttl={self.ttl} "
+            f"max_weight={self.max_weight} lru={self.lru}>"
+        )
+
+
+class CacheStats:
+    """
+    Counters for the lookups and evictions of a :class:`CacheManager`.
+
+    Attributes
+    ----------
+    hits : int
+        The amount of lookups that found what they were looking for.
+    misses : int
+        The amount of lookups that didn't.
+    evictions : int
+        The amount of entries evicted to stay under a size or weight limit.
+    expirations : int
+        The amount of entries dropped because their TTL ran out.
+    """
+
+    def __init__(self):
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+        self.expirations: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+    def to_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+
+__all__ = ("CachePolicy", "CacheStats")
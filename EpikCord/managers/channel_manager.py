@@ -1,23 +1,194 @@
 from __future__ import annotations
 
-from typing import TYPE_CHECKING, List, Optional
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Set, Tuple
 
-from .cache_manager import CacheManager
+from .cache_manager import CacheManager, MirroredCacheManager
 
 if TYPE_CHECKING:
     from ..channels import AnyChannel
 
 
-class ChannelManager(CacheManager):
+class ChannelManager(MirroredCacheManager):
+    """
+    The channels and threads the client knows of, by ID.
+
+    Besides the ID, channels are indexed by the guild they're in and by their
+    parent (the category of a channel, or the channel of a thread), both kept
+    up to date as channels are added, removed and evicted.
+
+    The channels of a guild can also be deferred (see :meth:`defer_guild`),
+    for clients with ``lazy_models``. They're then only built and cached once
+    one of them, or the guild's channels, are looked up.
+
+    Attributes
+    ----------
+    guild_index : Dict[str, Set[str]]
+        The IDs of the cached channels of every guild.
+    parent_index : Dict[str, Set[str]]
+        The IDs of the cached children of every category and channel.
+    """
+
     def __init__(self, client, channels: Optional[List[AnyChannel]] = None):
-        super().__init__()
+        self.guild_index: Dict[str, Set[str]] = {}
+        self.parent_index: Dict[str, Set[str]] = {}
+        # The guild ID of every deferred channel, and the guild of every
+        # guild ID with the IDs of its deferred channels.
+        self._deferred: Dict[str, str] = {}
+        self._deferred_guilds: Dict[str, Tuple[Any, List[str]]] = {}
+        super().__init__(
+            self.policy_for(client, "channels"),
+            backend=getattr(client, "cache_backend", None),
+            namespace="channels",
+        )
         self.client = client
         self.cache = {channel.id: channel for channel in channels} if channels else {}
 
+    @CacheManager.cache.setter  # type: ignore
+    def cache(self, cache: Dict[str, AnyChannel]):
+        CacheManager.cache.fset(self, cache)  # type: ignore
+        self.guild_index = {}
+        self.parent_index = {}
+        self._deferred = {}
+        self._deferred_guilds = {}
+
+        for channel in self._cache.values():
+            self._index(channel)
+
+    @staticmethod
+    def _add_to_index(index: Dict[str, Set[str]], key: Optional[str], channel_id):
+        if key is not None:
+            index.setdefault(key, set()).add(channel_id)
+
+    @staticmethod
+    def _remove_from_index(index: Dict[str, Set[str]], key: Optional[str], channel_id):
+        ids = index.get(key)  # type: ignore
+
+        if ids is not None:
+            ids.discard(channel_id)
+
+            if not ids:
+                del index[key]  # type: ignore
+
+    def _index(self, channel: AnyChannel):
+        guild_id = getattr(channel, "guild_id", None)
+        self._add_to_index(self.guild_index, guild_id, channel.id)
+        self._add_to_index(
+            self.parent_index, getattr(channel, "parent_id", None), channel.id
+        )
+
+    def _unindex(self, channel: AnyChannel):
+        self._remove_from_index(
+            self.guild_index, getattr(channel, "guild_id", None), channel.id
+        )
+        self._remove_from_index(
+            self.parent_index, getattr(channel, "parent_id", None), channel.id
+        )
+
+    def _discard(self, key) -> Any:
+        channel = super()._discard(key)
+
+        if channel is not None:
+            self._unindex(channel)
+
+        return channel
+
+    def add_to_cache(self, key: str, value: AnyChannel, *, mirror: bool = True):
+        # The channel may have moved to another parent since it was cached.
+        if (old := self._cache.get(key)) is not None:
+            self._unindex(old)
+
+        super().add_to_cache(key, value, mirror=mirror)
+
+        if key in self._cache:
+            self._index(value)
+
+    def defer_guild(self, guild, channel_ids: Iterable[str]):
+        """
+        Caches the channels of ``guild`` (those in ``channel_ids``) only once
+        one of them is looked up, instead of building them now.
+        """
+        self._drop_deferred(guild.id)
+        channel_ids = list(channel_ids)
+        self._deferred_guilds[guild.id] = (guild, channel_ids)
+
+        for channel_id in channel_ids:
+            self._deferred[channel_id] = guild.id
+
+    def _drop_deferred(self, guild_id: Optional[str]) -> Optional[Any]:
+        guild, channel_ids = self._deferred_guilds.pop(guild_id, (None, ()))
+
+        for channel_id in channel_ids:
+            if self._deferred.get(channel_id) == guild_id:
+                del self._deferred[channel_id]
+
+        return guild
+
+    def _build_guild(self, guild_id: Optional[str]):
+        if (guild := self._drop_deferred(guild_id)) is None:
+            return
+
+        for channel in guild.channels:
+            # Anything cached since is newer than the GUILD_CREATE.
+            if channel.id not in self._cache:
+                self.add_to_cache(channel.id, channel)
+
+    def _build(self, channel_id):
+        if self._deferred and channel_id not in self._cache:
+            self._build_guild(self._deferred.get(channel_id))
+
+    def get(self, key, default: Optional[Any] = None) -> Any:
+        self._build(key)
+        return super().get(key, default)
+
+    def is_in_cache(self, key: str):
+        self._build(key)
+        return super().is_in_cache(key)
+
+    def remove_from_cache(self, key) -> Optional[AnyChannel]:
+        self._build(key)
+        channel = super().remove_from_cache(key)
+
+        if channel is not None:
+            self._unindex(channel)
+
+        return channel
+
+    def to_payload(self, value: AnyChannel) -> Optional[dict]:
+        return getattr(value, "data", None)
+
+    def from_payload(self, payload: dict) -> AnyChannel:
+        return self.client.utils.channel_from_type(payload)
+
+    def _from_index(self, index: Dict[str, Set[str]], key: str) -> List[AnyChannel]:
+        channels = (self.get(channel_id) for channel_id in tuple(index.get(key, ())))
+        return [channel for channel in channels if channel is not None]
+
+    def from_guild(self, guild_id: str) -> List[AnyChannel]:
+        """Returns the cached channels and threads of a guild."""
+        self._build_guild(guild_id)
+        return self._from_index(self.guild_index, guild_id)
+
+    def from_parent(self, parent_id: str) -> List[AnyChannel]:
+        """Returns the cached channels of a category or threads of a channel."""
+        # The children of a channel are in the same guild.
+        self._build(parent_id)
+        return self._from_index(self.parent_index, parent_id)
+
+    def remove_guild(self, guild_id: str) -> List[AnyChannel]:
+        """Removes every cached channel of a guild, returning them."""
+        self._drop_deferred(guild_id)
+        return [
+            channel
+            for channel_id in tuple(self.guild_index.get(guild_id, ()))
+            if (channel := self.remove_from_cache(channel_id)) is not None
+        ]
+
     async def fetch(self, channel_id: str) -> Optional[AnyChannel]:
         channel = await self.client.http.get(
             f"channels/{channel_id}", channel_id=channel_id
         )
         if data := await channel.json():
-            return self.client.utils.channel_from_type(data)
+            channel = self.client.utils.channel_from_type(data)
+            self.add_to_cache(channel.id, channel)
+            return channel
         return None
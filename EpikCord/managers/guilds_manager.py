@@ -2,17 +2,22 @@ from __future__ import annotations
 
 from typing import List, Optional, Union
 
-from .cache_manager import CacheManager
+from .cache_manager import MirroredCacheManager
+from .snapshot import _GUILD_EXTRAS
 
 
-class GuildManager(CacheManager):
+class GuildManager(MirroredCacheManager):
     def __init__(self, client, guilds=None):
         if guilds is None:
             guilds = []
 
         from EpikCord import Guild, UnavailableGuild
 
-        super().__init__()
+        super().__init__(
+            self.policy_for(client, "guilds"),
+            backend=getattr(client, "cache_backend", None),
+            namespace="guilds",
+        )
         self.client = client
         self.available_guilds = {
             guild.id: guild
@@ -24,6 +29,20 @@ class GuildManager(CacheManager):
         }
         self.cache = {**self.available_guilds, **self.unavailable_guilds}
 
+    def to_payload(self, value) -> Optional[dict]:
+        # Channels and members are cached (and mirrored) on their own.
+        if (data := getattr(value, "data", None)) is None or data.get("unavailable"):
+            return None
+
+        return {key: value for key, value in data.items() if key not in _GUILD_EXTRAS}
+
+    def from_payload(self, payload: dict):
+        from EpikCord import Guild
+
+        return Guild(
+            self.client, {**payload, "channels": [], "threads": [], "members": []}
+        )
+
     async def fetch(
         self,
         guild_id: str,
@@ -32,10 +51,25 @@ class GuildManager(CacheManager):
     ):
         from EpikCord import Guild
 
-        if with_counts:
-            return Guild(
-                self.client,
-                await self.client.http.get(f"/guilds/{guild_id}?with_counts=true"),
-            )
+        response = await self.client.http.get(
+            f"/guilds/{guild_id}",
+            params={"with_counts": "true"} if with_counts else None,
+            guild_id=guild_id,
+        )
+        data = await response.json()
+
+        # Only GUILD_CREATE sends the channels and members of a guild.
+        guild = Guild(
+            self.client,
+            {**data, "channels": [], "threads": [], "stage_instances": []},
+        )
+        previous = self.get(guild.id)
+
+        if isinstance(previous, Guild):
+            guild.channels = previous.channels
+
+            for member_id, member in previous.members.cache.items():
+                guild.members.add_to_cache(member_id, member)
 
-        return Guild(self.client, await self.client.http.get(f"/guilds/{guild_id}"))
+        self.add_to_cache(guild.id, guild)
+        return guild
@@ -10,9 +10,9 @@ class MemberManager(CacheManager):
         if members is None:
             members = []
 
-        super().__init__()
+        super().__init__(self.policy_for(client, "members"))
         self.guild_id: str = guild_id
         for member in members:
-            self.cache[member.id] = member
+            self.add_to_cache(member.id, member)
 
         self.client = client
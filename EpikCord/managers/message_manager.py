@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from collections import deque
+from typing import TYPE_CHECKING, Any, Deque, Dict, List, Optional
+
+from .cache_manager import CacheManager
+
+if TYPE_CHECKING:
+    from EpikCord import Message
+
+
+class MessageManager(CacheManager):
+    """
+    The most recent messages the client received, by ID, so edits and
+    deletions can be resolved to the message they're of.
+
+    Every channel keeps its last ``per_channel`` messages in a ring buffer,
+    the oldest one being dropped when a new one arrives. On top of that no
+    more than ``max_messages`` are kept overall, the oldest being dropped
+    first whatever channel it's in.
+
+    Attributes
+    ----------
+    max_messages : int
+        The most messages to keep, ``0`` to not keep any.
+    per_channel : int
+        The most messages to keep of every channel.
+    channel_buffers : Dict[int, Deque[int]]
+        The IDs of the cached messages of every channel, oldest first.
+    """
+
+    def __init__(self, client, *, max_messages: int = 1000, per_channel: int = 100):
+        self.channel_buffers: Dict[int, Deque[int]] = {}
+        super().__init__()
+        self.client = client
+        self.max_messages: int = max_messages
+        self.per_channel: int = per_channel
+
+    @CacheManager.cache.setter  # type: ignore
+    def cache(self, cache: Dict[int, Message]):
+        self._cache = {}
+        self.channel_buffers = {}
+
+        for key, message in cache.items():
+            self.add_to_cache(key, message)
+
+    def _discard(self, key) -> Any:
+        message = self._cache.pop(key, None)
+
+        if message is None:
+            return None
+
+        buffer = self.channel_buffers[message.channel_id]
+
+        # Messages are evicted oldest first, so this is almost always popleft.
+        if buffer[0] == key:
+            buffer.popleft()
+        else:
+            buffer.remove(key)
+
+        if not buffer:
+            del self.channel_buffers[message.channel_id]
+
+        return message
+
+    def add_to_cache(self, key: int, value: Message, *, mirror: bool = True):
+        if not self.max_messages or not self.per_channel:
+            return
+
+        # An edit replaces the message, keeping its place in the buffer.
+        if key in self._cache:
+            self._cache[key] = value
+            return
+
+        buffer = self.channel_buffers.setdefault(value.channel_id, deque())
+
+        if len(buffer) >= self.per_channel:
+            self._discard(buffer[0])
+            self.stats.evictions += 1
+
+        buffer.append(key)
+        self._cache[key] = value
+
+        while len(self._cache) > self.max_messages:
+            self._discard(next(iter(self._cache)))
+            self.stats.evictions += 1
+
+    def remove_from_cache(self, key) -> Optional[Message]:
+        return self._discard(key)
+
+    def from_channel(self, channel_id: str) -> List[Message]:
+        """Returns the cached messages of a channel, oldest first."""
+        return [
+            self._cache[message_id]
+            for message_id in self.channel_buffers.get(int(channel_id), ())
+        ]
+
+    def remove_channel(self, channel_id: str) -> List[Message]:
+        """Removes every cached message of a channel, returning them."""
+        messages = self.from_channel(channel_id)
+
+        for message in messages:
+            self._discard(message.id)
+
+        return messages
@@ -0,0 +1,230 @@
+from __future__ import annotations
+
+import asyncio
+import sqlite3
+from importlib.util import find_spec
+from logging import getLogger
+from typing import Any, Dict, List, Tuple
+
+logger = getLogger(__name__)
+
+_ORJSON = find_spec("orjson")
+
+if _ORJSON:
+    import orjson as json
+
+else:
+    import json  # type: ignore
+
+# What GUILD_CREATE sends along with a guild that is snapshotted on its own,
+# or (presences, voice states) not worth keeping across a restart.
+_GUILD_EXTRAS = ("members", "channels", "threads", "presences", "voice_states")
+_THREAD_TYPES = (10, 11, 12)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (id TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS guilds (id TEXT PRIMARY KEY, data BLOB NOT NULL);
+CREATE TABLE IF NOT EXISTS channels (
+    id TEXT PRIMARY KEY, guild_id TEXT, type INTEGER, data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS members (
+    guild_id TEXT, user_id TEXT, data BLOB NOT NULL,
+    PRIMARY KEY (guild_id, user_id)
+);
+"""
+
+
+def _dumps(data: Any) -> bytes:
+    dumped = json.dumps(data)
+    return dumped if isinstance(dumped, bytes) else dumped.encode()
+
+
+class CacheSnapshot:
+    """
+    Saves the guilds, channels, members and users a client has cached to a
+    SQLite database, and restores them after a restart so the client has
+    something to work with before the Gateway has sent everything again.
+
+    Everything is stored as the payloads the models were made from, so models
+    need their ``data``: clients made with ``keep_raw_data=False`` only get
+    their members and users saved. Restored guilds are built like any other,
+    lazily if the client has ``lazy_models``.
+
+    Restored data is reconciled with what the Gateway sends: READY drops the
+    guilds the client isn't in anymore, and a GUILD_CREATE replaces the
+    restored guild, keeping the restored members it didn't send.
+
+    Attributes
+    ----------
+    path : str
+        The path of the database.
+    """
+
+    def __init__(self, path: str):
+        self.path: str = path
+
+    @staticmethod
+    def _rows(client) -> Dict[str, List[Tuple]]:
+        rows: Dict[str, List[Tuple]] = {
+            "users": [],
+            "guilds": [],
+            "channels": [],
+            "members": [],
+        }
+
+        for user_id, user in list(client.users.cache.items()):
+            rows["users"].append((user_id, _dumps(user.to_dict())))
+
+        for guild in client.guilds.cache.values():
+            data = getattr(guild, "data", None)
+
+            if data is None or data.get("unavailable"):
+                continue
+
+            guild_data = {
+                key: value for key, value in data.items() if key not in _GUILD_EXTRAS
+            }
+            rows["guilds"].append((guild.id, _dumps(guild_data)))
+
+            for member_id, member in guild.members.cache.items():
+                member_data = {
+                    key: value
+                    for key, value in member.to_dict().items()
+                    if key != "user"
+                }
+                rows["members"].append((guild.id, member_id, _dumps(member_data)))
+
+        for channel in client.channels.cache.values():
+            if (data := getattr(channel, "data", None)) is None:
+                continue
+
+            rows["channels"].append(
+                (
+                    channel.id,
+                    getattr(channel, "guild_id", None),
+                    channel.type,
+                    _dumps(data),
+                )
+            )
+
+        return rows
+
+    def _write(self, rows: Dict[str, List[Tuple]]):
+        # Replaced in one transaction, so a crash mid-save leaves the previous
+        # snapshot as it was.
+        connection = sqlite3.connect(self.path)
+
+        try:
+            with connection:
+                connection.executescript(_SCHEMA)
+
+                for table, table_rows in rows.items():
+                    connection.execute(f"DELETE FROM {table}")
+
+                    if table_rows:
+                        placeholders = ", ".join("?" * len(table_rows[0]))
+                        connection.executemany(
+                            f"INSERT INTO {table} VALUES ({placeholders})", table_rows
+                        )
+        finally:
+            connection.close()
+
+    def _read(self) -> Dict[str, List[Tuple]]:
+        connection = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True)
+
+        try:
+            # Reads pages straight from the mapped file instead of copying them.
+            connection.execute("PRAGMA mmap_size = 268435456")
+            return {
+                "users": connection.execute("SELECT id, data FROM users").fetchall(),
+                "guilds": connection.execute("SELECT id, data FROM guilds").fetchall(),
+                "channels": connection.execute(
+                    "SELECT guild_id, type, data FROM channels"
+                ).fetchall(),
+                "members": connection.execute(
+                    "SELECT guild_id, user_id, data FROM members"
+                ).fetchall(),
+            }
+        except sqlite3.OperationalError:
+            return {}  # An empty database, nothing was ever saved.
+        finally:
+            connection.close()
+
+    async def save(self, client) -> int:
+        """Saves the client's caches, returning how many rows were written."""
+        rows = self._rows(client)
+        await asyncio.get_running_loop().run_in_executor(None, self._write, rows)
+
+        count = sum(map(len, rows.values()))
+        logger.info(f"Saved {count} cached objects to {self.path}.")
+        return count
+
+    async def restore(self, client) -> int:
+        """
+        Fills the client's caches from the snapshot, if there is one,
+        returning how many guilds were restored.
+        """
+        from EpikCord import Guild, GuildMember
+
+        try:
+            rows = await asyncio.get_running_loop().run_in_executor(None, self._read)
+        except sqlite3.OperationalError as e:
+            logger.info(f"No cache snapshot to restore at {self.path}: {e}")
+            return 0
+
+        if not rows:
+            return 0
+
+        # Held on to until the members referring to them are restored, the
+        # user registry only keeps users something else refers to.
+        users = {
+            user_id: client.users.upsert(json.loads(data))
+            for user_id, data in rows["users"]
+        }
+
+        channels: Dict[str, Dict[str, List[dict]]] = {}
+
+        for guild_id, channel_type, data in rows["channels"]:
+            if guild_id is None:
+                channel = client.utils.channel_from_type(json.loads(data))
+                client.channels.add_to_cache(channel.id, channel)
+                continue
+
+            key = "threads" if channel_type in _THREAD_TYPES else "channels"
+            channels.setdefault(guild_id, {"channels": [], "threads": []})[key].append(
+                json.loads(data)
+            )
+
+        for guild_id, data in rows["guilds"]:
+            guild = Guild(
+                client,
+                {
+                    **json.loads(data),
+                    **channels.get(guild_id, {"channels": [], "threads": []}),
+                    "members": [],
+                },
+            )
+            client.guilds.add_to_cache(guild.id, guild)
+
+            for channel in guild.channels:
+                client.channels.add_to_cache(channel.id, channel)
+
+        for guild_id, user_id, data in rows["members"]:
+            guild = client.guilds.get(guild_id)
+            user = users.get(user_id)
+
+            if guild is None or user is None:
+                continue
+
+            member = {**json.loads(data), "user": user.to_dict()}
+            guild.members.add_to_cache(user_id, GuildMember(client, member))
+
+        logger.info(
+            f"Restored {len(rows['guilds'])} guilds, {len(rows['channels'])} "
+            f"channels, {len(rows['members'])} members and {len(users)} users "
+            f"from {self.path}."
+        )
+        return len(rows["guilds"])
+
+
+__all__ = ("CacheSnapshot",)
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
+from weakref import WeakValueDictionary
+
+from .cache_manager import CacheManager
+
+if TYPE_CHECKING:
+    from EpikCord import User
+
+
+class UserManager(CacheManager):
+    """
+    Every :class:`User` the client knows of, by ID, so members, messages and
+    interactions of the same user share one object instead of each having a
+    copy.
+
+    Users are only held weakly, they're dropped from here as soon as nothing
+    else refers to them.
+    """
+
+    def __init__(self, client):
+        super().__init__()
+        self.client = client
+        self.cache = WeakValueDictionary()
+
+    def upsert(self, data: dict) -> User:
+        """
+        Returns the user with the ID in ``data`` updated in place with it,
+        making and caching them if they weren't already.
+        """
+        from EpikCord import User
+
+        user = self.get(data["id"])
+
+        if user is None:
+            user = User(self.client, data)
+            self.add_to_cache(user.id, user)
+        else:
+            user.update(data)
+
+        return user
+
+    def clear_cache(self):
+        self.cache = WeakValueDictionary()
+
+    async def fetch(self, user_id: str) -> User:
+        response = await self.client.http.get(f"/users/{user_id}")
+        return self.upsert(await response.json())
@@ -1,13 +1,16 @@
+from __future__ import annotations
+
 import datetime
 import io
 import os
 from logging import getLogger
-from typing import Any, Dict, List, Optional, Union
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Union
 from urllib.parse import quote as _quote
 
 from .application import Application
 from .colour import Colour
 from .components import *
+from .lazy import init_lazy_attributes, lazy_attribute, lazy_attributes
 from .mentioned import MentionedChannel
 from .partials import PartialEmoji
 from .sticker import *
@@ -15,6 +18,10 @@ from .thread import Thread
 from .user import User
 from .webhooks import WebhookUser
 
+if TYPE_CHECKING:
+    from .guild import GuildMember
+    from .interactions import MessageInteraction
+
 logger = getLogger(__name__)
 
 
@@ -329,87 +336,189 @@ class Message:
 
     """
 
-    def __init__(self, client, data: dict):
-        from EpikCord import GuildMember, Reaction
+    __slots__ = (
+        "client",
+        "id",
+        "channel_id",
+        "channel",
+        "guild_id",
+        "webhook_id",
+        "content",
+        "tts",
+        "mention_everyone",
+        "mention_roles",
+        "nonce",
+        "pinned",
+        "type",
+        "flags",
+        "_payload",
+        "_author",
+        "_timestamp",
+        "_edited_timestamp",
+        "_mentions",
+        "_mention_channels",
+        "_embeds",
+        "_reactions",
+        "_activity",
+        "_application",
+        "_referenced_message",
+        "_interaction",
+        "_thread",
+        "_components",
+        "_stickers",
+    )
 
+    def __init__(self, client, data: dict):
         self.client = client
         self.id: int = int(data["id"])
         self.channel_id: int = int(data["channel_id"])
-        self.channel = client.channels.get(self.channel_id)
+        # Channels are cached under the ID Discord sends, a string.
+        self.channel = client.channels.get(data["channel_id"])
         self.guild_id: Optional[str] = data.get("guild_id")
         self.webhook_id: Optional[str] = data.get("webhook_id")
-        self.author: Optional[Union[WebhookUser, GuildMember, User]] = None
+        self.content: Optional[str] = data.get("content")
+        self.tts: bool = data["tts"]
+        self.mention_everyone: bool = data["mention_everyone"]
+        self.mention_roles: Optional[List[int]] = data.get("mention_roles")
+        self.nonce: Optional[Union[int, str]] = data.get("nonce")
+        self.pinned: bool = data["pinned"]
+        self.type: int = data["type"]
+        self.flags: Optional[int] = data.get("flags")
+        init_lazy_attributes(self, client, data)
+
+    def update(self, data: dict):
+        """
+        Applies a MESSAGE_UPDATE payload to this message. Those may only have
+        the fields that changed, like the embeds Discord adds to a link.
+        """
+        for field in (
+            "content",
+            "tts",
+            "mention_everyone",
+            "mention_roles",
+            "pinned",
+            "flags",
+        ):
+            if field in data:
+                setattr(self, field, data[field])
+
+        payload = getattr(self, "_payload", None)
+        self._payload = data
+
+        for name in lazy_attributes(type(self)):
+            if name in data:
+                setattr(self, name, getattr(type(self), name).build(self))
+
+        self._payload = payload
+
+    @lazy_attribute
+    def author(self) -> Optional[Union[WebhookUser, GuildMember, User]]:
+        from EpikCord import GuildMember
+
+        data = self._payload
 
         if self.webhook_id:
-            self.author = WebhookUser(data["author"])
+            return WebhookUser(data["author"])
 
         if data.get("member"):
             member_data = data["member"]
             if data.get("author"):
-                member_data["user"] = data["author"]
-            self.author = GuildMember(self, member_data)
-        else:
-            self.author = User(self, data["author"]) if data.get("author") else None
+                # Copied, the payload may be shared with other callers.
+                member_data = {**member_data, "user": data["author"]}
+            return GuildMember(self.client, member_data)
 
-        self.content: Optional[str] = data.get("content")
-        self.timestamp: datetime.datetime = datetime.datetime.fromisoformat(
-            data["timestamp"]
+        return (
+            User.from_payload(self.client, data["author"])
+            if data.get("author")
+            else None
         )
-        self.edited_timestamp: Optional[str] = (
-            datetime.datetime.fromisoformat(data["edited_timestamp"])  # type: ignore
-            if data.get("edited_timestamp")
+
+    @lazy_attribute
+    def timestamp(self) -> datetime.datetime:
+        return datetime.datetime.fromisoformat(self._payload["timestamp"])
+
+    @lazy_attribute
+    def edited_timestamp(self) -> Optional[datetime.datetime]:
+        return (
+            datetime.datetime.fromisoformat(self._payload["edited_timestamp"])
+            if self._payload.get("edited_timestamp")
             else None
         )
-        self.tts: bool = data["tts"]
-        self.mention_everyone: bool = data["mention_everyone"]
-        self.mentions: Optional[List[User]] = [
-            User(client, user) for user in data.get("mentions", [])
-        ]
-        self.mention_roles: Optional[List[int]] = data.get("mention_roles")
-        self.mention_channels: Optional[List[MentionedChannel]] = [
-            MentionedChannel(channel) for channel in data.get("mention_channels", [])
-        ]
-        self.embeds: Optional[List[Embed]] = [
-            Embed(**embed) for embed in data.get("embeds", [])
+
+    @lazy_attribute
+    def mentions(self) -> Optional[List[User]]:
+        return [
+            User.from_payload(self.client, user)
+            for user in self._payload.get("mentions", [])
         ]
-        self.reactions: Optional[List[Reaction]] = [
-            Reaction(reaction) for reaction in data.get("reactions", [])
+
+    @lazy_attribute
+    def mention_channels(self) -> Optional[List[MentionedChannel]]:
+        return [
+            MentionedChannel(channel)
+            for channel in self._payload.get("mention_channels", [])
         ]
-        self.nonce: Optional[Union[int, str]] = data.get("nonce")
-        self.pinned: bool = data["pinned"]
-        self.type: int = data["type"]
-        self.activity: Optional[MessageActivity] = (
-            MessageActivity(data["activity"]) if data.get("activity") else None
-        )
+
+    @lazy_attribute
+    def embeds(self) -> Optional[List[Embed]]:
+        return [Embed(**embed) for embed in self._payload.get("embeds", [])]
+
+    @lazy_attribute
+    def reactions(self) -> Optional[List[Reaction]]:
+        from EpikCord import Reaction
+
+        return [Reaction(reaction) for reaction in self._payload.get("reactions", [])]
+
+    @lazy_attribute
+    def activity(self) -> Optional[MessageActivity]:
+        data = self._payload
+        return MessageActivity(data["activity"]) if data.get("activity") else None
+
+    @lazy_attribute
+    def application(self) -> Optional[Application]:
         # * Despite there being a PartialApplication,
         # * Discord don't specify what attributes it has
-        self.application: Optional[Application] = (
-            Application(data["application"]) if data.get("application") else None
-        )
-        self.flags: Optional[int] = data.get("flags")
-        self.referenced_message: Optional[Message] = (
-            Message(client, data["referenced_message"])
+        data = self._payload
+        return Application(data["application"]) if data.get("application") else None
+
+    @lazy_attribute
+    def referenced_message(self) -> Optional[Message]:
+        data = self._payload
+        return (
+            Message(self.client, data["referenced_message"])
             if data.get("referenced_message")
             else None
         )
+
+    @lazy_attribute
+    def interaction(self) -> Optional[MessageInteraction]:
         from .interactions import MessageInteraction
 
-        self.interaction: Optional[MessageInteraction] = (
-            MessageInteraction(client, data["interaction"])
+        data = self._payload
+        return (
+            MessageInteraction(self.client, data["interaction"])
             if data.get("interaction")
             else None
         )
-        self.thread: Optional[Thread] = (
-            Thread(self.client, data["thread"]) if data.get("thread") else None
-        )
-        self.components: Optional[List[Union[TextInput, SelectMenu, Button]]] = (
+
+    @lazy_attribute
+    def thread(self) -> Optional[Thread]:
+        data = self._payload
+        return Thread(self.client, data["thread"]) if data.get("thread") else None
+
+    @lazy_attribute
+    def components(self) -> Optional[List[Union[TextInput, SelectMenu, Button]]]:
+        data = self._payload
+        return (
             [ActionRow.from_dict(component) for component in data["components"]]
             if data.get("components")
             else None
         )
 
-        self.stickers: Optional[List[StickerItem]] = [
-            StickerItem(sticker) for sticker in data.get("stickers", [])
+    @lazy_attribute
+    def stickers(self) -> Optional[List[StickerItem]]:
+        return [
+            StickerItem(sticker) for sticker in self._payload.get("stickers", [])
         ] or None
 
     async def add_reaction(self, emoji: str):
@@ -0,0 +1,175 @@
+"""
+Iterating over endpoints Discord splits into pages.
+
+A :class:`PageIterator` requests a page, starts requesting the next one while
+the current one is gone through and follows the ``before`` or ``after`` cursor
+until there's nothing left, so callers don't loop over pages by hand. Only the
+page being gone through and the one being requested are ever held, however
+many objects there are, and every object is only built when it's reached.
+Requests go through the client's HTTP client like any other, waiting on the
+rate limit of the route.
+"""
+
+from __future__ import annotations
+
+import asyncio
+from typing import Any, AsyncIterator, Callable, Dict, List, Optional, Union
+
+from .exceptions import InvalidArgumentType
+
+Cursor = Union[int, str]
+
+
+def snowflake_cursor(item: dict) -> int:
+    return int(item["id"])
+
+
+class PageIterator:
+    """
+    Iterates with ``async for`` over the objects of a paginated endpoint.
+
+    Attributes
+    ----------
+    client : Client
+        The client the requests are made with.
+    path : str
+        The path of the endpoint.
+    build : Callable[[dict], Any]
+        Builds an object from one of the payloads of a page.
+    direction : str
+        Either ``"before"``, going from the newest objects to the oldest, or
+        ``"after"``, going the other way.
+    cursor : Optional[str]
+        Where the next page starts, None to start from the newest (or oldest)
+        object.
+    limit : Optional[int]
+        The most objects to get, every object if None.
+    page_size : int
+        The most objects to request at once, at most what the endpoint allows.
+    params : Dict[str, Any]
+        The other query parameters of the requests.
+    cursor_of : Callable[[dict], Union[int, str]]
+        Returns where a payload is in the order of the pages, its snowflake ID
+        by default.
+    items_of : Optional[Callable[[Any], List[dict]]]
+        Returns the payloads of a page from its body, for endpoints whose body
+        isn't the list itself.
+    has_more : Optional[Callable[[Any], bool]]
+        Returns whether there's a page after a body, for endpoints saying so.
+        Otherwise there is until a page isn't full.
+    fetched : int
+        The amount of objects received so far.
+    pages : int
+        The amount of pages requested so far.
+    """
+
+    def __init__(
+        self,
+        client,
+        path: str,
+        *,
+        build: Callable[[dict], Any],
+        direction: str = "before",
+        cursor: Optional[str] = None,
+        limit: Optional[int] = None,
+        page_size: int = 100,
+        params: Optional[Dict[str, Any]] = None,
+        cursor_of: Callable[[dict], Cursor] = snowflake_cursor,
+        items_of: Optional[Callable[[Any], List[dict]]] = None,
+        has_more: Optional[Callable[[Any], bool]] = None,
+        guild_id: Union[str, int] = 0,
+        channel_id: Union[str, int] = 0,
+    ):
+        if direction not in ("before", "after"):
+            raise InvalidArgumentType("direction must be either before or after.")
+
+        if page_size < 1:
+            raise InvalidArgumentType("page_size must be at least 1.")
+
+        self.client = client
+        self.path: str = path
+        self.build: Callable[[dict], Any] = build
+        self.direction: str = direction
+        self.cursor: Optional[str] = cursor
+        self.limit: Optional[int] = limit
+        self.page_size: int = page_size
+        self.params: Dict[str, Any] = params or {}
+        self.cursor_of: Callable[[dict], Cursor] = cursor_of
+        self.items_of: Optional[Callable[[Any], List[dict]]] = items_of
+        self.has_more: Optional[Callable[[Any], bool]] = has_more
+        self.guild_id: Union[str, int] = guild_id
+        self.channel_id: Union[str, int] = channel_id
+        self.fetched: int = 0
+        self.pages: int = 0
+        self._done: bool = False
+
+    def _page_limit(self) -> int:
+        if self.limit is None:
+            return self.page_size
+
+        return min(self.page_size, self.limit - self.fetched)
+
+    async def _fetch_page(self) -> List[dict]:
+        limit = self._page_limit()
+        params = {**self.params, "limit": limit}
+
+        if self.cursor is not None:
+            params[self.direction] = self.cursor
+
+        response = await self.client.http.get(
+            self.path,
+            params=params,
+            guild_id=self.guild_id,
+            channel_id=self.channel_id,
+        )
+        body = await response.json()
+        items: List[dict] = self.items_of(body) if self.items_of else body
+        self.pages += 1
+
+        # Pages aren't always in the order they're iterated in.
+        items = sorted(items, key=self.cursor_of, reverse=self.direction == "before")
+        self.fetched += len(items)
+
+        if items:
+            self.cursor = str(self.cursor_of(items[-1]))
+
+        more = self.has_more(body) if self.has_more else len(items) >= limit
+        self._done = (
+            not items
+            or not more
+            or (self.limit is not None and self.fetched >= self.limit)
+        )
+        return items
+
+    async def __aiter__(self) -> AsyncIterator[Any]:
+        if self._done:
+            return
+
+        page = asyncio.ensure_future(self._fetch_page())
+
+        try:
+            while page is not None:
+                items = await page
+                # Requested while this one is gone through.
+                page = None if self._done else asyncio.ensure_future(self._fetch_page())
+
+                for item in items:
+                    yield self.build(item)
+
+                del items
+        finally:
+            if page is not None:
+                page.cancel()
+
+    async def flatten(self) -> List[Any]:
+        """Returns every object, for when they fit in memory."""
+        return [item async for item in self]
+
+    def __repr__(self) -> str:
+        return (
+            f"<PageIterator path={self.path} direction={self.direction} "
+            f"cursor={self.cursor} fetched={self.fetched}>"
+        )
+
+
+__all__ = ("PageIterator",)
@@ -1,19 +1,83 @@
 import asyncio
+from logging import getLogger
 from sys import platform
-from typing import List, Optional, Union
+from time import monotonic
+from typing import AsyncIterator, Dict, Iterable, List, Optional
 
 from .client import (
     ClientApplication,
     ClientUser,
     EventHandler,
+    GuildMembersRequest,
     HTTPClient,
+    InMemoryRateLimitBackend,
+    LatencyHistogram,
+    RateLimitBackend,
+    StartupChunker,
     WebsocketClient,
+    request_many_guild_members,
 )
+from .exceptions import ClosedWebSocketConnection, InvalidArgumentType
 from .flags import Intents
+from .managers import (
+    CacheBackend,
+    CachePolicy,
+    ChannelManager,
+    GuildManager,
+    MessageManager,
+    UserManager,
+)
 from .opcodes import GatewayOpcode
 from .presence import Presence
 from .utils import Utils
 
+logger = getLogger(__name__)
+
+
+class IdentifyScheduler:
+    """
+    Spaces out the IDENTIFYs of shards sharing a token.
+
+    Discord allows ``max_concurrency`` IDENTIFYs every 5 seconds, one for each
+    rate limit key, which is ``shard_id % max_concurrency``. Shards with
+    different keys are let through at the same time, shards with the same key
+    one at a time, ``delay`` seconds apart.
+
+    Attributes
+    ----------
+    max_concurrency : int
+        The ``session_start_limit.max_concurrency`` of the bot.
+    delay : float
+        How long to wait between two IDENTIFYs with the same rate limit key.
+    """
+
+    def __init__(self, max_concurrency: int = 1, delay: float = 5.0):
+        if max_concurrency < 1:
+            raise InvalidArgumentType("max_concurrency must be at least 1.")
+
+        self.max_concurrency: int = max_concurrency
+        self.delay: float = delay
+        self._locks: Dict[int, asyncio.Lock] = {}
+        self._next_identify: Dict[int, float] = {}
+
+    def rate_limit_key(self, shard_id: int) -> int:
+        return shard_id % self.max_concurrency
+
+    async def acquire(self, shard_id: int):
+        """Waits until the shard given may IDENTIFY."""
+        key = self.rate_limit_key(shard_id)
+
+        if key not in self._locks:
+            self._locks[key] = asyncio.Lock()
+
+        async with self._locks[key]:
+            delay = self._next_identify.get(key, 0.0) - monotonic()
+
+            if delay > 0:
+                await asyncio.sleep(delay)
+
+            self._next_identify[key] = monotonic() + self.delay
+
 
 class Shard(WebsocketClient):
     def __init__(
@@ -24,9 +88,25 @@ class Shard(WebsocketClient):
         number_of_shards,
         presence: Optional[Presence] = None,
         discord_endpoint: str = "https://discord.com/api/v10",
+        encoding: str = "json",
+        ratelimit_backend: Optional[RateLimitBackend] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        cache_backend: Optional[CacheBackend] = None,
     ):
-        super().__init__(token, intents, presence, discord_endpoint)
+        super().__init__(
+            token, intents, presence, discord_endpoint, encoding, ratelimit_backend
+        )
         self.shard_id = [shard_id, number_of_shards]
+        self.identify_scheduler: Optional[IdentifyScheduler] = None
+        # Commands are overwritten once by the ShardManager, not by every shard.
+        self.overwrite_commands_on_ready: bool = False
+        self.cache_policies: Dict[str, CachePolicy] = cache_policies or {}
+        self.cache_backend: Optional[CacheBackend] = cache_backend
+        self.guilds: GuildManager = GuildManager(self)
+        self.channels: ChannelManager = ChannelManager(self)
+        self.users: UserManager = UserManager(self)
+        self.messages: MessageManager = MessageManager(self)
+        self.utils: Utils = Utils(self)
 
     async def ready(self, data: dict):
         self.user: ClientUser = ClientUser(self, data["user"])
@@ -36,6 +116,9 @@ class Shard(WebsocketClient):
         self.application: ClientApplication = ClientApplication(self, application_data)
 
     async def identify(self):
+        if self.identify_scheduler:
+            await self.identify_scheduler.acquire(self.shard_id[0])
+
         payload = {
             "op": GatewayOpcode.IDENTIFY,
             "d": {
@@ -46,7 +129,7 @@ class Shard(WebsocketClient):
                     "browser": "EpikCord.py",
                     "device": "EpikCord.py",
                 },
-                "shard": str(self.shard_id),
+                "shard": self.shard_id,
             },
         }
 
@@ -54,12 +137,7 @@ class Shard(WebsocketClient):
             payload["d"]["presence"] = self.presence.to_dict()
 
         await self.send_json(payload)
-
-    async def reconnect(self):
-        await self.close()
-        await self.connect()
-        await self.identify()
-        await self.resume()
+        await self.dispatch("shard_identify", self)
 
 
 class ShardManager(EventHandler):
@@ -69,74 +147,207 @@ class ShardManager(EventHandler):
         intents: Intents,
         *,
         shards: Optional[int] = None,
+        shard_ids: Optional[List[int]] = None,
         overwrite_commands_on_ready: bool = False,
-        discord_endpoint: Optional[str] = None,
+        discord_endpoint: str = "https://discord.com/api/v10",
         presence: Optional[Presence] = None,
+        encoding: str = "json",
+        ratelimit_backend: Optional[RateLimitBackend] = None,
+        cache_policies: Optional[Dict[str, CachePolicy]] = None,
+        keep_raw_data: bool = True,
+        lazy_models: bool = False,
+        chunk_guilds_at_startup: bool = False,
+        cache_backend: Optional[CacheBackend] = None,
+        max_messages: int = 1000,
     ):
         super().__init__()
         self.token: str = token
         self.overwrite_commands_on_ready: bool = overwrite_commands_on_ready
         from EpikCord import __version__
 
+        # Every shard shares the global rate limit, even when none was given.
+        self.ratelimit_backend: RateLimitBackend = (
+            ratelimit_backend or InMemoryRateLimitBackend()
+        )
         self.http: HTTPClient = HTTPClient(
             headers={
                 "Authorization": f"Bot {token}",
                 "User-Agent": f"DiscordBot (https://github.com/EpikCord/EpikCord.py {__version__})",
-            }
+            },
+            ratelimit_backend=self.ratelimit_backend,
         )
         self.intents: Intents = (
             intents if isinstance(intents, Intents) else Intents(intents)  # type: ignore
         )
         self.desired_shards: Optional[int] = shards
+        # The shards this manager runs, all of them if None.
+        self.shard_ids: Optional[List[int]] = shard_ids
         self.shards: List[Shard] = []
+        self.ready_shards: int = 0
+        self.identify_scheduler: Optional[IdentifyScheduler] = None
         self.presence: Optional[Presence] = presence
-        self.discord_endpoint: Optional[str] = discord_endpoint
+        self.discord_endpoint: str = discord_endpoint
+        self.encoding: str = encoding
+        self.cache_policies: Optional[Dict[str, CachePolicy]] = cache_policies
+        # Shared by every shard, so each can read what the others cached.
+        self.cache_backend: Optional[CacheBackend] = cache_backend
+        self.keep_raw_data: bool = keep_raw_data
+        self.lazy_models: bool = lazy_models
+        self.chunk_guilds_at_startup: bool = chunk_guilds_at_startup
+        # The most messages every shard keeps.
+        self.max_messages: int = max_messages
+        # Shared by every shard, so a user in guilds of two shards is one User.
+        self.users: UserManager = UserManager(self)
         super().__init__()
 
-    def run(self):
-        async def wrapper():
-            endpoint_data = await self.http.get("/gateway/bot")  # ClientResponse
-            endpoint_data = await endpoint_data.json()  # Dict
+    async def _start_shard(self, shard: Shard) -> asyncio.Task:
+        ready = asyncio.ensure_future(shard.wait_for("ready"))
+        connection = asyncio.create_task(shard.connect())
+
+        await asyncio.wait((ready, connection), return_when=asyncio.FIRST_COMPLETED)
 
-            max_concurrency = endpoint_data["session_start_limit"]["max_concurrency"]
+        if not ready.done():
+            ready.cancel()
+            connection.result()  # Raises whatever closed the connection.
+            raise ClosedWebSocketConnection(
+                f"Shard {shard.shard_id[0]} disconnected before becoming ready."
+            )
 
-            shards = self.desired_shards
+        self.ready_shards += 1
+        logger.info(
+            f"Shard {shard.shard_id[0]} is ready "
+            f"({self.ready_shards}/{len(self.shards)})."
+        )
+        await self.dispatch("shard_ready", shard, self.ready_shards, len(self.shards))
+
+        return connection
+
+    async def start(self):
+        """
+        Connects every shard, IDENTIFYing as many of them at once as
+        ``max_concurrency`` allows, and runs them until they disconnect.
+
+        Dispatches ``shard_identify`` with the shard whenever one IDENTIFYs,
+        ``shard_ready`` with the shard, the amount of ready shards and the
+        total whenever one becomes ready and ``shards_ready`` once all are.
+        """
+        shards = self.desired_shards
+
+        if not shards or not self.identify_scheduler:
+            endpoint_data = await self.http.get("/gateway/bot")  # ClientResponse
+            endpoint_data = await endpoint_data.json()  # Dict
 
             if not shards:
                 shards = endpoint_data["shards"]
 
-            for shard_id in range(shards):
-                self.shards.append(
-                    Shard(
-                        self.token,
-                        self.intents,
-                        shard_id,
-                        shards,
-                        self.presence,
-                        self.discord_endpoint,
-                    )
+            if not self.identify_scheduler:
+                self.identify_scheduler = IdentifyScheduler(
+                    endpoint_data["session_start_limit"]["max_concurrency"]
                 )
 
-            current_iteration = 0  # The current shard_id we've run
+        shard_ids = self.shard_ids if self.shard_ids is not None else range(shards)
 
-            for shard in self.shards:
-                shard.events = self.events
-                coro = shard.wait_for("ready")
-                await shard.login()
-                await coro()
+        for shard_id in shard_ids:
+            shard = Shard(
+                self.token,
+                self.intents,
+                shard_id,
+                shards,
+                self.presence,
+                self.discord_endpoint,
+                self.encoding,
+                self.ratelimit_backend,
+                self.cache_policies,
+                self.cache_backend,
+            )
+            shard.events = self.events
+            shard.scheduler = self.scheduler
+            shard.identify_scheduler = self.identify_scheduler
+            shard.keep_raw_data = self.keep_raw_data
+            shard.lazy_models = self.lazy_models
+            shard.users = self.users
+            shard.messages = MessageManager(shard, max_messages=self.max_messages)
+
+            if self.chunk_guilds_at_startup:
+                shard.startup_chunker = StartupChunker(shard)
+            self.shards.append(shard)
 
-                current_iteration += 1
+        max_concurrency = self.identify_scheduler.max_concurrency
+        logger.info(
+            f"Starting {len(self.shards)} of {shards} shards, {max_concurrency} at "
+            f"a time (about {-(-len(self.shards) // max_concurrency) * 5} seconds)."
+        )
 
-                if current_iteration == max_concurrency:
-                    await asyncio.sleep(5)
-                    current_iteration = 0  # Reset it
+        try:
+            connections = await asyncio.gather(
+                *(self._start_shard(shard) for shard in self.shards)
+            )
 
             if self.overwrite_commands_on_ready:
-                for shard in self.shards:
-                    await Utils(shard).override_commands()
+                await self.shards[0].utils.override_commands()
+
+            await self.dispatch("shards_ready")
+            await asyncio.gather(*connections)
+
+        finally:
+            # One shard failing to close mustn't leave the others open.
+            for shard in self.shards:
+                try:
+                    await shard.close()
+                except Exception as e:
+                    logger.exception(f"Error closing shard {shard.shard_id[0]}: {e}")
+
+            if not self.http.closed:
+                await self.http.close()
+
+    def shard_for(self, guild_id: str) -> Shard:
+        """Returns the shard receiving the events of a guild."""
+        shard_id = (int(guild_id) >> 22) % self.shards[0].shard_id[1]
+
+        for shard in self.shards:
+            if shard.shard_id[0] == shard_id:
+                return shard
+
+        raise InvalidArgumentType(f"Shard {shard_id} isn't run by this manager.")
+
+    async def request_guild_members(
+        self, guild_id: str, **kwargs
+    ) -> GuildMembersRequest:
+        """
+        Asks the shard of the guild for its members, see
+        :meth:`WebsocketClient.request_guild_members`.
+        """
+        return await self.shard_for(guild_id).request_guild_members(guild_id, **kwargs)
 
+    def request_many_guild_members(
+        self,
+        guild_ids: Iterable[str],
+        *,
+        presences: Optional[bool] = None,
+        concurrency: int = 5,
+        timeout: Optional[float] = 30.0,
+    ) -> AsyncIterator[GuildMembersRequest]:
+        """
+        Requests every member of each guild through its shard, ``concurrency``
+        guilds at a time, yielding each :class:`GuildMembersRequest` once it is
+        complete.
+        """
+        return request_many_guild_members(
+            lambda guild_id: self.request_guild_members(
+                guild_id, presences=presences, timeout=timeout
+            ),
+            guild_ids,
+            concurrency,
+        )
+
+    @property
+    def latency_histograms(self) -> Dict[int, LatencyHistogram]:
+        """The heartbeat latency histogram of every shard, by shard ID."""
+        return {shard.shard_id[0]: shard.latency_histogram for shard in self.shards}
+
+    def run(self):
         loop = asyncio.get_event_loop()
-        loop.run_until_complete(wrapper())
+        loop.run_until_complete(self.start())
 
 
-__all__ = ("Shard", "ShardManager")
+__all__ = ("IdentifyScheduler", "Shard", "ShardManager")
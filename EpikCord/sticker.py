@@ -26,7 +26,7 @@ class Sticker:
         self.available: Optional[bool] = data.get("available")
         self.guild_id: Optional[int] = data.get("guild_id")
         self.user: Optional[User] = (
-            User(self.client, data["user"]) if data.get("user") else None
+            User.from_payload(self.client, data["user"]) if data.get("user") else None
         )
         self.sort_value: Optional[int] = data.get("sort_value")
 
@@ -20,6 +20,13 @@ class ThreadMember:
 class Thread(Messageable):
     def __init__(self, client, data: dict):
         super().__init__(client, data)
+        self.data: Optional[dict] = (
+            data if getattr(client, "keep_raw_data", True) else None
+        )
+        self.type: int = data.get("type")
+        self.name: str = data.get("name")
+        self.guild_id: str = data.get("guild_id")
+        self.parent_id: str = data.get("parent_id")
         self.owner_id: str = data.get("owner_id")
         self.message_count: int = data.get("message_count")
         self.member_count: int = data.get("member_count")
@@ -1,12 +1,38 @@
+from __future__ import annotations
+
 from typing import Optional
 
 from .abstract import Messageable
 
 
 class User(Messageable):
+    __slots__ = (
+        "data",
+        "username",
+        "discriminator",
+        "avatar",
+        "bot",
+        "system",
+        "mfa_enabled",
+        "banner",
+        "accent_color",
+        "locale",
+        "verified",
+        "email",
+        "flags",
+        "premium_type",
+        "public_flags",
+        "__weakref__",
+    )
+    # The attributes that are named after, and set from, payload keys.
+    _fields = __slots__[1:-1]
+
     def __init__(self, client, data: dict):
         super().__init__(client, data["id"])
-        self.data = data
+        # Clients can drop the raw payload to save memory, see ``keep_raw_data``.
+        self.data: Optional[dict] = (
+            data if getattr(client, "keep_raw_data", True) else None
+        )
         self.client = client
         self.id: str = data["id"]
         self.username: str = data["username"]
@@ -14,20 +40,50 @@ class User(Messageable):
         self.avatar: Optional[str] = data.get("avatar")
         self.bot: Optional[bool] = data.get("bot")
         self.system: Optional[bool] = data.get("system")
-        self.mfa_enabled: bool = data["mfa_enabled"]
+        self.mfa_enabled: Optional[bool] = data.get("mfa_enabled")
         self.banner: Optional[str] = data.get("banner")
         # * the user's banner color encoded as an integer representation of
         # * hexadecimal color code
         self.accent_color: Optional[int] = data.get("accent_color")
         self.locale: Optional[str] = data.get("locale")
-        self.verified: bool = data["verified"]
-        self.email: Optional[str] = data["email"]
-        self.flags: int = data["flags"]
-        self.premium_type: int = data["premium_type"]
-        self.public_flags: int = data["public_flags"]
+        self.verified: Optional[bool] = data.get("verified")
+        self.email: Optional[str] = data.get("email")
+        self.flags: Optional[int] = data.get("flags")
+        self.premium_type: Optional[int] = data.get("premium_type")
+        self.public_flags: Optional[int] = data.get("public_flags")
+
+    @classmethod
+    def from_payload(cls, client, data: dict) -> User:
+        """
+        Returns the client's :class:`User` with the ID in ``data`` updated
+        with it, so every model referring to the same user shares one object.
+        Clients without a user registry get a new :class:`User`.
+        """
+        users = getattr(client, "users", None)
+
+        if users is None:
+            return cls(client, data)
+
+        return users.upsert(data)
+
+    def update(self, data: dict):
+        """Updates the user in place from a (possibly partial) user payload."""
+        for field in self._fields:
+            if field in data:
+                setattr(self, field, data[field])
+
+        if self.data is not None and self.data is not data:
+            self.data.update(data)
 
     def to_dict(self) -> dict:
-        return self.data
+        if self.data is not None:
+            return self.data
+
+        return {
+            field: getattr(self, field)
+            for field in ("id", *self._fields)
+            if getattr(self, field) is not None
+        }
 
 
 __all__ = ("User",)
@@ -40,6 +40,7 @@ class Utils:
         5: GuildNewsChannel,
         10: GuildNewsThread,
         11: Thread,
+        12: Thread,
         13: GuildStageChannel,
     }
 
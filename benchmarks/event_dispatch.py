@@ -0,0 +1,115 @@
+"""
+Measures how many dispatch events a second go through
+``EventHandler.handle_event``, with the parser and listener lookups it does
+for every event compared to the string building it used to do.
+
+Events are handed straight to ``handle_event``, so what's measured is routing,
+parsing and scheduling the listeners, not decoding or the network.
+
+    python benchmarks/event_dispatch.py [count]
+"""
+
+import asyncio
+import sys
+from logging import getLogger
+from time import perf_counter
+
+from EpikCord import Client
+
+logger = getLogger("EpikCord.client.event_handler")
+
+
+def snowflake(n: int) -> str:
+    return str(175928847299117063 + n * 4194304)
+
+
+def channel_update(n: int) -> dict:
+    return {
+        "op": 0,
+        "s": n,
+        "t": "CHANNEL_UPDATE",
+        "d": {
+            "id": snowflake(n % 50),
+            "type": 0,
+            "guild_id": snowflake(0),
+            "name": f"channel-{n % 50}",
+            "position": n % 50,
+            "permission_overwrites": [],
+            "nsfw": False,
+            "topic": None,
+            "last_message_id": None,
+            "rate_limit_per_user": 0,
+            "parent_id": None,
+        },
+    }
+
+
+def message_delete(n: int) -> dict:
+    return {
+        "op": 0,
+        "s": n,
+        "t": "MESSAGE_DELETE",
+        "d": {"id": snowflake(n), "channel_id": snowflake(1)},
+    }
+
+
+async def legacy_handle_event(self, event: dict):
+    # How handle_event routed events before the routing table.
+    self.sequence = event["s"]
+    parser = getattr(self, f"_{event['t'].lower()}", None)
+
+    if not parser:
+        return
+
+    result = await parser(event["d"])
+
+    if result is None:
+        return
+
+    args = result if isinstance(result, tuple) else (result,)
+    event_name = event["t"].lower()
+    callbacks = self.events.get(event_name, [])
+    logger.info(f"Calling {len(callbacks)} for {event_name}")
+
+    for callback in callbacks:
+        await self.scheduler.schedule(event_name, callback, *args)
+
+    self.wait_for_events.get(event_name)
+
+
+async def run(handle, events) -> float:
+    start = perf_counter()
+
+    for event in events:
+        await handle(event)
+
+    return len(events) / (perf_counter() - start)
+
+
+async def main(count: int):
+    # Enough room for every listener call, so none waits on the others.
+    client = Client("token", 0, max_pending_dispatches=count * 2)
+
+    @client.event()
+    async def on_channel_update(before, after):
+        pass
+
+    workloads = {
+        "MESSAGE_DELETE": [message_delete(n) for n in range(count)],
+        "CHANNEL_UPDATE": [channel_update(n) for n in range(count)],
+    }
+
+    print(f"{'event':<16}{'before (events/s)':>20}{'after (events/s)':>20}")
+
+    for name, events in workloads.items():
+        before = await run(lambda event: legacy_handle_event(client, event), events)
+        await client.scheduler.join()
+        after = await run(client.handle_event, events)
+        await client.scheduler.join()
+        print(f"{name:<16}{before:>20,.0f}{after:>20,.0f}")
+
+    await client.http.close()
+
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 100_000))
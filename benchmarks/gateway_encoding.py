@@ -0,0 +1,169 @@
+"""
+Compares decoding Gateway payloads encoded as JSON (with the standard library
+and with orjson) and as ETF. ETF decodes several times slower than JSON, this
+shows how much slower next to how much bandwidth it saves.
+
+Pass paths to recorded dispatch payloads (one JSON document per file, either the
+whole ``{"op": 0, "t": "GUILD_CREATE", "d": ...}`` payload or just its ``d``) to
+benchmark those, otherwise a synthetic GUILD_CREATE payload is generated.
+
+    python benchmarks/gateway_encoding.py [payload.json ...]
+"""
+
+import json
+import sys
+import timeit
+import zlib
+from importlib.util import find_spec
+
+from EpikCord import etf
+
+_ORJSON = find_spec("orjson")
+_ERLPACK = find_spec("erlpack")
+
+if _ORJSON:
+    import orjson
+
+if _ERLPACK:
+    import erlpack
+
+
+def snowflake(n: int) -> str:
+    return str(175928847299117063 + n * 4194304)
+
+
+def synthetic_guild_create(members: int = 1000, channels: int = 100) -> dict:
+    return {
+        "op": 0,
+        "s": 2,
+        "t": "GUILD_CREATE",
+        "d": {
+            "id": snowflake(0),
+            "name": "Benchmark Guild",
+            "icon": "a_" + "f" * 32,
+            "owner_id": snowflake(1),
+            "verification_level": 2,
+            "features": ["COMMUNITY", "NEWS", "ANIMATED_ICON"],
+            "large": True,
+            "unavailable": False,
+            "member_count": members,
+            "roles": [
+                {
+                    "id": snowflake(10 + i),
+                    "name": f"role {i}",
+                    "color": 0x5865F2,
+                    "hoist": bool(i % 2),
+                    "position": i,
+                    "permissions": "1071698660929",
+                    "managed": False,
+                    "mentionable": True,
+                }
+                for i in range(50)
+            ],
+            "channels": [
+                {
+                    "id": snowflake(100 + i),
+                    "type": 0,
+                    "name": f"channel-{i}",
+                    "position": i,
+                    "topic": "A channel used for benchmarking the gateway.",
+                    "nsfw": False,
+                    "parent_id": None,
+                    "rate_limit_per_user": 0,
+                    "last_message_id": snowflake(5000 + i),
+                    "permission_overwrites": [
+                        {"id": snowflake(10), "type": 0, "allow": "0", "deny": "1024"}
+                    ],
+                }
+                for i in range(channels)
+            ],
+            "members": [
+                {
+                    "user": {
+                        "id": snowflake(10000 + i),
+                        "username": f"member{i}",
+                        "discriminator": f"{i % 10000:04}",
+                        "avatar": "e" * 32 if i % 3 else None,
+                        "bot": i % 50 == 0,
+                        "public_flags": 0,
+                    },
+                    "nick": f"nick {i}" if i % 4 == 0 else None,
+                    "roles": [snowflake(10 + i % 50), snowflake(10 + (i + 7) % 50)],
+                    "joined_at": "2021-04-01T12:00:00.000000+00:00",
+                    "premium_since": None,
+                    "deaf": False,
+                    "mute": False,
+                    "pending": False,
+                }
+                for i in range(members)
+            ],
+            "threads": [],
+            "presences": [],
+            "emojis": [],
+            "stickers": [],
+        },
+    }
+
+
+def etf_encode_like_discord(obj):
+    """ETF encodes a payload the way Discord does, with snowflakes as integers."""
+    if isinstance(obj, dict):
+        return {key: etf_encode_like_discord(value) for key, value in obj.items()}
+    if isinstance(obj, list):
+        return [etf_encode_like_discord(value) for value in obj]
+    if isinstance(obj, str) and obj.isdigit() and len(obj) >= 17:
+        return int(obj)
+    return obj
+
+
+def bench(name: str, func, payload, number: int) -> float:
+    seconds = min(timeit.repeat(lambda: func(payload), number=number, repeat=5))
+    print(f"  {name:<20} {seconds / number * 1e3:8.3f} ms/payload")
+    return seconds
+
+
+def run(label: str, payload: dict, number: int = 20):
+    as_json = json.dumps(payload, separators=(",", ":")).encode()
+    as_etf = etf.dumps(etf_encode_like_discord(payload))
+
+    json_zlib, etf_zlib = len(zlib.compress(as_json)), len(zlib.compress(as_etf))
+
+    print(f"{label}")
+    print(
+        f"  size: json {len(as_json)} bytes ({json_zlib} zlib), "
+        f"etf {len(as_etf)} bytes ({etf_zlib} zlib)"
+    )
+    json_time = bench("json.loads", json.loads, as_json, number)
+
+    if _ORJSON:
+        bench("orjson.loads", orjson.loads, as_json, number)
+
+    etf_time = bench("etf.loads", etf.loads, as_etf, number)
+
+    if _ERLPACK:
+        bench("erlpack.unpack (raw)", erlpack.unpack, as_etf, number)
+
+    # ETF is a decoding regression, only worth it for the bandwidth it saves.
+    print(
+        f"  etf decodes {etf_time / json_time:.1f}x slower than json.loads "
+        f"and saves {1 - etf_zlib / json_zlib:.0%} of the compressed bytes"
+    )
+
+
+def main(paths):
+    if not paths:
+        run("synthetic GUILD_CREATE (1000 members)", synthetic_guild_create())
+        return
+
+    for path in paths:
+        with open(path, "rb") as f:
+            payload = json.load(f)
+
+        if "op" not in payload:
+            payload = {"op": 0, "s": 1, "t": "GUILD_CREATE", "d": payload}
+
+        run(path, payload)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,130 @@
+"""
+Measures how much memory cached models take, by building members, users and
+messages from synthetic payloads and counting what stays allocated.
+
+Each model is measured with its raw payload kept in ``data`` (the default) and
+with ``keep_raw_data=False``. Members and messages are then measured again
+with every user in ten guilds, with and without a user registry interning them.
+
+    python benchmarks/model_memory.py [count]
+"""
+
+import json
+import sys
+import tracemalloc
+from types import SimpleNamespace
+from typing import Optional
+
+from EpikCord import GuildMember, Message, User, UserManager
+
+
+def snowflake(n: int) -> str:
+    return str(175928847299117063 + n * 4194304)
+
+
+def user_payload(n: int) -> dict:
+    return {
+        "id": snowflake(n),
+        "username": f"member{n}",
+        "discriminator": f"{n % 10000:04}",
+        "avatar": "a_1269e74af4df7417b13759eae50c83dc",
+        "bot": False,
+        "public_flags": 64,
+    }
+
+
+def member_payload(n: int, user: Optional[int] = None) -> dict:
+    return {
+        "user": user_payload(n if user is None else user),
+        "nick": None if n % 3 else f"nick{n}",
+        "roles": [snowflake(10_000_000 + n % 7), snowflake(10_000_000 + n % 11)],
+        "joined_at": "2021-06-01T12:34:56.789000+00:00",
+        "premium_since": None,
+        "deaf": False,
+        "mute": False,
+        "pending": False,
+    }
+
+
+def message_payload(n: int, user: Optional[int] = None) -> dict:
+    return {
+        "id": snowflake(20_000_000 + n),
+        "channel_id": snowflake(1),
+        "guild_id": snowflake(0),
+        "author": user_payload(n if user is None else user),
+        "member": {k: v for k, v in member_payload(n).items() if k != "user"},
+        "content": f"Message number {n}, hello there!",
+        "timestamp": "2022-06-01T12:34:56.789000+00:00",
+        "edited_timestamp": None,
+        "tts": False,
+        "mention_everyone": False,
+        "mentions": [],
+        "mention_roles": [],
+        "attachments": [],
+        "embeds": [],
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def measure(
+    model,
+    payload,
+    count: int,
+    keep_raw_data: bool,
+    users: Optional[int] = None,
+    intern: bool = False,
+) -> float:
+    """
+    Returns the bytes per ``model`` made from ``count`` payloads. With
+    ``users``, the payloads are of that many distinct users, which are
+    interned by a :class:`UserManager` if ``intern`` is True.
+    """
+    client = SimpleNamespace(
+        keep_raw_data=keep_raw_data, channels=SimpleNamespace(get=lambda _: None)
+    )
+    if intern:
+        client.users = UserManager(client)
+
+    # Payloads go through a JSON round trip like they would off the Gateway,
+    # so nothing is shared between them.
+    encoded = [
+        json.dumps(payload(n, n % users) if users else payload(n)) for n in range(count)
+    ]
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    cache = [model(client, json.loads(data)) for data in encoded]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+
+    assert len(cache) == count
+    return (after - before) / count
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10_000
+
+    print(f"{'model':<14}{'with data':>14}{'without data':>16}")
+
+    for model, payload in (
+        (User, user_payload),
+        (GuildMember, member_payload),
+        (Message, message_payload),
+    ):
+        kept = measure(model, payload, count, True)
+        dropped = measure(model, payload, count, False)
+        print(f"{model.__name__:<14}{kept:>10.0f} B/obj{dropped:>12.0f} B/obj")
+
+    users = max(count // 10, 1)
+    print(f"\n{count} objects of {users} users, without data")
+    print(f"{'model':<14}{'copied':>14}{'interned':>16}")
+
+    for model, payload in ((GuildMember, member_payload), (Message, message_payload)):
+        copied = measure(model, payload, count, False, users)
+        interned = measure(model, payload, count, False, users, intern=True)
+        print(f"{model.__name__:<14}{copied:>10.0f} B/obj{interned:>12.0f} B/obj")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+import asyncio
+
+import pytest
+
+from EpikCord import CacheBackend, DictCacheBackend, FakeRedisServer, RedisCacheBackend
+
+
+def test_redis_backend_against_fake_server():
+    async def run():
+        server = FakeRedisServer()
+        await server.start()
+        backend = RedisCacheBackend(port=server.port, prefix="test")
+
+        try:
+            await backend.set("guilds", "1", {"name": "one"})
+            assert await backend.get("guilds", "1") == {"name": "one"}
+            assert await backend.get("guilds", "missing") is None
+
+            await backend.set_many("guilds", {"2": {"name": "two"}, "3": [3]})
+            assert await backend.get_many("guilds", ["1", "2", "3", "4"]) == {
+                "1": {"name": "one"},
+                "2": {"name": "two"},
+                "3": [3],
+                "4": None,
+            }
+
+            # Only the last write to a key is sent.
+            backend.write_behind("guilds", "4", "first")
+            backend.write_behind("guilds", "4", "last")
+            backend.write_behind("guilds", "3")
+            await backend.flush()
+            assert await backend.get("guilds", "4") == "last"
+            assert await backend.get("guilds", "3") is None
+
+            await backend.set("users", "1", "user")
+            keys = [key async for key in backend.scan("guilds")]
+            assert sorted(keys) == ["1", "2", "4"]
+
+            await backend.delete_many("guilds", ["1", "2"])
+            assert await backend.get_many("guilds", ["1", "2", "4"]) == {
+                "1": None,
+                "2": None,
+                "4": "last",
+            }
+            assert [key async for key in backend.scan("users")] == ["1"]
+        finally:
+            await backend.close()
+            await server.close()
+
+    asyncio.run(run())
+
+
+def test_incomplete_backends_cannot_be_made():
+    class NoScan(CacheBackend):
+        async def get(self, namespace, key):
+            pass
+
+        async def set(self, namespace, key, value):
+            pass
+
+        async def delete(self, namespace, key):
+            pass
+
+    with pytest.raises(TypeError):
+        CacheBackend()  # type: ignore
+
+    with pytest.raises(TypeError):
+        NoScan()  # type: ignore
+
+    assert isinstance(DictCacheBackend(), CacheBackend)
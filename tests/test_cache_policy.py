@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from EpikCord import CacheManager, CachePolicy, DictCacheBackend, MirroredCacheManager
+from EpikCord.exceptions import InvalidArgumentType
+from EpikCord.managers import cache_manager
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def test_lru_eviction_order_follows_lookups():
+    cache = CacheManager(CachePolicy.lru_cache(3))
+
+    for key in "abc":
+        cache.add_to_cache(key, key.upper())
+
+    assert cache.get("a") == "A"
+    cache.add_to_cache("d", "D")
+
+    assert list(cache) == ["c", "a", "d"]
+    assert "b" not in cache
+    assert cache.stats.evictions == 1
+
+
+def test_fifo_eviction_ignores_lookups():
+    cache = CacheManager(CachePolicy(max_size=2, lru=False))
+    cache.add_to_cache("a", 1)
+    cache.add_to_cache("b", 2)
+    cache.get("a")
+    cache.add_to_cache("c", 3)
+
+    assert list(cache) == ["b", "c"]
+
+
+def test_ttl_expiry(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache_manager, "monotonic", clock)
+    cache = CacheManager(CachePolicy.ttl_cache(10))
+
+    cache.add_to_cache("a", 1)
+    clock.now += 5
+    cache.add_to_cache("b", 2)
+    assert cache.get("a") == 1
+
+    clock.now += 6
+    assert cache.get("a") is None
+    assert "a" not in cache.cache
+    assert cache.get("b") == 2
+
+    # Expired entries are also dropped when something else is added.
+    clock.now += 10
+    cache.add_to_cache("c", 3)
+    assert list(cache) == ["c"]
+    assert cache.stats.expirations == 2
+
+
+def test_weight_based_eviction():
+    cache = CacheManager(CachePolicy.weighted(10, len))
+    cache.add_to_cache("a", "xxxx")
+    cache.add_to_cache("b", "xxxx")
+    assert cache.weight == 8
+
+    cache.add_to_cache("c", "xxxxxx")
+    assert list(cache) == ["b", "c"]
+    assert cache.weight == 10
+
+    # Replacing an entry replaces its weight.
+    cache.add_to_cache("b", "x")
+    assert cache.weight == 7
+    assert cache.stats.evictions == 1
+
+    cache.remove_from_cache("c")
+    assert cache.weight == 1
+
+
+def test_stats():
+    cache = CacheManager(CachePolicy.lru_cache(1))
+    cache.add_to_cache("a", 1)
+    cache.get("a")
+    cache.get("b")
+    cache.add_to_cache("b", 2)
+
+    assert cache.stats.to_dict() == {
+        "hits": 1,
+        "misses": 1,
+        "evictions": 1,
+        "expirations": 0,
+    }
+    assert cache.stats.hit_rate == 0.5
+
+
+def test_unbounded_cache_keeps_everything():
+    cache = CacheManager()
+
+    for n in range(1000):
+        cache.add_to_cache(n, n)
+
+    assert len(cache) == 1000
+    assert cache.stats.evictions == 0
+
+
+@pytest.mark.parametrize("kwargs", [{"max_size": 0}, {"ttl": 0}, {"max_weight": 0}])
+def test_invalid_policies(kwargs):
+    with pytest.raises(InvalidArgumentType):
+        CachePolicy(**kwargs)
+
+
+class Names(MirroredCacheManager):
+    def to_payload(self, value):
+        return {"name": value}
+
+    def from_payload(self, payload):
+        return payload["name"]
+
+
+def test_mirrored_managers_must_convert_payloads():
+    class NoFromPayload(MirroredCacheManager):
+        def to_payload(self, value):
+            return value
+
+    with pytest.raises(TypeError):
+        NoFromPayload(namespace="names")
+
+
+def test_mirrored_entries_are_fetched_from_the_backend():
+    async def run():
+        backend = DictCacheBackend()
+        writer = Names(backend=backend, namespace="names")
+        reader = Names(backend=backend, namespace="names")
+
+        writer.add_to_cache("1", "one")
+        writer.add_to_cache("2", "two")
+        writer.remove_from_cache("2")
+        await backend.flush()
+
+        assert await reader.fetch_cached("1") == "one"
+        assert reader.get("1") == "one"
+        assert await reader.fetch_cached("2") is None
+
+    asyncio.run(run())
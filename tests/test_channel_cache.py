@@ -0,0 +1,122 @@
+import asyncio
+
+from EpikCord import Client
+
+
+def message_payload(channel_id: str) -> dict:
+    return {
+        "id": "175928847299117063",
+        "channel_id": channel_id,
+        "author": {
+            "id": "175928847299117064",
+            "username": "member",
+            "discriminator": "0001",
+            "avatar": None,
+        },
+        "content": "hello",
+        "timestamp": "2022-06-01T12:34:56.789000+00:00",
+        "tts": False,
+        "mention_everyone": False,
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def test_message_create_resolves_cached_channel_without_http():
+    async def run():
+        client = Client("token", 0)
+        channel = client.utils.channel_from_type(
+            {"id": "175928847299117070", "type": 0, "guild_id": "1", "name": "c"}
+        )
+        client.channels.add_to_cache(channel.id, channel)
+
+        async def no_http(*args, **kwargs):
+            raise AssertionError("A cached channel was fetched.")
+
+        client.http.get = no_http
+        client.channels.fetch = no_http
+
+        try:
+            message = await client._message_create(message_payload(channel.id))
+        finally:
+            await client.http.close()
+
+        assert message.channel is channel
+        assert channel.last_message is message
+
+    asyncio.run(run())
+
+
+def guild_create_payload(guild_id: str, channel_id: str, thread_id: str) -> dict:
+    return {
+        "id": guild_id,
+        "name": "Guild",
+        "icon": None,
+        "owner_id": "175928847299117064",
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "mfa_level": 0,
+        "system_channel_flags": 0,
+        "features": [],
+        "roles": [],
+        "emojis": [],
+        "stickers": [],
+        "stage_instances": [],
+        "large": False,
+        "unavailable": False,
+        "members": [],
+        # Channels in GUILD_CREATE payloads don't have the guild ID.
+        "channels": [{"id": channel_id, "type": 0, "name": "general"}],
+        "threads": [
+            {
+                "id": thread_id,
+                "type": 11,
+                "guild_id": guild_id,
+                "parent_id": channel_id,
+                "name": "thread",
+                "thread_metadata": {
+                    "archived": False,
+                    "auto_archive_duration": 60,
+                    "archive_timestamp": "2022-06-01T12:34:56.789000+00:00",
+                    "locked": False,
+                },
+            }
+        ],
+    }
+
+
+def test_lazy_guild_create_defers_channels_until_looked_up():
+    async def run():
+        client = Client("token", 0, lazy_models=True)
+
+        try:
+            for guild_id, channel_id, thread_id in (
+                ("175928847299117063", "175928847299117070", "175928847299117071"),
+                ("175928847299117065", "175928847299117072", "175928847299117073"),
+            ):
+                await client._guild_create(
+                    guild_create_payload(guild_id, channel_id, thread_id)
+                )
+        finally:
+            await client.http.close()
+
+        first = client.guilds.get("175928847299117063")
+        second = client.guilds.get("175928847299117065")
+        assert not hasattr(first, "_channels")
+        assert not hasattr(second, "_channels")
+
+        # Looking a channel up only builds the channels of its own guild.
+        channel = client.channels.get("175928847299117070")
+        assert channel is first.channels[0]
+        assert channel.name == "general"
+        assert not hasattr(second, "_channels")
+
+        threads = client.channels.from_parent("175928847299117072")
+        assert [thread.id for thread in threads] == ["175928847299117073"]
+        assert threads[0] is second.channels[1]
+
+        assert len(client.channels.remove_guild(first.id)) == 2
+        assert client.channels.get("175928847299117070") is None
+
+    asyncio.run(run())
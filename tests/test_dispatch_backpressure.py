@@ -0,0 +1,135 @@
+import asyncio
+import json
+
+from EpikCord import Client
+from EpikCord.client.heartbeat import HeartbeatSupervisor
+from EpikCord.opcodes import GatewayOpcode
+
+
+class FakeMessage:
+    def __init__(self, payload: dict):
+        self.data = json.dumps(payload)
+
+    def json(self) -> dict:
+        return json.loads(self.data)
+
+
+class FakeGateway:
+    def __init__(self, payloads):
+        self.payloads = payloads
+
+    async def __aiter__(self):
+        for payload in self.payloads:
+            yield FakeMessage(payload)
+
+
+def message_delete(sequence: int) -> dict:
+    return {
+        "op": GatewayOpcode.DISPATCH,
+        "s": sequence,
+        "t": "MESSAGE_DELETE",
+        "d": {"id": str(sequence), "channel_id": "1"},
+    }
+
+
+def test_heartbeat_ack_is_read_while_listeners_are_backed_up():
+    async def run():
+        client = Client("token", 0, max_pending_dispatches=2)
+        release = asyncio.Event()
+        acks = []
+
+        @client.event()
+        async def on_message_delete(message):
+            await release.wait()
+
+        client.heartbeat_supervisor.ack = lambda: acks.append(True)
+        client.heartbeat_time = 0
+        client.ws = FakeGateway(
+            [message_delete(n) for n in range(1, 6)]
+            + [{"op": GatewayOpcode.HEARTBEAT_ACK, "d": None}]
+        )
+
+        try:
+            await asyncio.wait_for(client.handle_events(), 1)
+            assert acks == [True]
+            assert client.scheduler.pending == 2
+
+            release.set()
+            await asyncio.sleep(0.1)
+            await client.scheduler.join()
+            assert client.sequence == 5
+        finally:
+            client.stop_dispatching()
+            await client.http.close()
+
+    asyncio.run(run())
+
+
+def test_reading_stops_once_the_dispatch_queue_is_full():
+    async def run():
+        client = Client("token", 0, max_pending_dispatches=2)
+        release = asyncio.Event()
+        deleted = []
+
+        @client.event()
+        async def on_message_delete(message):
+            await release.wait()
+            deleted.append(message)
+
+        client.ws = FakeGateway([message_delete(n) for n in range(1, 11)])
+        reading = asyncio.create_task(client.handle_events())
+
+        try:
+            await asyncio.sleep(0.1)
+            assert not reading.done()
+            assert client._dispatches.full()
+            assert client.heartbeat_supervisor.paused
+
+            release.set()
+            await asyncio.wait_for(reading, 1)
+            assert not client.heartbeat_supervisor.paused
+
+            while client._dispatches.qsize() or client.scheduler.pending:
+                await asyncio.sleep(0.01)
+
+            assert len(deleted) == 10
+            assert client.sequence == 10
+        finally:
+            reading.cancel()
+            client.stop_dispatching()
+            await client.http.close()
+
+    asyncio.run(run())
+
+
+class FakeClient:
+    def __init__(self):
+        self.heartbeats = 0
+        self.dropped = False
+
+    async def heartbeat(self):
+        self.heartbeats += 1
+
+    async def _drop_connection(self):
+        self.dropped = True
+
+
+def test_missing_acks_while_paused_are_not_a_zombie_connection():
+    async def run():
+        client = FakeClient()
+        supervisor = HeartbeatSupervisor(client)  # type: ignore
+        supervisor.pause()
+        supervisor.start(10)
+
+        try:
+            await asyncio.sleep(0.1)
+            assert client.heartbeats > 1
+            assert not client.dropped
+
+            supervisor.unpause()
+            await asyncio.sleep(0.1)
+            assert client.dropped
+        finally:
+            supervisor.stop()
+
+    asyncio.run(run())
@@ -0,0 +1,89 @@
+import pytest
+
+from EpikCord import etf
+from EpikCord.exceptions import InvalidData
+
+SNOWFLAKE = 175928847299117063
+
+PAYLOAD = {
+    "op": 0,
+    "s": 70000,
+    "t": "GUILD_CREATE",
+    "d": {
+        "id": SNOWFLAKE,
+        "name": "guild ✓",
+        "large": True,
+        "unavailable": False,
+        "icon": None,
+        "negative": -5,
+        "ratio": 0.5,
+        "roles": [{"id": SNOWFLAKE + 1, "tags": {"bot_id": SNOWFLAKE + 2}}],
+        "features": [],
+    },
+}
+
+DECODED = {
+    "op": 0,
+    "s": 70000,
+    "t": "GUILD_CREATE",
+    "d": {
+        "id": str(SNOWFLAKE),
+        "name": "guild ✓",
+        "large": True,
+        "unavailable": False,
+        "icon": None,
+        "negative": -5,
+        "ratio": 0.5,
+        "roles": [{"id": str(SNOWFLAKE + 1), "tags": {"bot_id": str(SNOWFLAKE + 2)}}],
+        "features": [],
+    },
+}
+
+
+@pytest.mark.parametrize("erlpack", [True, False], ids=["erlpack", "python"])
+def test_round_trip(monkeypatch, erlpack):
+    if erlpack and not etf._ERLPACK:
+        pytest.skip("erlpack isn't installed")
+
+    monkeypatch.setattr(etf, "_ERLPACK", etf._ERLPACK if erlpack else None)
+    assert etf.loads(etf.dumps(PAYLOAD)) == DECODED
+
+
+def test_atoms():
+    def atom(name: bytes) -> bytes:
+        return bytes((etf.SMALL_ATOM_UTF8_EXT, len(name))) + name
+
+    data = (
+        bytes((etf.FORMAT_VERSION, etf.LIST_EXT, 0, 0, 0, 4))
+        + atom(b"nil")
+        + atom(b"true")
+        + atom(b"false")
+        + bytes((etf.ATOM_EXT, 0, 5))
+        + b"other"
+        + bytes((etf.NIL_EXT,))
+    )
+    assert etf.loads(data) == [None, True, False, "other"]
+
+
+def test_improper_list_keeps_its_tail():
+    data = bytes(
+        (etf.FORMAT_VERSION, etf.LIST_EXT, 0, 0, 0, 2)
+        + (etf.SMALL_INTEGER_EXT, 1, etf.SMALL_INTEGER_EXT, 2)
+        + (etf.SMALL_INTEGER_EXT, 3)
+    )
+    assert etf.loads(data) == [1, 2, 3]
+
+
+def test_large_big_integer():
+    value = 2**300
+    encoded = value.to_bytes(38, "little")
+    data = bytes((etf.FORMAT_VERSION, etf.LARGE_BIG_EXT, 0, 0, 0, 38, 1)) + encoded
+    assert etf.loads(data) == str(-value)
+
+
+@pytest.mark.parametrize(
+    "data", [b"", b"\x83", b"{}", b"\x83m\x00\x00\x00\x05ab", b"\x83a\x01a"]
+)
+def test_malformed_payloads(data):
+    with pytest.raises(InvalidData):
+        etf.loads(data)
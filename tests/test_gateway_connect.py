@@ -0,0 +1,62 @@
+import asyncio
+
+from aiohttp import ClientError
+
+from EpikCord import Client
+
+
+class FakeGateway:
+    def __init__(self):
+        self.close_code = None
+
+    async def close(self, *, code: int):
+        self.close_code = code
+
+
+def test_close_while_retrying_to_connect():
+    async def run():
+        client = Client("token", 0)
+        client.gateway_url = "wss://gateway.discord.gg"
+        attempts = []
+
+        async def unreachable(url: str):
+            attempts.append(url)
+            raise ClientError("unreachable")
+
+        client._ws_connect = unreachable
+        connecting = asyncio.create_task(client.connect())
+        await asyncio.sleep(0.05)
+
+        # Waiting to retry, without a connection yet.
+        assert not connecting.done()
+        assert client.ws is None
+
+        await client.close()
+        await asyncio.wait_for(connecting, 1)
+        assert len(attempts) == 1
+        assert client.http.closed
+
+    asyncio.run(run())
+
+
+def test_close_while_connecting_closes_the_new_connection():
+    async def run():
+        client = Client("token", 0)
+        client.gateway_url = "wss://gateway.discord.gg"
+        gateway = FakeGateway()
+        connected = asyncio.Event()
+
+        async def slow_connect(url: str):
+            await connected.wait()
+            client.ws = gateway
+
+        client._ws_connect = slow_connect
+        connecting = asyncio.create_task(client.connect())
+        await asyncio.sleep(0.05)
+
+        await client.close()
+        connected.set()
+        await asyncio.wait_for(connecting, 1)
+        assert gateway.close_code == 4000
+
+    asyncio.run(run())
@@ -0,0 +1,58 @@
+import asyncio
+
+import pytest
+
+from EpikCord.client.gateway_ratelimit import GatewayRateLimiter
+from EpikCord.opcodes import GatewayOpcode
+
+
+def test_priority_of():
+    assert GatewayRateLimiter.priority_of({"op": GatewayOpcode.HEARTBEAT}) == 0
+    assert GatewayRateLimiter.priority_of({"op": GatewayOpcode.IDENTIFY}) == 0
+    assert GatewayRateLimiter.priority_of({"op": GatewayOpcode.PRESENCE_UPDATE}) == 1
+
+
+def test_normal_sends_cannot_take_reserved_tokens():
+    async def run():
+        # Refills a token every 10 seconds, so nothing refills during the test.
+        limiter = GatewayRateLimiter(limit=10, per=100, reserved=2)
+
+        for _ in range(8):
+            await asyncio.wait_for(limiter.acquire(), 0.01)
+
+        with pytest.raises(asyncio.TimeoutError):
+            await asyncio.wait_for(limiter.acquire(), 0.05)
+
+        # Both reserved tokens are still there for heartbeats.
+        await asyncio.wait_for(limiter.acquire(0), 0.01)
+        await asyncio.wait_for(limiter.acquire(0), 0.01)
+        assert limiter.tokens < 1
+        assert limiter.sent == 10
+
+    asyncio.run(run())
+
+
+def test_heartbeat_skips_queued_sends():
+    async def run():
+        limiter = GatewayRateLimiter(limit=10, per=100, reserved=2)
+        order = []
+
+        async def send(name: str, priority: int):
+            await limiter.acquire(priority)
+            order.append(name)
+
+        limiter.tokens = 0
+        presences = [asyncio.create_task(send(f"presence {n}", 1)) for n in range(2)]
+        await asyncio.sleep(0.01)
+        assert limiter.depth == 2
+
+        # A token every 0.1 seconds from now on.
+        limiter.per = 1
+        heartbeat = asyncio.create_task(send("heartbeat", 0))
+        await asyncio.wait_for(asyncio.gather(heartbeat, *presences), 2)
+
+        assert order == ["heartbeat", "presence 0", "presence 1"]
+        assert limiter.queued == 3
+        assert limiter.max_depth == 3
+
+    asyncio.run(run())
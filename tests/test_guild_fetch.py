@@ -0,0 +1,53 @@
+import asyncio
+
+from EpikCord import Client, Guild
+
+
+class Response:
+    def __init__(self, data: dict):
+        self.data = data
+
+    async def json(self) -> dict:
+        return self.data
+
+
+def guild_payload() -> dict:
+    return {
+        "id": "175928847299117063",
+        "name": "Guild",
+        "icon": None,
+        "owner_id": "175928847299117064",
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "mfa_level": 0,
+        "system_channel_flags": 0,
+        "features": [],
+        "roles": [],
+        "emojis": [],
+        "stickers": [],
+    }
+
+
+def test_fetch_builds_and_caches_the_guild():
+    async def run():
+        client = Client("token", 0)
+        requests = []
+
+        async def get(url, **kwargs):
+            requests.append((url, kwargs))
+            return Response(guild_payload())
+
+        client.http.get = get
+
+        try:
+            guild = await client.guilds.fetch("175928847299117063", with_counts=True)
+        finally:
+            await client.http.close()
+
+        assert isinstance(guild, Guild)
+        assert guild.name == "Guild"
+        assert client.guilds.get(guild.id) is guild
+        assert requests[0][1]["params"] == {"with_counts": "true"}
+
+    asyncio.run(run())
@@ -0,0 +1,132 @@
+import asyncio
+from time import monotonic
+from typing import List
+
+from EpikCord import Client, GuildMembersRequest, StartupChunker
+
+GUILD_ID = "175928847299117000"
+
+
+def member_payload(n: int) -> dict:
+    return {
+        "user": {
+            "id": str(175928847299117100 + n),
+            "username": f"member{n}",
+            "discriminator": "0001",
+            "avatar": None,
+        },
+        "roles": [],
+        "joined_at": "2021-04-01T12:00:00.000000+00:00",
+        "deaf": False,
+        "mute": False,
+    }
+
+
+def chunk(nonce: str, index: int, count: int, members: range) -> dict:
+    return {
+        "guild_id": GUILD_ID,
+        "nonce": nonce,
+        "chunk_index": index,
+        "chunk_count": count,
+        "members": [member_payload(n) for n in members],
+    }
+
+
+def test_chunks_complete_the_request_with_their_nonce():
+    async def run():
+        client = Client("token", 0)
+        sent: List[dict] = []
+
+        async def send_json(payload: dict):
+            sent.append(payload)
+
+        client.send_json = send_json
+
+        try:
+            request = await client.request_guild_members(GUILD_ID, nonce="a")
+            other = await client.request_guild_members(GUILD_ID, nonce="b")
+            assert [payload["d"]["nonce"] for payload in sent] == ["a", "b"]
+
+            streamed = []
+
+            async def stream():
+                async for member in request:
+                    streamed.append(member)
+
+            streaming = asyncio.create_task(stream())
+
+            await client._guild_members_chunk(chunk("a", 1, 2, range(3, 5)))
+            # Chunks of another request, or of none, don't count towards it.
+            await client._guild_members_chunk(chunk("b", 0, 2, range(10, 11)))
+            await client._guild_members_chunk(chunk("c", 0, 1, range(20, 21)))
+            assert not request.done
+            assert request.chunks_received == {1}
+
+            await client._guild_members_chunk(chunk("a", 0, 2, range(0, 3)))
+            assert request.done
+            assert "a" not in client.member_requests
+            assert "b" in client.member_requests and not other.done
+
+            members = await asyncio.wait_for(request, 1)
+            await asyncio.wait_for(streaming, 1)
+            assert sorted(member.user.username for member in members) == [
+                f"member{n}" for n in range(5)
+            ]
+            assert len(streamed) == 5
+        finally:
+            await client.http.close()
+
+    asyncio.run(run())
+
+
+def test_startup_chunker_requests_large_guilds_once_and_paced():
+    async def run():
+        client = Client("token", 0)
+        chunker = StartupChunker(client, per_minute=120, guild_timeout=1)
+        requested: List[str] = []
+        sent_at: List[float] = []
+        ready: List[StartupChunker] = []
+
+        async def request_guild_members(guild_id: str, **kwargs):
+            requested.append(guild_id)
+            sent_at.append(monotonic())
+            request = GuildMembersRequest(guild_id, guild_id, kwargs.get("timeout"))
+            # Discord answers right away, in two chunks.
+            request.feed({"chunk_index": 0, "chunk_count": 2}, [member_payload(0)])
+            request.feed({"chunk_index": 1, "chunk_count": 2}, [member_payload(1)])
+            return request
+
+        @client.event()
+        async def on_members_ready(chunker):
+            ready.append(chunker)
+
+        client.request_guild_members = request_guild_members
+
+        try:
+            chunker.start(["1", "2", "3"])
+            chunker.add("1", True)
+            chunker.add("2", False)  # Not large, sent with all its members.
+            await asyncio.sleep(0.01)
+            assert not chunker.done
+            chunker.add("3", True)
+
+            while not chunker.done:
+                await asyncio.sleep(0.01)
+
+            await client.scheduler.join()
+            assert requested == ["1", "3"]
+            assert sent_at[1] - sent_at[0] >= 0.45  # 120 a minute.
+            assert chunker.to_dict()["guilds_chunked"] == 2
+            assert chunker.members == 4
+            assert ready == [chunker]
+
+            # Guilds arriving after the chunker is done aren't requested.
+            chunker.add("4", True)
+            await asyncio.sleep(0.01)
+            assert requested == ["1", "3"]
+            assert ready == [chunker]
+        finally:
+            chunker.stop()
+            await client.http.close()
+
+    asyncio.run(run())
@@ -0,0 +1,119 @@
+import asyncio
+
+from EpikCord import Client, Message
+from EpikCord.managers import MessageManager
+
+GUILD_ID = "175928847299117000"
+
+
+def message_payload(message_id: int, channel_id: int, content: str = "hi") -> dict:
+    return {
+        "id": str(message_id),
+        "channel_id": str(channel_id),
+        "guild_id": GUILD_ID,
+        "author": {
+            "id": "175928847299117064",
+            "username": "member",
+            "discriminator": "0001",
+            "avatar": None,
+        },
+        "content": content,
+        "timestamp": "2022-06-01T12:34:56.789000+00:00",
+        "tts": False,
+        "mention_everyone": False,
+        "pinned": False,
+        "type": 0,
+    }
+
+
+def test_per_channel_and_overall_caps():
+    async def run():
+        client = Client("token", 0)
+        messages = MessageManager(client, max_messages=5, per_channel=3)
+
+        try:
+            for message_id in range(1, 5):
+                message = Message(client, message_payload(message_id, 100))
+                messages.add_to_cache(message.id, message)
+
+            # The oldest message of the channel made room for the newest.
+            assert [m.id for m in messages.from_channel("100")] == [2, 3, 4]
+            assert messages.stats.evictions == 1
+
+            for message_id in range(5, 8):
+                message = Message(client, message_payload(message_id, 200))
+                messages.add_to_cache(message.id, message)
+
+            # Over max_messages, the oldest message overall goes first.
+            assert [m.id for m in messages.from_channel("100")] == [3, 4]
+            assert [m.id for m in messages.from_channel("200")] == [5, 6, 7]
+            assert len(messages) == 5
+            assert messages.stats.evictions == 2
+
+            assert [m.id for m in messages.remove_channel("200")] == [5, 6, 7]
+            assert list(messages) == [3, 4]
+            assert 200 not in messages.channel_buffers
+        finally:
+            await client.http.close()
+
+    asyncio.run(run())
+
+
+def test_updates_and_deletes_resolve_cached_messages_by_int_key():
+    async def run():
+        client = Client("token", 0, max_messages=10)
+        client.messages.per_channel = 3
+
+        try:
+            for message_id in range(1, 4):
+                message = Message(client, message_payload(message_id, 100))
+                client.messages.add_to_cache(message.id, message)
+
+            before, after = await client._message_update(
+                {"id": "2", "channel_id": "100", "content": "edited"}
+            )
+            assert before.id == 2 and before.content == "hi"
+            assert after.content == "edited"
+            assert client.messages.get(2) is after
+            # An edit keeps the message's place in its channel's buffer.
+            assert [m.id for m in client.messages.from_channel("100")] == [1, 2, 3]
+
+            deleted = await client._message_delete({"id": "1", "channel_id": "100"})
+            assert deleted.id == 1
+            assert [m.id for m in client.messages.from_channel("100")] == [2, 3]
+
+            # Messages that weren't cached are given as they were received.
+            payload = {"id": "9", "channel_id": "100"}
+            assert await client._message_delete(payload) == payload
+
+            removed = await client._message_delete_bulk(
+                {"ids": ["2", "3", "9"], "channel_id": "100"}
+            )
+            assert [m.id for m in removed[:2]] == [2, 3]
+            assert removed[2]["id"] == "9"
+            assert not client.messages.channel_buffers
+        finally:
+            await client.http.close()
+
+    asyncio.run(run())
+
+
+def test_building_the_author_leaves_the_payload_as_it_was():
+    async def run():
+        client = Client("token", 0, lazy_models=True)
+        payload = message_payload(1, 100)
+        payload["member"] = {
+            "roles": [],
+            "joined_at": "2021-04-01T12:00:00.000000+00:00",
+            "deaf": False,
+            "mute": False,
+        }
+
+        try:
+            message = Message(client, payload)
+            assert message.author.user.username == "member"
+            assert "user" not in payload["member"]
+        finally:
+            await client.http.close()
+
+    asyncio.run(run())
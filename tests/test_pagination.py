@@ -0,0 +1,95 @@
+import asyncio
+from typing import List, Optional
+
+from EpikCord.pagination import PageIterator
+
+
+class Response:
+    def __init__(self, body):
+        self.body = body
+
+    async def json(self):
+        return self.body
+
+
+class StubHTTP:
+    """Serves the objects with IDs ``1`` to ``count`` like Discord pages them."""
+
+    def __init__(self, count: int, *, wrap: bool = False):
+        self.ids: List[int] = list(range(1, count + 1))
+        self.wrap: bool = wrap
+        self.requests: List[dict] = []
+
+    async def get(self, path: str, *, params: dict, **kwargs):
+        self.requests.append(dict(params))
+        before: Optional[str] = params.get("before")
+        after: Optional[str] = params.get("after")
+
+        if after is not None:
+            page = [i for i in self.ids if i > int(after)][: params["limit"]]
+        else:
+            older = [i for i in self.ids if before is None or i < int(before)]
+            page = older[::-1][: params["limit"]]
+
+        items = [{"id": str(i)} for i in page]
+
+        if self.wrap:
+            last = not page or page[-1] in (self.ids[0], self.ids[-1])
+            return Response({"threads": items, "has_more": not last})
+
+        return Response(items)
+
+
+class StubClient:
+    def __init__(self, http: StubHTTP):
+        self.http = http
+
+
+def ids(items) -> List[int]:
+    return [int(item["id"]) for item in items]
+
+
+def iterate(http: StubHTTP, **kwargs) -> List[int]:
+    iterator = PageIterator(
+        StubClient(http), "/items", build=lambda item: item, **kwargs
+    )
+    return ids(asyncio.run(iterator.flatten()))
+
+
+def test_cursor_moves_back_through_every_page():
+    http = StubHTTP(250)
+    assert iterate(http) == list(range(250, 0, -1))
+
+    assert [request.get("before") for request in http.requests] == [
+        None,
+        "151",
+        "51",
+    ]
+    # The last page wasn't full, so no page was requested after it.
+    assert len(http.requests) == 3
+
+
+def test_cursor_moves_forward_through_every_page():
+    http = StubHTTP(120)
+    assert iterate(http, direction="after", cursor="0", page_size=50) == list(
+        range(1, 121)
+    )
+    assert [request["after"] for request in http.requests] == ["0", "50", "100"]
+
+
+def test_limit_cuts_the_last_page_short():
+    http = StubHTTP(500)
+    assert iterate(http, limit=150) == list(range(500, 350, -1))
+    assert [request["limit"] for request in http.requests] == [100, 50]
+
+
+def test_has_more_ends_iteration():
+    # Every page is full, only has_more says when there are no more.
+    http = StubHTTP(200, wrap=True)
+    result = iterate(
+        http,
+        items_of=lambda body: body["threads"],
+        has_more=lambda body: body["has_more"],
+    )
+    assert result == list(range(200, 0, -1))
+    assert len(http.requests) == 2
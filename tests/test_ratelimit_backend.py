@@ -0,0 +1,17 @@
+import pytest
+
+from EpikCord import InMemoryRateLimitBackend, RateLimitBackend
+
+
+def test_incomplete_backends_cannot_be_made():
+    class AcquireOnly(RateLimitBackend):
+        async def acquire_global(self) -> None:
+            pass
+
+    with pytest.raises(TypeError):
+        RateLimitBackend()  # type: ignore
+
+    with pytest.raises(TypeError):
+        AcquireOnly()  # type: ignore
+
+    assert isinstance(InMemoryRateLimitBackend(), RateLimitBackend)
@@ -0,0 +1,127 @@
+import asyncio
+import gc
+
+from EpikCord import CacheSnapshot, Client
+
+GUILD_ID = "175928847299117063"
+CHANNEL_ID = "175928847299117070"
+THREAD_ID = "175928847299117071"
+DM_ID = "175928847299117072"
+
+
+def user_payload(n: int) -> dict:
+    return {
+        "id": str(175928847299117100 + n),
+        "username": f"member{n}",
+        "discriminator": "0001",
+        "avatar": None,
+    }
+
+
+def guild_create_payload() -> dict:
+    return {
+        "id": GUILD_ID,
+        "name": "Guild",
+        "icon": None,
+        "owner_id": "175928847299117064",
+        "verification_level": 0,
+        "default_message_notifications": 0,
+        "explicit_content_filter": 0,
+        "mfa_level": 0,
+        "system_channel_flags": 0,
+        "features": [],
+        "roles": [],
+        "emojis": [],
+        "stickers": [],
+        "stage_instances": [],
+        "large": False,
+        "unavailable": False,
+        "channels": [
+            {"id": CHANNEL_ID, "type": 0, "guild_id": GUILD_ID, "name": "general"}
+        ],
+        "threads": [
+            {
+                "id": THREAD_ID,
+                "type": 11,
+                "guild_id": GUILD_ID,
+                "parent_id": CHANNEL_ID,
+                "name": "thread",
+                "thread_metadata": {
+                    "archived": False,
+                    "auto_archive_duration": 60,
+                    "archive_timestamp": "2022-06-01T12:34:56.789000+00:00",
+                    "locked": False,
+                },
+            }
+        ],
+        "members": [
+            {
+                "user": user_payload(n),
+                "nick": f"nick {n}",
+                "roles": [],
+                "joined_at": "2021-04-01T12:00:00.000000+00:00",
+                "deaf": False,
+                "mute": False,
+            }
+            for n in range(3)
+        ],
+    }
+
+
+def test_save_and_restore_round_trip(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def save() -> int:
+        client = Client("token", 0)
+
+        try:
+            await client._guild_create(guild_create_payload())
+            dm = client.utils.channel_from_type({"id": DM_ID, "type": 1})
+            client.channels.add_to_cache(dm.id, dm)
+            return await CacheSnapshot(path).save(client)
+        finally:
+            await client.http.close()
+
+    async def restore():
+        client = Client("token", 0)
+
+        try:
+            assert await CacheSnapshot(path).restore(client) == 1
+        finally:
+            await client.http.close()
+
+        return client
+
+    assert asyncio.run(save()) > 0
+    client = asyncio.run(restore())
+    # Only the members refer to the users now.
+    gc.collect()
+
+    guild = client.guilds.get(GUILD_ID)
+    assert guild.name == "Guild"
+    assert CHANNEL_ID in {channel.id for channel in guild.channels}
+    assert client.channels.get(CHANNEL_ID).name == "general"
+    assert client.channels.get(THREAD_ID) is not None
+    assert client.channels.get(DM_ID) is not None
+
+    assert len(guild.members) == 3
+
+    for n in range(3):
+        user_id = user_payload(n)["id"]
+        member = guild.members.get(user_id)
+        assert member.nick == f"nick {n}"
+        assert member.user.username == f"member{n}"
+        assert client.users.get(user_id) is member.user
+
+
+def test_restore_without_a_snapshot(tmp_path):
+    async def run():
+        client = Client("token", 0)
+
+        try:
+            snapshot = CacheSnapshot(str(tmp_path / "missing.sqlite3"))
+            assert await snapshot.restore(client) == 0
+        finally:
+            await client.http.close()
+
+    asyncio.run(run())
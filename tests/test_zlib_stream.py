@@ -0,0 +1,41 @@
+import json
+import zlib
+
+from EpikCord.client.http_client import ZLIB_SUFFIX, ZlibStreamInflator
+
+
+def compress(compressor, payload: dict) -> bytes:
+    data = json.dumps(payload).encode()
+    return compressor.compress(data) + compressor.flush(zlib.Z_SYNC_FLUSH)
+
+
+def test_split_payloads_are_only_returned_whole():
+    compressor = zlib.compressobj()
+    inflator = ZlibStreamInflator()
+    first = {"op": 0, "t": "GUILD_CREATE", "d": {"members": list(range(2000))}}
+    second = {"op": 11, "d": None}
+    third = {"op": 0, "t": "MESSAGE_DELETE", "d": {"id": "1"}}
+
+    data = compress(compressor, first)
+    # The middle frame stops halfway through the suffix.
+    frames = [data[:10], data[10:-2], data[-2:]]
+    assert not frames[1].endswith(ZLIB_SUFFIX)
+
+    assert inflator.feed(frames[0]) is None
+    assert inflator.feed(frames[1]) is None
+    assert json.loads(inflator.feed(frames[2])) == first  # type: ignore
+    assert not inflator.buffer
+
+    # A payload in a single frame, inflated with the context the first left.
+    single = compress(compressor, second)
+    assert json.loads(inflator.feed(single)) == second  # type: ignore
+
+    split = compress(compressor, third)
+    assert inflator.feed(split[:5]) is None
+    assert json.loads(inflator.feed(split[5:])) == third  # type: ignore
+
+    assert inflator.payloads == 3
+    assert inflator.bytes_in == len(data) + len(single) + len(split)
+    assert inflator.bytes_out == sum(
+        len(json.dumps(payload)) for payload in (first, second, third)
+    )